@@ -3,9 +3,10 @@ Fetch citation counts from Semantic Scholar API for publications.
 """
 
 import json
-import requests
+import http_client
 import time
 import re
+import tracing
 
 def get_semantic_scholar_data(paper_title, paper_url=None):
     """Fetch citation data from Semantic Scholar"""
@@ -21,7 +22,7 @@ def get_semantic_scholar_data(paper_title, paper_url=None):
     }
     
     try:
-        response = requests.get(base_url, params=params, timeout=10)
+        response = http_client.get(base_url, params=params, timeout=10)
         if response.status_code == 200:
             data = response.json()
             if data.get("data") and len(data["data"]) > 0:
@@ -34,7 +35,8 @@ def get_semantic_scholar_data(paper_title, paper_url=None):
                     "abstract": paper.get("abstract", "")[:500] if paper.get("abstract") else None
                 }
         elif response.status_code == 429:
-            print("  Rate limited, waiting...")
+            # The request's http span already counts the 429 against the host
+            tracing.annotate(rate_limited=True)
             time.sleep(5)
             return None
     except Exception as e:
@@ -76,11 +78,6 @@ def add_citations_to_publications():
             if not title or len(title) < 10:
                 continue
             
-            # Rate limit: max 100 requests per 5 minutes
-            if updated > 0 and updated % 50 == 0:
-                print("  Pausing to respect rate limits...")
-                time.sleep(10)
-            
             data = get_semantic_scholar_data(title, pub.get("paper_url"))
             
             if data:
@@ -101,8 +98,6 @@ def add_citations_to_publications():
             else:
                 pub["citations"] = 0  # Mark as checked
             
-            time.sleep(0.5)  # Be nice to the API
-            
             # Limit for testing
             if updated >= 100:
                 print("\n⚠ Stopping at 100 papers to respect rate limits")
@@ -120,6 +115,7 @@ def add_citations_to_publications():
     print("=" * 60)
     print(f"Papers updated: {updated}")
     print(f"Total citations found: {total_citations}")
+    tracing.print_summary()
 
 
 if __name__ == "__main__":
@@ -6,6 +6,8 @@ Based on: https://futureoflife.org/about-us/our-people/ai-existential-safety-com
 
 import json
 
+from name_index import NameIndex
+
 # Faculty members from FLI page
 FACULTY = [
     {"name": "Alessandro Abate", "role": "Professor", "institution": "University of Oxford"},
@@ -128,7 +130,7 @@ def save_data(data):
 
 def add_researchers(researchers, orgs):
     # Build org map
-    org_map = {}
+    org_map = NameIndex()
     for i, org in enumerate(orgs):
         org_map[org["name"].lower()] = i
     
@@ -147,6 +149,7 @@ def add_researchers(researchers, orgs):
     
     added = 0
     new_orgs = 0
+    people_names = {}  # org index -> lowercased key_people names
     
     for r in researchers:
         inst = r.get("institution", "")
@@ -156,19 +159,13 @@ def add_researchers(researchers, orgs):
         org_idx = None
         
         # Direct match
-        for name, idx in org_map.items():
-            if inst_lower == name or inst_lower in name or name in inst_lower:
-                org_idx = idx
-                break
+        org_idx = org_map.match(inst_lower)
         
         # Alias match
         if org_idx is None:
             for alias, canonical in aliases.items():
                 if alias in inst_lower:
-                    for name, idx in org_map.items():
-                        if canonical in name or name in canonical:
-                            org_idx = idx
-                            break
+                    org_idx = org_map.match(canonical)
                     break
         
         if org_idx is not None:
@@ -176,12 +173,15 @@ def add_researchers(researchers, orgs):
             if "key_people" not in org:
                 org["key_people"] = []
             
-            existing = [p.get("name", "").lower() for p in org["key_people"]]
+            if org_idx not in people_names:
+                people_names[org_idx] = {p.get("name", "").lower() for p in org["key_people"]}
+            existing = people_names[org_idx]
             if r["name"].lower() not in existing:
                 org["key_people"].append({
                     "name": r["name"],
                     "role": r.get("role", "Researcher")
                 })
+                existing.add(r["name"].lower())
                 added += 1
         else:
             # Create new org
@@ -2,54 +2,31 @@
 Add more AI safety orgs to the dataset.
 """
 
-import requests
+import http_client
 from bs4 import BeautifulSoup
-import anthropic
 import json
-import os
-from dotenv import load_dotenv
+import source_registry
+from extraction import extract, print_stats, ORG_PROFILE_SCHEMA
 
-load_dotenv()
-client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
-# New orgs to scrape - ones with research papers
+# New orgs to scrape - ones with research papers (see sources.json)
 NEW_ORGS = [
-    {"name": "MATS", "url": "https://www.matsprogram.org/", "type": "Nonprofit", "country": "United States"},
-    {"name": "Conjecture", "url": "https://www.conjecture.dev/research", "type": "Lab Safety Team", "country": "United Kingdom"},
-    {"name": "FAR AI", "url": "https://far.ai/", "type": "Nonprofit", "country": "United States"},
-    {"name": "Epoch AI", "url": "https://epoch.ai/research", "type": "Nonprofit", "country": "United States"},
-    {"name": "Apart Research", "url": "https://apartresearch.com/", "type": "Nonprofit", "country": "Denmark"},
-    {"name": "EleutherAI", "url": "https://www.eleuther.ai/", "type": "Nonprofit", "country": "United States"},
-    {"name": "Future of Life Institute", "url": "https://futureoflife.org/", "type": "Nonprofit", "country": "United States"},
-    {"name": "Alignment Forum", "url": "https://www.alignmentforum.org/", "type": "Nonprofit", "country": "United States"},
-    {"name": "AI Safety Camp", "url": "https://aisafety.camp/", "type": "Nonprofit", "country": "International"},
-    {"name": "Ought / Elicit", "url": "https://elicit.com/", "type": "Nonprofit", "country": "United States"},
+    {"name": source["org"], "url": source["urls"][0], "type": org["type"], "country": org["country"]}
+    for source in source_registry.sources("new_orgs")
+    for org in [source_registry.org(source["org"])]
 ]
 
 EXTRACTION_PROMPT = """
-Extract structured data from this webpage content about an AI safety organization.
-
-Return JSON with these fields:
-{
-  "mission": "1-2 sentence summary of what they do",
-  "focus_areas": ["list from: Evals, Interpretability, Alignment, Governance, Policy, Biosecurity, Cyber, Control, Monitoring, Benchmarks"],
-  "key_people": [{"name": "...", "role": "..."}],
-  "projects": [{"name": "...", "description": "...", "status": "Active/Completed/Unknown"}],
-  "benchmarks": [{"name": "...", "measures": "what it tests", "paper_url": "if found"}],
-  "notes": "anything else notable"
-}
+Extract structured data from the webpage content in the user message about an
+AI safety organization and record it with the record_extraction tool.
 
 Only include fields where you found actual information. Be concise.
-
-WEBPAGE CONTENT:
 """
 
 
 def scrape_url(url):
     """Fetch and parse webpage content."""
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"}
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_client.get(url, timeout=15)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, "html.parser")
@@ -68,20 +45,13 @@ def scrape_url(url):
 def extract_with_llm(org_name, content):
     """Use Claude to extract structured data."""
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        return extract(
+            EXTRACTION_PROMPT,
+            content,
+            ORG_PROFILE_SCHEMA,
+            system="You extract structured data about AI safety organizations.",
             max_tokens=2048,
-            messages=[
-                {"role": "user", "content": f"{EXTRACTION_PROMPT}\n\n{content}"}
-            ],
-            system="You extract structured data about AI safety organizations. Return valid JSON only, no markdown formatting.",
         )
-        response_text = response.content[0].text
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        return json.loads(response_text.strip())
     
     except Exception as e:
         print(f"  ✗ Error extracting data for {org_name}: {e}")
@@ -128,6 +98,7 @@ def main():
     print(f"\n{'='*50}")
     print(f"Done! Now have {len(existing)} orgs in ai_safety_orgs.json")
     print(f"Added: {[org['name'] for org in new_orgs]}")
+    print_stats()
 
 
 if __name__ == "__main__":
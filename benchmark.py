@@ -0,0 +1,183 @@
+"""
+End-to-end benchmark of run_sources.py against local fixtures.
+
+Starts a fixture_server.FixtureServer on a free port and points the HTTP client
+(HTTP_FIXTURE_BASE) and the Anthropic client (ANTHROPIC_BASE_URL) at it. Then
+it runs the real pipeline (fetch → clean → extract → merge → enrich) over
+every source in sources.json. The run happens in a scratch directory holding
+copies of ai_safety_orgs.json and sources.json, so the real dataset, journals
+and state files are never touched. Nothing leaves the machine.
+
+Host delays are 0 by default so the code is measured rather than politeness;
+--host-delay SECONDS puts them back at one value for every host. Fixture
+latency and error rates are set per kind (page, llm, api):
+
+    python benchmark.py [--batch NAME] [--archive archive/]
+                        [--latency llm=0.8 --latency page=0.05]
+                        [--errors llm=0.02 --errors api=0.1]
+                        [--host-delay 0] [--out run.json] [--compare base.json]
+
+The report gives wall time, per-stage counts, busy time and utilization,
+pages/sec, peak RSS (this process and the clean workers), fixture call
+counts and extraction stats. --out saves it as JSON. --compare prints how
+this run differs from a saved one, so optimizations can be compared run to
+run.
+"""
+
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+
+import fetch_archive
+from fixture_server import FixtureServer
+
+DATA_FILES = ("ai_safety_orgs.json", "sources.json")
+
+EXTRACTION_STATS = ("calls", "api_retries", "escalations", "parse_failures", "repairs",
+                    "rule_hits", "metadata_hits", "input_tokens", "cache_read_tokens", "output_tokens")
+
+
+def kind_values(flag):
+    """{kind: float} from every "--flag kind=value" on the command line."""
+    values = {}
+    for i, arg in enumerate(sys.argv[:-1]):
+        if arg == flag:
+            kind, _, value = sys.argv[i + 1].partition("=")
+            values[kind] = float(value)
+    return values
+
+
+def flag_value(flag):
+    if flag in sys.argv:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return None
+
+
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def run(batch=None, archive=None, latency=None, error_rate=None, host_delay=0.0):
+    """Run the pipeline against a fresh fixture server; returns the report dict."""
+    server = FixtureServer(archive=archive, latency=latency, error_rate=error_rate).start()
+    # Read at import time by http_client, fetch_archive, extraction and tracing
+    os.environ.update({
+        "HTTP_FIXTURE_BASE": server.base_url,
+        "ANTHROPIC_BASE_URL": f"{server.base_url}/anthropic",
+        "ANTHROPIC_API_KEY": "fixture",
+        "ANTHROPIC_RPM": "1000000",
+        "ANTHROPIC_INPUT_TPM": "1000000000",
+        "ANTHROPIC_OUTPUT_TPM": "1000000000",
+        "FETCH_ARCHIVE_DIR": "",
+        "TRACE_DIR": "",
+    })
+    # fixture_server already imported fetch_archive, so the variable alone is too late
+    fetch_archive.ARCHIVE_DIR = ""
+    if archive:
+        archive = os.path.abspath(archive)
+    workdir = tempfile.mkdtemp(prefix="benchmark-")
+    for name in DATA_FILES:
+        shutil.copy(name, workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import host_scheduler
+        import extraction
+        from run_sources import run_sources
+
+        host_scheduler.DEFAULT_DELAY = host_delay
+        for host in host_scheduler.HOST_DELAYS:
+            host_scheduler.HOST_DELAYS[host] = host_delay
+        pipeline = run_sources(run_all=True, batch=batch, fresh=True, enrich_citations=True)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        server.shutdown()
+
+    stages = {
+        stage.name: {
+            "workers": stage.workers,
+            "items_in": stage.items_in,
+            "items_out": stage.items_out,
+            "errors": stage.errors,
+            "busy": round(stage.busy, 3),
+            "blocked": round(stage.blocked, 3),
+            "utilization": round(pipeline.utilization(stage), 3),
+        }
+        for stage in pipeline.stages
+    }
+    pages = stages["clean"]["items_in"]
+    return {
+        "batch": batch,
+        "latency": server.latency,
+        "error_rate": server.error_rate,
+        "host_delay": host_delay,
+        "wall": round(pipeline.wall, 3),
+        "pages": pages,
+        "pages_per_sec": round(pages / pipeline.wall, 2) if pipeline.wall else 0.0,
+        "peak_rss_mb": {key: round(value, 1) for key, value in peak_rss_mb().items()},
+        "stages": stages,
+        "fixture_calls": dict(server.counts),
+        "extraction": {key: extraction.STATS[key] for key in EXTRACTION_STATS},
+    }
+
+
+def print_report(report):
+    print("\n" + "=" * 60)
+    print("BENCHMARK")
+    print("=" * 60)
+    print(f"Wall: {report['wall']:.2f}s, {report['pages']} pages, {report['pages_per_sec']:.2f} pages/sec")
+    rss = report["peak_rss_mb"]
+    print(f"Peak RSS: {rss['self']:.0f} MB (clean workers {rss['children']:.0f} MB)")
+    print(f"  {'stage':<8} {'in':>6} {'out':>6} {'err':>4} {'busy s':>8} {'blocked s':>9} {'util':>6}")
+    for name, stage in report["stages"].items():
+        print(f"  {name:<8} {stage['items_in']:>6} {stage['items_out']:>6} {stage['errors']:>4} "
+              f"{stage['busy']:>8.2f} {stage['blocked']:>9.2f} {stage['utilization']:>6.0%}")
+    print("Fixture calls: " + ", ".join(f"{k} {v}" for k, v in sorted(report["fixture_calls"].items())))
+    print("Extraction: " + ", ".join(f"{k} {v}" for k, v in report["extraction"].items()))
+
+
+def delta(new, old):
+    if not old:
+        return f"{new}"
+    return f"{old} → {new} ({(new - old) / old:+.0%})"
+
+
+def print_comparison(report, base):
+    print("\nCompared with the saved run:")
+    print(f"  wall          {delta(report['wall'], base['wall'])}")
+    print(f"  pages/sec     {delta(report['pages_per_sec'], base['pages_per_sec'])}")
+    print(f"  peak RSS MB   {delta(report['peak_rss_mb']['self'], base['peak_rss_mb']['self'])}")
+    for name, stage in report["stages"].items():
+        old = base["stages"].get(name)
+        if old:
+            print(f"  {name:<8} busy {delta(stage['busy'], old['busy'])}, "
+                  f"util {old['utilization']:.0%} → {stage['utilization']:.0%}")
+    for key in ("calls", "input_tokens", "output_tokens"):
+        print(f"  llm {key:<9} {delta(report['extraction'][key], base['extraction'].get(key, 0))}")
+
+
+if __name__ == "__main__":
+    report = run(
+        batch=flag_value("--batch"),
+        archive=flag_value("--archive"),
+        latency=kind_values("--latency"),
+        error_rate=kind_values("--errors"),
+        host_delay=float(flag_value("--host-delay") or 0),
+    )
+    print_report(report)
+    if flag_value("--compare"):
+        with open(flag_value("--compare")) as f:
+            print_comparison(report, json.load(f))
+    if flag_value("--out"):
+        with open(flag_value("--out"), "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved to {flag_value('--out')}")
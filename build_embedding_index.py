@@ -0,0 +1,210 @@
+"""
+Embed every project, publication and benchmark with a local CPU model.
+
+Vectors are L2-normalized and stored as an int8 matrix with one float16
+scale per row, plus an HNSW graph (hnswlib) for approximate nearest-neighbour
+queries from Python. A web copy of the quantized matrix is written to
+web/app/embedding_index.json for /api/match.
+
+The web route can't run the model, so it gets a static query encoder as
+well: every token in the model's WordPiece vocabulary embedded on its own,
+weighted by its IDF over the documents (as in Model2Vec). The route embeds a
+query as the weighted mean of its tokens' vectors, which lands in the same
+space as the documents. Its vectors are int8 like the documents', in
+web/app/query_encoder.bin, with the vocabulary and scales in the JSON.
+
+Rows line up with documents in build_search_index.py.
+
+The model (torch included) comes from requirements-embeddings.txt, not the
+scrapers' requirements.txt. export_web_data.py runs build() after each
+export, and the web artifacts are committed so the Netlify build doesn't
+need torch.
+
+Usage:
+    pip install -r requirements-embeddings.txt
+    python build_embedding_index.py                 # build
+    python build_embedding_index.py "idea text"     # query the built index
+"""
+
+import base64
+import json
+import math
+import sys
+from collections import Counter
+
+import numpy as np
+
+from build_search_index import DATA_PATH, build_documents, dataset_version
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+MATRIX_PATH = "embedding_index.npz"
+HNSW_PATH = "embedding_index.hnsw"
+WEB_OUTPUT_PATH = "web/app/embedding_index.json"
+WEB_ENCODER_PATH = "web/app/query_encoder.bin"
+
+# HNSW build/search parameters
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+_model = None
+
+
+def get_model():
+    """Load the embedding model once (CPU only)."""
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+        _model = SentenceTransformer(MODEL_NAME, device="cpu")
+    return _model
+
+
+def embed(texts):
+    """Return L2-normalized float32 embeddings for a list of texts."""
+    vectors = get_model().encode(texts, batch_size=64, normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def quantize(vectors):
+    """Symmetric per-row int8 quantization. Returns (int8 matrix, float16 scales)."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.round(vectors / scales[:, None]).astype(np.int8)
+    return q, scales.astype(np.float16)
+
+
+def dequantize(q, scales):
+    return q.astype(np.float32) * scales.astype(np.float32)[:, None]
+
+
+def item_text(doc):
+    return f"{doc['title']}. {doc['body']}"
+
+
+def build_query_encoder(texts):
+    """
+    Static token embeddings for the web route: (vocab, int8 vectors, float16 scales).
+
+    Each WordPiece token is embedded alone ("##" continuations without the
+    marker) and its scale is multiplied by the token's IDF over texts, so a
+    query vector is just the sum of its tokens' rows.
+    """
+    tokenizer = get_model().tokenizer
+    vocab = [token for token, _ in sorted(tokenizer.vocab.items(), key=lambda item: item[1])
+             if not (token.startswith("[") and token.endswith("]"))]
+    document_frequency = Counter()
+    for text in texts:
+        document_frequency.update(set(tokenizer.tokenize(text)))
+    idf = np.array([math.log((1 + len(texts)) / (1 + document_frequency[token])) + 1 for token in vocab],
+                   dtype=np.float32)
+
+    vectors = embed([token[2:] if token.startswith("##") else token for token in vocab])
+    q, scales = quantize(vectors)
+    return vocab, q, (scales.astype(np.float32) * idf).astype(np.float16)
+
+
+def build():
+    with open(DATA_PATH, "r") as f:
+        orgs = json.load(f)
+
+    # Keep BM25 doc ids so rows can be joined back to the search index
+    docs = build_documents(orgs)
+    rows = [(doc_id, doc) for doc_id, doc in enumerate(docs) if doc["type"] != "organization"]
+
+    print(f"Embedding {len(rows)} items with {MODEL_NAME}...")
+    texts = [item_text(doc) for _, doc in rows]
+    vectors = embed(texts)
+    q, scales = quantize(vectors)
+    version = dataset_version()
+
+    items = [[doc["type"], doc["title"], doc["org"], doc["slug"]] for _, doc in rows]
+    doc_ids = [doc_id for doc_id, _ in rows]
+
+    np.savez_compressed(
+        MATRIX_PATH,
+        vectors=q,
+        scales=scales,
+        doc_ids=np.array(doc_ids, dtype=np.int32),
+        items=np.array(json.dumps(items)),
+        version=np.array(version),
+    )
+
+    import hnswlib
+    graph = hnswlib.Index(space="ip", dim=q.shape[1])
+    graph.init_index(max_elements=len(rows), M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION)
+    graph.add_items(dequantize(q, scales), np.arange(len(rows)))
+    graph.save_index(HNSW_PATH)
+
+    print("Embedding the query encoder's vocabulary...")
+    vocab, token_vectors, token_scales = build_query_encoder(texts)
+    with open(WEB_ENCODER_PATH, "wb") as f:
+        f.write(token_vectors.tobytes())
+
+    with open(WEB_OUTPUT_PATH, "w") as f:
+        json.dump({
+            "version": version,
+            "model": MODEL_NAME,
+            "dim": int(q.shape[1]),
+            "doc_ids": doc_ids,
+            "scales": [float(s) for s in scales],
+            "vectors": base64.b64encode(q.tobytes()).decode("ascii"),
+            "encoder": {
+                "vocab": vocab,
+                "scales": [float(s) for s in token_scales],
+            },
+        }, f, separators=(",", ":"))
+
+    print(f"✓ Saved {q.shape[0]}x{q.shape[1]} int8 matrix to {MATRIX_PATH}")
+    print(f"✓ Saved HNSW index to {HNSW_PATH}")
+    print(f"✓ Saved web index to {WEB_OUTPUT_PATH} (version {version})")
+    print(f"✓ Saved {len(vocab)}-token query encoder to {WEB_ENCODER_PATH}")
+
+
+def load():
+    """Load the quantized matrix and HNSW graph built by build()."""
+    data = np.load(MATRIX_PATH)
+    index = {
+        "vectors": data["vectors"],
+        "scales": data["scales"],
+        "items": json.loads(str(data["items"])),
+        "version": str(data["version"]),
+        "graph": None,
+    }
+    try:
+        import hnswlib
+        graph = hnswlib.Index(space="ip", dim=index["vectors"].shape[1])
+        graph.load_index(HNSW_PATH)
+        graph.set_ef(HNSW_EF_SEARCH)
+        index["graph"] = graph
+    except (ImportError, RuntimeError):
+        pass  # fall back to an exact scan over the int8 matrix
+    return index
+
+
+def nearest(index, text, k=20):
+    """Return the k items closest to text as (similarity, item) pairs."""
+    query = embed([text])[0]
+    k = min(k, len(index["items"]))
+
+    if index["graph"] is not None:
+        labels, distances = index["graph"].knn_query(query, k=k)
+        # hnswlib's "ip" distance is 1 - dot product
+        return [(1 - float(d), index["items"][i]) for i, d in zip(labels[0], distances[0])]
+
+    sims = (index["vectors"].astype(np.float32) @ query) * index["scales"].astype(np.float32)
+    top = np.argsort(-sims)[:k]
+    return [(float(sims[i]), index["items"][i]) for i in top]
+
+
+def main():
+    if len(sys.argv) > 1:
+        index = load()
+        for sim, (kind, title, org, _) in nearest(index, " ".join(sys.argv[1:])):
+            print(f"  {sim:.3f}  [{kind}] {title} ({org})")
+    else:
+        build()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Build a BM25 inverted index over the web dataset for /api/search.
+
+Indexes titles, descriptions, missions and focus areas of every org, project,
+publication and benchmark in web/app/data.json and writes a compact artifact
+to web/app/search_index.json. The search route scores queries against it and
+only sends the top-k lexical hits to Claude, so the whole corpus is reachable.
+
+The tokenizer here must stay in sync with web/app/lib/search-index.ts.
+"""
+
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+
+DATA_PATH = "web/app/data.json"
+OUTPUT_PATH = "web/app/search_index.json"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Title terms count this many times toward term frequency
+TITLE_WEIGHT = 2
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+    "in", "into", "is", "it", "its", "of", "on", "or", "that", "the", "their",
+    "this", "to", "was", "we", "were", "which", "with", "how", "what", "our",
+}
+
+
+def slugify(text):
+    """Match slugify() in web/app/lib/data.ts."""
+    return re.sub(r"(^-|-$)", "", re.sub(r"[^a-z0-9]+", "-", text.lower()))
+
+
+def tokenize(text):
+    """Lowercase, split on non-alphanumerics, drop stopwords, strip plurals."""
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def dataset_version(path=DATA_PATH):
+    """Short content hash of the dataset, used to tag derived artifacts."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def build_documents(orgs):
+    """Flatten orgs into searchable documents, mirroring buildIndex() in the search route."""
+    docs = []
+
+    for org in orgs:
+        focus = " ".join(org.get("focus_areas", []))
+        docs.append({
+            "type": "organization",
+            "title": org["name"],
+            "org": org["name"],
+            "slug": slugify(org["name"]),
+            "extra": org.get("type", ""),
+            "body": f"{org.get('mission', '')} {focus} {org.get('type', '')}",
+        })
+
+        for p in org.get("projects", []):
+            is_publication = (p.get("status") or "").lower() == "published" or p.get("paper_url")
+            docs.append({
+                "type": "publication" if is_publication else "project",
+                "title": p["name"],
+                "org": org["name"],
+                "slug": slugify(p["name"]),
+                "extra": p.get("citations") if is_publication else p.get("status", ""),
+                "body": f"{p.get('description', '')} {' '.join(p.get('focus_areas', []))} {focus}",
+            })
+
+        for b in org.get("benchmarks", []):
+            docs.append({
+                "type": "benchmark",
+                "title": b["name"],
+                "org": org["name"],
+                "slug": slugify(b["name"]),
+                "extra": b.get("measures", ""),
+                "body": f"{b.get('measures', '')} {focus}",
+            })
+
+    return docs
+
+
+def build_index(docs, version=""):
+    """Compute postings and document lengths for BM25 scoring."""
+    postings = {}
+    lengths = []
+
+    for doc_id, doc in enumerate(docs):
+        counts = Counter()
+        for token in tokenize(doc["title"]):
+            counts[token] += TITLE_WEIGHT
+        counts.update(tokenize(doc["body"]))
+
+        lengths.append(sum(counts.values()))
+        for token, tf in counts.items():
+            # Flat [docId, tf, docId, tf, ...] keeps the JSON small
+            postings.setdefault(token, []).extend([doc_id, tf])
+
+    return {
+        "version": version,
+        "k1": K1,
+        "b": B,
+        "avgdl": round(sum(lengths) / max(len(lengths), 1), 3),
+        "docs": [[d["type"], d["title"], d["org"], d["slug"], d["extra"]] for d in docs],
+        "lengths": lengths,
+        "postings": postings,
+    }
+
+
+def search(index, query, k=20):
+    """Score a query against a built index. Returns (score, doc) pairs, best first."""
+    n = len(index["docs"])
+    scores = {}
+
+    for token in set(tokenize(query)):
+        plist = index["postings"].get(token)
+        if not plist:
+            continue
+        df = len(plist) // 2
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i in range(0, len(plist), 2):
+            doc_id, tf = plist[i], plist[i + 1]
+            norm = index["k1"] * (1 - index["b"] + index["b"] * index["lengths"][doc_id] / index["avgdl"])
+            scores[doc_id] = scores.get(doc_id, 0) + idf * tf * (index["k1"] + 1) / (tf + norm)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+    return [(score, index["docs"][doc_id]) for doc_id, score in ranked]
+
+
+def main():
+    with open(DATA_PATH, "r") as f:
+        orgs = json.load(f)
+
+    docs = build_documents(orgs)
+    index = build_index(docs, dataset_version())
+
+    with open(OUTPUT_PATH, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    print(f"✓ Indexed {len(docs)} documents, {len(index['postings'])} terms")
+    print(f"  Saved to {OUTPUT_PATH} (version {index['version']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ Check which MATS papers are already in the database and which are missing.
 
 import json
 import csv
+import math
+
+from name_index import NameIndex
 
 def load_orgs():
     with open("ai_safety_orgs.json", "r") as f:
@@ -28,46 +31,63 @@ def normalize(s):
     """Normalize string for comparison."""
     return s.lower().replace("-", " ").replace(":", "").replace("'", "").replace('"', "").strip()
 
+class ExistingTitles:
+    """
+    Normalized titles already in the database, indexed for matches().
+
+    A paper matches a title if either contains the other, or if they share
+    at least min(4, n - 1) and 60% of the paper's n distinct words. Candidates
+    for the word test come from the n - k + 1 rarest paper words, where k is
+    the overlap needed, since any title sharing k words has one of them.
+    """
+
+    def __init__(self, titles):
+        self.titles = NameIndex((title, True) for title in titles)
+        self.word_sets = []
+        self.postings = {}  # word -> indexes into word_sets
+        for title in self.titles:
+            words = set(title.split())
+            for word in words:
+                self.postings.setdefault(word, []).append(len(self.word_sets))
+            self.word_sets.append(words)
+
+    def matches(self, title_norm):
+        if self.titles.match(title_norm):
+            return True
+        paper_words = set(title_norm.split())
+        if not paper_words:
+            return bool(self.word_sets)
+        needed = max(min(4, len(paper_words) - 1), math.ceil(len(paper_words) * 0.6))
+        rarest = sorted(paper_words, key=lambda word: len(self.postings.get(word, ())))
+        candidates = set()
+        for word in rarest[:len(paper_words) - needed + 1]:
+            candidates.update(self.postings.get(word, ()))
+        return any(len(paper_words & self.word_sets[i]) >= needed for i in candidates)
+
+def find_missing(orgs, mats_papers):
+    """(found, missing): MATS papers that do and don't match an existing project title."""
+    existing = ExistingTitles({normalize(p["name"]) for org in orgs for p in org.get("projects", [])})
+    found = []
+    missing = []
+    for paper in mats_papers:
+        if existing.matches(normalize(paper["title"])):
+            found.append(paper)
+        else:
+            missing.append(paper)
+    return found, missing
+
 def main():
     orgs = load_orgs()
     mats_papers = load_mats_papers()
     
-    # Get all existing project titles
-    existing_titles = set()
-    for org in orgs:
-        for p in org.get("projects", []):
-            existing_titles.add(normalize(p["name"]))
+    existing_titles = {normalize(p["name"]) for org in orgs for p in org.get("projects", [])}
     
     print(f"MATS papers: {len(mats_papers)}")
     print(f"Existing projects: {len(existing_titles)}")
     print()
     
-    # Check which are missing
-    found = []
-    missing = []
-    
-    for paper in mats_papers:
-        title_norm = normalize(paper["title"])
-        
-        # Check for exact or fuzzy match
-        matched = False
-        for existing in existing_titles:
-            # Check if one contains the other (for partial matches)
-            if title_norm == existing or title_norm in existing or existing in title_norm:
-                matched = True
-                break
-            # Check word overlap
-            paper_words = set(title_norm.split())
-            existing_words = set(existing.split())
-            overlap = len(paper_words & existing_words)
-            if overlap >= min(4, len(paper_words) - 1) and overlap >= len(paper_words) * 0.6:
-                matched = True
-                break
-        
-        if matched:
-            found.append(paper)
-        else:
-            missing.append(paper)
+    # Check which are missing (exact, partial or word-overlap matches)
+    found, missing = find_missing(orgs, mats_papers)
     
     print(f"Found in database: {len(found)}")
     print(f"Missing from database: {len(missing)}")
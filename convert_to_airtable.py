@@ -18,9 +18,9 @@ def main():
     for org in orgs:
         org_rows.append({
             "Name": org["name"],
-            "Type": org["type"],
-            "Country": org["country"],
-            "Website": org["url"],
+            "Type": org.get("type", ""),
+            "Country": org.get("country", ""),
+            "Website": org.get("url", ""),
             "Focus Areas": ", ".join(org.get("focus_areas", [])),
             "Mission": org.get("mission", ""),
             "Notes": org.get("notes", ""),
@@ -0,0 +1,367 @@
+"""
+Find new publication URLs from an org's sitemap.xml and RSS/Atom feeds.
+
+A refresh only needs the items published since the last run, and most sites
+already list those, with dates, in a few small XML files. discover() reads
+the feeds advertised on the homepage (plus the usual /feed paths) and the
+sitemaps from robots.txt or /sitemap.xml, and returns the item URLs newer
+than the high-water mark stored for each source in STATE_PATH. Sitemap
+indexes are walked lazily: child sitemaps whose lastmod hasn't moved are
+skipped.
+
+Items without a date fall back to a per-source set of seen URLs. The first
+run for a feed or sitemap only records what it already lists, so a refresh
+never hands out a site's whole back catalogue. After that a run returns at
+most MAX_NEW_PER_ORG items, and the state only advances over those, so a
+backlog is worked through over several runs. URLs the caller already has
+(known) are never returned; the state advances over them as if they were.
+
+Each site's state is kept under its host and the scraper's source id, since
+two scripts may read the same site for different orgs or extractors.
+
+The caller reports back with settle() which of the returned URLs it could
+not fetch or extract. Those stay pending for the site and are returned again,
+ahead of new items, on the next MAX_ATTEMPTS - 1 runs.
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+import http_client
+
+STATE_PATH = "discovery_state.json"
+
+FEED_PATHS = ["/feed", "/rss.xml", "/atom.xml", "/feed.xml", "/index.xml", "/blog/rss.xml"]
+FEED_TYPES = {"application/rss+xml", "application/atom+xml", "application/feed+json"}
+
+# Sitemap URLs worth extracting; everything else (team, jobs, events) is skipped
+PUBLICATION_PATH_HINTS = ["/research", "/publication", "/paper", "/blog", "/post", "/report", "/news"]
+
+MAX_CHILD_SITEMAPS = 20
+MAX_NEW_PER_ORG = 50
+
+# Runs a discovered URL is handed out before a failing one is given up on
+MAX_ATTEMPTS = 3
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def fetch(url):
+    """GET url, returning the body text or None."""
+    try:
+        response = http_client.get(url)
+    except http_client.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    return response.text
+
+
+def parse_date(text):
+    """Parse ISO 8601 or RFC 822 dates to an aware UTC datetime, else None."""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def local(tag):
+    """Element tag without its namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def children(element, name):
+    return [child for child in element if local(child.tag) == name]
+
+
+def child_text(element, name):
+    for child in element:
+        if local(child.tag) == name:
+            return (child.text or "").strip()
+    return ""
+
+
+def parse_xml(body):
+    try:
+        return ET.fromstring(body.encode("utf-8") if isinstance(body, str) else body)
+    except ET.ParseError:
+        return None
+
+
+def parse_feed(body, base_url):
+    """Items of an RSS 2.0 or Atom feed as dicts with url, id, date and title."""
+    root = parse_xml(body)
+    if root is None:
+        return []
+    items = []
+    if local(root.tag) == "feed":
+        for entry in children(root, "entry"):
+            link = next(
+                (l.get("href") for l in children(entry, "link") if l.get("rel", "alternate") == "alternate"),
+                None,
+            )
+            if not link:
+                continue
+            items.append({
+                "url": urljoin(base_url, link),
+                "id": child_text(entry, "id") or link,
+                "date": parse_date(child_text(entry, "published") or child_text(entry, "updated")),
+                "title": child_text(entry, "title"),
+            })
+    else:
+        for channel in children(root, "channel") or [root]:
+            for item in children(channel, "item"):
+                link = child_text(item, "link")
+                if not link:
+                    continue
+                items.append({
+                    "url": urljoin(base_url, link),
+                    "id": child_text(item, "guid") or link,
+                    "date": parse_date(child_text(item, "pubDate") or child_text(item, "date")),
+                    "title": child_text(item, "title"),
+                })
+    return items
+
+
+def parse_sitemap(body):
+    """Returns (kind, entries): kind is "index" or "urlset"; entries are (loc, lastmod)."""
+    root = parse_xml(body)
+    if root is None:
+        return "urlset", []
+    kind = "index" if local(root.tag) == "sitemapindex" else "urlset"
+    entries = []
+    for node in root:
+        loc = child_text(node, "loc")
+        if loc:
+            entries.append((loc, parse_date(child_text(node, "lastmod"))))
+    return kind, entries
+
+
+def site_root(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}/"
+
+
+def advertised_feeds(base_url, homepage):
+    """Feed URLs from the homepage's <link rel="alternate"> tags."""
+    if not homepage:
+        return []
+    soup = BeautifulSoup(homepage, "html.parser")
+    urls = [
+        urljoin(base_url, link["href"])
+        for link in soup.find_all("link", rel="alternate")
+        if link.get("type") in FEED_TYPES and link.get("href")
+    ]
+    return list(dict.fromkeys(urls))
+
+
+def sitemap_candidates(base_url):
+    robots = fetch(urljoin(base_url, "/robots.txt")) or ""
+    urls = [
+        line.split(":", 1)[1].strip()
+        for line in robots.splitlines()
+        if line.lower().startswith("sitemap:")
+    ]
+    return urls or [urljoin(base_url, "/sitemap.xml")]
+
+
+def looks_like_publication(url):
+    path = urlparse(url).path.lower()
+    return any(hint in path for hint in PUBLICATION_PATH_HINTS)
+
+
+def site_key(base_url, source=None):
+    """Key of a site's state: its host, prefixed by the source reading it."""
+    host = urlparse(base_url).hostname or base_url
+    return f"{source}:{host}" if source else host
+
+
+def newer(source_state, items):
+    """Items past the source's high-water mark that haven't been handed out yet."""
+    mark = parse_date(source_state.get("mark"))
+    seen = set(source_state.get("seen", []))
+    return [
+        item for item in items
+        if item["id"] not in seen and (item["date"] is None or mark is None or item["date"] > mark)
+    ]
+
+
+def advance(source_state, fresh, taken):
+    """
+    Record which of a source's fresh items were handed out (urls in taken).
+
+    The mark only moves up to just below the oldest fresh item left behind;
+    taken items past that, and undated ones, are remembered by id instead, so
+    whatever discover() cut off comes back on the next run.
+    """
+    mark = parse_date(source_state.get("mark"))
+    seen = set(source_state.get("seen", []))
+    left = [item["date"] for item in fresh if item["url"] not in taken and item["date"] is not None]
+    limit = min(left, default=None)
+    for item in fresh:
+        if item["url"] not in taken:
+            continue
+        date = item["date"]
+        if date is not None and (limit is None or date < limit):
+            if mark is None or date > mark:
+                mark = date
+        else:
+            seen.add(item["id"])
+    if mark is not None:
+        source_state["mark"] = mark.isoformat()
+    source_state["seen"] = sorted(seen)
+
+
+def sitemap_items(sitemap_url, state, lastmods, depth=0):
+    """
+    URL entries of a sitemap, descending into index children that changed.
+
+    Returns None if the sitemap couldn't be fetched. The lastmod of each child
+    read successfully goes in lastmods; the caller copies those into state once
+    the child's items have all been handed out.
+    """
+    body = fetch(sitemap_url)
+    if not body:
+        return None
+    kind, entries = parse_sitemap(body)
+    if kind == "urlset":
+        return [
+            {"url": loc, "id": loc, "date": lastmod, "title": ""}
+            for loc, lastmod in entries
+            if looks_like_publication(loc)
+        ]
+    if depth > 0:
+        return []
+
+    items = []
+    for loc, lastmod in entries[:MAX_CHILD_SITEMAPS]:
+        known = parse_date(state.get(loc, {}).get("lastmod"))
+        if lastmod is not None and known is not None and lastmod <= known:
+            continue
+        children = sitemap_items(loc, state, lastmods, depth + 1)
+        if children is None:
+            continue
+        items += children
+        if lastmod is not None:
+            lastmods[loc] = lastmod.isoformat()
+    return items
+
+
+def discover(base_url, state, homepage=None, source=None, known=()):
+    """
+    New item URLs for one site since the last run, oldest first.
+
+    URLs left pending by settle() come first. At most MAX_NEW_PER_ORG are
+    returned; the rest stay new for the next run. Feeds and sitemaps read for
+    the first time return nothing, and URLs in known are skipped. state is
+    the dict from load_state(), kept per site_key(base_url, source); it is
+    updated in place, for the returned items only, and should be passed to
+    settle() and saved with save_state() once they have been processed.
+    """
+    site = state.setdefault(site_key(base_url, source), {})
+    known = set(known)
+    retry = list(site.get("pending", {}))[:MAX_NEW_PER_ORG]
+    if homepage is None:
+        homepage = fetch(base_url)
+
+    found = {}
+    # (source state, its fresh items, child sitemap lastmods to record)
+    sources = []
+    feeds = advertised_feeds(base_url, homepage)
+    defaults = [urljoin(base_url, path) for path in FEED_PATHS if urljoin(base_url, path) not in feeds]
+    have_feed = False
+    for feed_url in feeds + defaults:
+        # Only probe the default paths while no feed has been found
+        if have_feed and feed_url in defaults:
+            break
+        body = fetch(feed_url)
+        items = parse_feed(body, feed_url) if body else []
+        if not items:
+            continue
+        have_feed = True
+        source_state = site.setdefault(feed_url, {})
+        sources.append((source_state, newer(source_state, items), {}))
+
+    children_state = site.setdefault("sitemaps", {})
+    for sitemap_url in sitemap_candidates(base_url):
+        lastmods = {}
+        items = sitemap_items(sitemap_url, children_state, lastmods)
+        if items is None:
+            continue
+        source_state = site.setdefault(sitemap_url, {})
+        sources.append((source_state, newer(source_state, items), lastmods))
+
+    # A source read for the first time is only a baseline: all of it is
+    # recorded as handed out, none of it returned
+    for source_state, fresh, _ in sources:
+        if "seen" not in source_state:
+            continue
+        for item in fresh:
+            if item["url"] not in retry and item["url"] not in known:
+                found.setdefault(item["url"], item)
+
+    # Oldest first, so a capped run leaves the newest for next time and the
+    # marks can still move; undated items last
+    epoch = datetime.min.replace(tzinfo=timezone.utc)
+    ordered = sorted(found.values(), key=lambda item: (item["date"] is None, item["date"] or epoch))
+    room = MAX_NEW_PER_ORG - len(retry)
+    taken = {item["url"] for item in ordered[:room]}
+
+    for source_state, fresh, lastmods in sources:
+        if "seen" in source_state:
+            handed_out = taken | known
+        else:
+            handed_out = {item["url"] for item in fresh}
+        advance(source_state, fresh, handed_out)
+        # A child sitemap is only skipped next time once nothing in it was cut off
+        if all(item["url"] in handed_out for item in fresh):
+            for loc, lastmod in lastmods.items():
+                children_state.setdefault(loc, {})["lastmod"] = lastmod
+    return retry + [item["url"] for item in ordered[:room]]
+
+
+def settle(state, base_url, urls, failed, source=None):
+    """
+    Record how discover()'s urls for base_url went; failed is those that weren't processed.
+
+    Failed URLs stay pending and are handed out again, until they have failed
+    MAX_ATTEMPTS times. The rest are dropped from pending. source is the one
+    passed to discover().
+    """
+    site = state.setdefault(site_key(base_url, source), {})
+    pending = site.setdefault("pending", {})
+    failed = set(failed)
+    for url in urls:
+        attempts = pending.pop(url, 0) + 1
+        if url in failed and attempts < MAX_ATTEMPTS:
+            pending[url] = attempts
+    if not pending:
+        del site["pending"]
@@ -0,0 +1,65 @@
+"""
+Export ai_safety_orgs.json to the web app and rebuild derived artifacts.
+
+Copies the dataset to web/app/data.json, stamps it with a content hash in
+web/app/dataset_version.json and rebuilds the BM25 search index. The API
+routes key their response cache on this version, so a refresh invalidates
+cached answers automatically.
+
+It then rebuilds the semantic index with build_embedding_index.py. That
+needs requirements-embeddings.txt (torch and the model download), which is
+why it runs here rather than in the Netlify build: the web artifacts are
+committed next to search_index.json. Without those packages the step is
+skipped and /api/match ignores the stale index until the next full export.
+"""
+
+import json
+from datetime import datetime, timezone
+
+import build_search_index
+from build_search_index import DATA_PATH, dataset_version
+
+SOURCE_PATH = "ai_safety_orgs.json"
+VERSION_PATH = "web/app/dataset_version.json"
+
+
+def write_version():
+    """Hash the exported dataset and write the version file."""
+    version = dataset_version(DATA_PATH)
+    with open(VERSION_PATH, "w") as f:
+        json.dump({
+            "version": version,
+            "exported_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }, f, indent=2)
+    return version
+
+
+def build_embeddings():
+    """Rebuild the embedding index, or say why it was skipped."""
+    try:
+        import build_embedding_index
+    except ImportError as e:
+        print(f"⚠ Skipped the embedding index ({e.name} not installed); "
+              "pip install -r requirements-embeddings.txt and re-export")
+        return
+    build_embedding_index.build()
+
+
+def main(embeddings=True):
+    with open(SOURCE_PATH, "r") as f:
+        orgs = json.load(f)
+
+    with open(DATA_PATH, "w") as f:
+        json.dump(orgs, f, indent=2)
+    print(f"✓ Exported {len(orgs)} orgs to {DATA_PATH}")
+
+    version = write_version()
+    print(f"✓ Dataset version {version} written to {VERSION_PATH}")
+
+    build_search_index.main()
+    if embeddings:
+        build_embeddings()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,713 @@
+"""
+Shared Claude extraction client for the scrapers.
+
+Instead of asking for JSON text and stripping code fences, every call forces
+the model to call a tool whose input_schema describes the records we want.
+The tool input is validated against that schema; only the top-level fields
+that fail are sent back for repair, and anything still invalid is salvaged
+item by item rather than throwing the whole (paid-for) response away. Before
+validating, enum strings are conformed: wrong case is fixed and status words
+the schema doesn't list ("Ongoing", "Planned") become "Unknown", so an item
+isn't dropped over its status.
+
+Parse and validation failures are counted in STATS; call print_stats() at the
+end of a run to see the failure rate.
+
+All calls share one RateLimiter that budgets requests and input/output tokens
+per minute and backs off on the API's rate-limit headers, so extract_all()
+can run several extractions concurrently without tripping 429s.
+
+Callers pass static instructions and put everything that varies per page
+(org name, page text) in the content. The tool schema, system prompt and
+instructions form a fixed prefix that is marked for prompt caching, so
+repeated pages only pay full price for their own content. A prefix shorter
+than the model's minimum cacheable length is simply not cached.
+print_stats() reports how many input tokens were read from the cache.
+
+Unless a caller pins a model, extract() routes each page through a cascade:
+pages up to FAST_MAX_CHARS go to FAST_MODEL first, and the result is
+escalated to MODEL only if it fails validation, was cut off, came back empty
+for a substantial page, or the model reports low confidence.
+
+Each tier's attempt is an "llm" tracing span, named by model and by the first
+line of its instructions, carrying its calls, retries and token usage. Waits
+for the rate budget are left out of its duration. Those amounts also add up
+in the span of whatever the caller was doing (a run_sources extract stage).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from anthropic import Anthropic, APIConnectionError, APIStatusError
+from dotenv import load_dotenv
+
+import tracing
+from page_metadata import format_hints, own_paper
+from site_extractors import fit_first
+
+MODEL = "claude-sonnet-4-20250514"
+FAST_MODEL = os.getenv("EXTRACTION_FAST_MODEL", "claude-3-5-haiku-20241022")
+TOOL_NAME = "record_extraction"
+REPAIR_TOOL_NAME = "repair_fields"
+
+# Repair round-trips per extraction before salvaging what validates
+MAX_REPAIRS = 1
+
+# Account budgets per minute and concurrency (override via env)
+REQUESTS_PER_MINUTE = int(os.getenv("ANTHROPIC_RPM", "50"))
+INPUT_TOKENS_PER_MINUTE = int(os.getenv("ANTHROPIC_INPUT_TPM", "30000"))
+OUTPUT_TOKENS_PER_MINUTE = int(os.getenv("ANTHROPIC_OUTPUT_TPM", "8000"))
+MAX_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+
+# Retries for 429/5xx/connection errors, on top of header-driven pauses;
+# the nth retry first pauses every call for RETRY_BACKOFF * 2**n seconds
+MAX_API_RETRIES = 4
+RETRY_BACKOFF = 1.0
+
+# Cascade routing: longer pages skip the fast model; its answers below
+# MIN_CONFIDENCE, or empty for pages over EMPTY_SUSPECT_CHARS, are escalated
+FAST_MAX_CHARS = 20000
+MIN_CONFIDENCE = 0.7
+EMPTY_SUSPECT_CHARS = 3000
+
+CONFIDENCE_FIELD = {
+    "type": "number",
+    "description": "0-1: how confident you are that every relevant item on the page was captured accurately",
+}
+
+# Status words the model uses for what PROJECT's enum calls Active/Completed;
+# any other status becomes "Unknown" (see conform())
+STATUS_ALIASES = {
+    "ongoing": "Active", "in progress": "Active", "in-progress": "Active", "current": "Active",
+    "running": "Active", "active research": "Active",
+    "complete": "Completed", "finished": "Completed", "done": "Completed", "concluded": "Completed",
+}
+
+FOCUS_AREAS = [
+    "Evals", "Interpretability", "Alignment", "Governance", "Policy",
+    "Biosecurity", "Cyber", "Control", "Monitoring", "Benchmarks",
+]
+
+PERSON = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "role": {"type": "string"},
+    },
+    "required": ["name"],
+}
+
+PROJECT = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "description": {"type": "string", "description": "Brief description"},
+        "status": {"type": "string", "enum": ["Active", "Completed", "Unknown", "published"]},
+        "paper_url": {"type": "string", "description": "URL if available, otherwise empty string"},
+    },
+    "required": ["name"],
+}
+
+BENCHMARK = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "measures": {"type": "string", "description": "What it measures"},
+        "paper_url": {"type": "string"},
+        "status": {"type": "string"},
+    },
+    "required": ["name"],
+}
+
+PUBLICATION = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "description": "Paper title"},
+        "description": {"type": "string", "description": "Brief description or abstract (1-2 sentences max)"},
+        "url": {"type": "string", "description": "Link to the paper if available"},
+        "status": {"type": "string", "enum": ["published"]},
+        "authors": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["name"],
+}
+
+# Org overview pages (scraper.py, add_orgs.py, fix_orgs.py)
+ORG_PROFILE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "mission": {"type": "string", "description": "1-2 sentence summary of what they do"},
+        "focus_areas": {"type": "array", "items": {"type": "string", "enum": FOCUS_AREAS}},
+        "key_people": {"type": "array", "items": PERSON},
+        "projects": {"type": "array", "items": PROJECT},
+        "benchmarks": {"type": "array", "items": BENCHMARK},
+        "notes": {"type": "string", "description": "Anything else notable"},
+    },
+}
+
+# Research/project listing pages (scrape_all_orgs.py and friends)
+RESEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "projects": {"type": "array", "items": PROJECT},
+        "benchmarks": {"type": "array", "items": BENCHMARK},
+        "key_people": {"type": "array", "items": PERSON},
+    },
+    "required": ["projects"],
+}
+
+# Publication listing pages (scrape_research_orgs.py and friends)
+PUBLICATIONS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "publications": {"type": "array", "items": PUBLICATION},
+    },
+    "required": ["publications"],
+}
+
+STATS = {
+    "calls": 0,
+    "parse_failures": 0,
+    "repairs": 0,
+    "repaired_fields": 0,
+    "conformed_values": 0,
+    "dropped_fields": 0,
+    "dropped_items": 0,
+    "api_retries": 0,
+    "input_tokens": 0,
+    "cache_read_tokens": 0,
+    "cache_write_tokens": 0,
+    "output_tokens": 0,
+    "fast_attempts": 0,
+    "escalations": 0,
+    "direct_to_large": 0,
+    "rule_hits": 0,
+    "metadata_hits": 0,
+    "metadata_hints": 0,
+    "resumed": 0,
+}
+
+# Wall-clock seconds per model tier: {model: [extractions, seconds]}
+LATENCY = {}
+
+_client = None
+_stats_lock = threading.Lock()
+
+
+def get_client():
+    """Create the Anthropic client on first use. Retries are handled in create()."""
+    global _client
+    if _client is None:
+        load_dotenv()
+        _client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
+    return _client
+
+
+def count(key, n=1):
+    with _stats_lock:
+        STATS[key] += n
+
+
+def record_latency(model, seconds):
+    with _stats_lock:
+        entry = LATENCY.setdefault(model, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+class RateLimiter:
+    """Sliding one-minute budget for requests, input tokens and output tokens."""
+
+    def __init__(self, rpm, input_tpm, output_tpm, period=60.0):
+        self.rpm = rpm
+        self.input_tpm = input_tpm
+        self.output_tpm = output_tpm
+        self.period = period  # the "minute", in seconds; tests shorten it
+        self.window = deque()  # [started_at, input_tokens, output_tokens]
+        self.paused_until = 0.0
+        self.cond = threading.Condition()
+
+    def _expire(self, now):
+        while self.window and now - self.window[0][0] >= self.period:
+            self.window.popleft()
+
+    def acquire(self, input_tokens, output_tokens):
+        """Block until the request fits the budget. Returns a handle for settle()."""
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                used_in = sum(e[1] for e in self.window)
+                used_out = sum(e[2] for e in self.window)
+                fits = (
+                    len(self.window) < self.rpm
+                    and used_in + input_tokens <= self.input_tpm
+                    and used_out + output_tokens <= self.output_tpm
+                )
+                # An oversized request still goes through once the window is empty
+                if now >= self.paused_until and (fits or not self.window):
+                    entry = [now, input_tokens, output_tokens]
+                    self.window.append(entry)
+                    return entry
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    wait = self.period - (now - self.window[0][0])
+                self.cond.wait(timeout=max(wait, 0.05))
+
+    def settle(self, entry, input_tokens, output_tokens):
+        """Replace a request's estimated usage with the real numbers."""
+        with self.cond:
+            entry[1] = input_tokens
+            entry[2] = output_tokens
+            self.cond.notify_all()
+
+    def pause(self, seconds):
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def observe(self, headers):
+        """Pause on retry-after, or until reset when any budget is exhausted."""
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                self.pause(float(retry_after))
+            except ValueError:
+                pass
+        for kind in ("requests", "input-tokens", "output-tokens", "tokens"):
+            remaining = headers.get(f"anthropic-ratelimit-{kind}-remaining")
+            reset = headers.get(f"anthropic-ratelimit-{kind}-reset")
+            if remaining == "0" and reset:
+                try:
+                    reset_at = datetime.fromisoformat(reset.replace("Z", "+00:00"))
+                except ValueError:
+                    continue
+                self.pause((reset_at - datetime.now(timezone.utc)).total_seconds())
+
+
+limiter = RateLimiter(REQUESTS_PER_MINUTE, INPUT_TOKENS_PER_MINUTE, OUTPUT_TOKENS_PER_MINUTE)
+
+
+def estimate_tokens(*parts):
+    """Rough input-token estimate (~4 chars per token) used for budgeting."""
+    return sum(len(str(part)) for part in parts if part) // 4
+
+
+def validate(schema, value, path="$"):
+    """Check value against the JSON-schema subset used here. Returns a list of errors."""
+    kind = schema.get("type")
+    if kind == "object":
+        ok = isinstance(value, dict)
+    elif kind == "array":
+        ok = isinstance(value, list)
+    elif kind == "string":
+        ok = isinstance(value, str)
+    elif kind == "boolean":
+        ok = isinstance(value, bool)
+    elif kind == "integer":
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    elif kind == "number":
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        ok = True
+    if not ok:
+        return [f"{path}: expected {kind}, got {type(value).__name__}"]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if kind == "object":
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"{path}.{name}: missing")
+        for name, subschema in schema.get("properties", {}).items():
+            if name in value:
+                errors.extend(validate(subschema, value[name], f"{path}.{name}"))
+    elif kind == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate(schema["items"], item, f"{path}[{i}]"))
+
+    return errors
+
+
+def conform(schema, value):
+    """
+    value with its enum strings mapped onto the schema's values where possible.
+
+    Case differences and STATUS_ALIASES are fixed; other values become
+    "Unknown" if the enum has it, or the enum's only value if it has one
+    (a publication's "published"), and are left for validate() otherwise.
+    """
+    kind = schema.get("type")
+    if kind == "object" and isinstance(value, dict):
+        properties = schema.get("properties", {})
+        return {k: conform(properties[k], v) if k in properties else v for k, v in value.items()}
+    if kind == "array" and isinstance(value, list) and "items" in schema:
+        return [conform(schema["items"], item) for item in value]
+    if kind == "string" and isinstance(value, str) and "enum" in schema and value not in schema["enum"]:
+        by_lower = {option.lower(): option for option in schema["enum"]}
+        key = value.strip().lower()
+        conformed = by_lower.get(key) or by_lower.get(STATUS_ALIASES.get(key, "").lower())
+        if conformed is None and "Unknown" in schema["enum"]:
+            conformed = "Unknown"
+        elif conformed is None and len(schema["enum"]) == 1:
+            conformed = schema["enum"][0]
+        if conformed is not None:
+            count("conformed_values")
+            return conformed
+    return value
+
+
+def check_fields(schema, data):
+    """Validate each top-level field separately. Returns {field: [errors]}."""
+    failed = {}
+    for name, subschema in schema["properties"].items():
+        if name in data:
+            errors = validate(subschema, data[name], f"$.{name}")
+            if errors:
+                failed[name] = errors
+        elif name in schema.get("required", []):
+            failed[name] = [f"$.{name}: missing"]
+    return failed
+
+
+def tool_call(response, name):
+    """Return the tool_use block for name, or None."""
+    for block in response.content:
+        if block.type == "tool_use" and block.name == name:
+            return block
+    return None
+
+
+def salvage(schema, data, failed):
+    """Keep the valid items of failed array fields; drop other failed fields."""
+    result = {k: v for k, v in data.items() if k in schema["properties"] and k not in failed}
+    for name in failed:
+        subschema = schema["properties"][name]
+        value = data.get(name)
+        if subschema.get("type") == "array" and isinstance(value, list):
+            kept = [item for item in value if not validate(subschema["items"], item)]
+            count("dropped_items", len(value) - len(kept))
+            result[name] = kept
+        else:
+            count("dropped_fields")
+    return result
+
+
+def retryable(error):
+    """Rate limits (429), server errors and overloads (5xx, 529) and connection failures."""
+    status = getattr(error, "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+
+def create(messages, tools, tool_name, system=None, max_tokens=4000, model=MODEL):
+    """Call the model within the rate budget and force it to use tool_name."""
+    kwargs = {}
+    if system:
+        kwargs["system"] = system
+    estimate = estimate_tokens(messages, tools, system)
+
+    for attempt in range(MAX_API_RETRIES + 1):
+        waiting = time.monotonic()
+        entry = limiter.acquire(estimate, max_tokens)
+        tracing.exclude(time.monotonic() - waiting)
+        try:
+            raw = get_client().messages.with_raw_response.create(
+                model=model,
+                max_tokens=max_tokens,
+                tools=tools,
+                tool_choice={"type": "tool", "name": tool_name},
+                messages=messages,
+                **kwargs,
+            )
+        except (APIStatusError, APIConnectionError) as e:
+            limiter.settle(entry, 0, 0)
+            if attempt == MAX_API_RETRIES or not retryable(e):
+                raise
+            count("api_retries")
+            tracing.add(api_retries=1)
+            headers = getattr(getattr(e, "response", None), "headers", None)
+            if headers is not None:
+                limiter.observe(headers)
+            limiter.pause(RETRY_BACKOFF * 2 ** attempt)
+            continue
+
+        response = raw.parse()
+        usage = response.usage
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        limiter.observe(raw.headers)
+        # Cache reads don't count against the input-tokens-per-minute limit
+        limiter.settle(entry, usage.input_tokens + cache_write, usage.output_tokens)
+        count("input_tokens", usage.input_tokens)
+        count("cache_read_tokens", cache_read)
+        count("cache_write_tokens", cache_write)
+        count("output_tokens", usage.output_tokens)
+        tracing.add(calls=1, input_tokens=usage.input_tokens, cache_read_tokens=cache_read,
+                    cache_write_tokens=cache_write, output_tokens=usage.output_tokens)
+        return response
+
+
+def extract(instructions, content, schema, system=None, max_tokens=4000, model=None):
+    """
+    Extract schema-shaped data from content.
+
+    instructions should be the same for every page of a run: together with
+    system and the schema it is sent as a cached prefix, and only content
+    goes in the user turn.
+
+    With model=None the page is routed through the FAST_MODEL -> MODEL
+    cascade; pass a model to use it directly.
+
+    Returns a dict containing only fields that validate. API errors propagate
+    to the caller; schema problems are repaired or salvaged, never raised.
+    """
+    if model is not None:
+        return run_tier(instructions, content, schema, system, max_tokens, model)[0]
+
+    if not FAST_MODEL or len(content) > FAST_MAX_CHARS:
+        count("direct_to_large")
+        return run_tier(instructions, content, schema, system, max_tokens, MODEL)[0]
+
+    count("fast_attempts")
+    graded = {**schema, "properties": {**schema["properties"], "confidence": CONFIDENCE_FIELD}}
+    graded["required"] = schema.get("required", []) + ["confidence"]
+    result, problems = run_tier(instructions, content, graded, system, max_tokens, FAST_MODEL, repairs=0)
+    confidence = result.pop("confidence", None)
+
+    reason = escalation_reason(schema, content, result, problems, confidence)
+    if reason is None:
+        return result
+    count("escalations")
+    tracing.annotate(escalated=reason)
+    return run_tier(instructions, content, schema, system, max_tokens, MODEL)[0]
+
+
+def escalation_reason(schema, content, result, problems, confidence):
+    """Why a fast-tier result isn't good enough, or None if it is."""
+    if problems:
+        return problems
+    if not isinstance(confidence, (int, float)) or confidence < MIN_CONFIDENCE:
+        return f"confidence {confidence}"
+    arrays = [name for name, sub in schema["properties"].items() if sub.get("type") == "array"]
+    if arrays and len(content) > EMPTY_SUSPECT_CHARS and not any(result.get(name) for name in arrays):
+        return f"no items from {len(content)} chars"
+    return None
+
+
+def prompt_name(instructions):
+    """First line of a prompt's instructions: how the trace tells prompts apart."""
+    return next((line.strip() for line in instructions.splitlines() if line.strip()), "")[:80]
+
+
+def run_tier(instructions, content, schema, system, max_tokens, model, repairs=MAX_REPAIRS):
+    """
+    One extraction (plus up to `repairs` repair rounds) on a single model.
+
+    Returns (result, problems) where problems describes anything that had to
+    be salvaged or a truncated response, or is None for a clean result.
+    """
+    with tracing.span("llm", model=model, prompt=prompt_name(instructions), chars=len(content)) as span:
+        result, problems = _run_tier(instructions, content, schema, system, max_tokens, model, repairs)
+        if problems:
+            span.set(problems=problems)
+        return result, problems
+
+
+def _run_tier(instructions, content, schema, system, max_tokens, model, repairs):
+    started = time.monotonic()
+    tool = {
+        "name": TOOL_NAME,
+        "description": "Record the structured data extracted from the page.",
+        "input_schema": schema,
+    }
+    # Tools, then system, form the prompt prefix; cache up to the instructions
+    system = [{"type": "text", "text": system}] if system else []
+    system.append({"type": "text", "text": instructions, "cache_control": {"type": "ephemeral"}})
+    messages = [{"role": "user", "content": content}]
+
+    response = create(messages, [tool], TOOL_NAME, system, max_tokens, model)
+    count("calls")
+    truncated = response.stop_reason == "max_tokens"
+
+    block = tool_call(response, TOOL_NAME)
+    data = conform(schema, block.input) if block and isinstance(block.input, dict) else {}
+    failed = check_fields(schema, data) if block else {name: ["no tool call"] for name in schema["properties"]}
+    if failed:
+        count("parse_failures")
+
+    for _ in range(repairs):
+        if not failed or block is None:
+            break
+
+        # Send back only the broken fields and ask for those again
+        repair_schema = {
+            "type": "object",
+            "properties": {name: schema["properties"][name] for name in failed},
+            "required": list(failed),
+        }
+        repair_tool = {
+            "name": REPAIR_TOOL_NAME,
+            "description": "Resubmit only the fields that failed validation.",
+            "input_schema": repair_schema,
+        }
+        problems = "\n".join(error for errors in failed.values() for error in errors[:5])
+        messages = messages + [
+            {"role": "assistant", "content": response.content},
+            {"role": "user", "content": [{
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "is_error": True,
+                "content": f"These fields failed schema validation:\n{problems}\n\n"
+                           f"Call {REPAIR_TOOL_NAME} with corrected values for: {', '.join(failed)}.",
+            }]},
+        ]
+
+        response = create(messages, [tool, repair_tool], REPAIR_TOOL_NAME, system, max_tokens, model)
+        count("calls")
+        count("repairs")
+
+        repair_block = tool_call(response, REPAIR_TOOL_NAME)
+        if repair_block is None or not isinstance(repair_block.input, dict):
+            break
+        fixed = conform(repair_schema, {k: v for k, v in repair_block.input.items() if k in failed})
+        data = {**data, **fixed}
+        still_failed = check_fields(repair_schema, fixed)
+        count("repaired_fields", len(failed) - len(still_failed))
+        failed = still_failed
+        block = repair_block
+
+    record_latency(model, time.monotonic() - started)
+    if failed:
+        problems = f"invalid fields: {', '.join(failed)}"
+    elif truncated:
+        problems = "response hit max_tokens"
+    else:
+        problems = None
+    return salvage(schema, data, failed), problems
+
+
+def run_job(job, journal=None):
+    """
+    Run one extract_all() job on the calling thread; see extract_all().
+
+    Pipelines that schedule their own workers call this directly.
+    """
+    job = dict(job)
+    key = job.pop("key", None)
+    if journal is None or key is None:
+        return _run_job(job)
+    if key in journal:
+        count("resumed")
+        tracing.annotate(route="journal")
+        return journal.get(key)
+    result = _run_job(job)
+    if result is not None:
+        journal.record(key, result)
+    return result
+
+
+def _run_job(job):
+    label = job.pop("label", "")
+    url = job.pop("url", None)
+    cleaned = job.pop("cleaned", None)
+    # Parsed in the html_clean pool, so nothing here reads the HTML again
+    if url and cleaned and cleaned.get("metadata") is not None:
+        data = fit_first(cleaned["rules"], job["schema"])
+        if data is not None:
+            count("rule_hits")
+            tracing.annotate(route="rules")
+            return data
+        metadata = cleaned["metadata"]
+        paper = own_paper(metadata, url)
+        if paper is not None and set(job["schema"]["properties"]) == {"publications"}:
+            count("metadata_hits")
+            tracing.annotate(route="metadata")
+            return {"publications": [paper]}
+        if metadata["hints"] or metadata["publications"]:
+            count("metadata_hints")
+            job["content"] = format_hints(metadata["hints"], metadata["publications"]) + job["content"]
+    tracing.annotate(route="model")
+    try:
+        return extract(**job)
+    except Exception as e:
+        print(f"    LLM error{f' ({label})' if label else ''}: {e}")
+        tracing.fail(f"LLM error: {e}")
+        return None
+
+
+def extract_all(jobs, max_workers=MAX_WORKERS, journal=None):
+    """
+    Run extract(**job) for every job concurrently.
+
+    Each job is a dict of extract() keyword arguments plus an optional
+    "label" used in error messages. Jobs that also carry the page's "url" and
+    its html_clean result ("cleaned") are first offered to the site_extractors
+    rules the cleaning worker ran. A single paper's own page whose job asks
+    only for publications is answered from its citation/JSON-LD metadata;
+    every other page goes to the model, with any metadata the page carries
+    prepended as hints. Results come back in job order so merges stay
+    deterministic; a job whose API call fails yields None.
+
+    jobs may be a generator: each job is submitted as soon as it is yielded,
+    so extraction overlaps with whatever is still producing pages.
+
+    With a run_journal.Journal, jobs that carry a "key" are resumable: a key
+    already in the journal returns its recorded result without any work, and
+    each new non-None result is recorded the moment it finishes.
+
+    Each job is an "extract" tracing span, with its model calls nested under it.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda job: traced_job(job, journal), jobs))
+
+
+def traced_job(job, journal=None):
+    """run_job() as an "extract" span, for scripts that don't run it from a pipeline stage."""
+    with tracing.span("extract", label=job.get("label"), url=job.get("url")):
+        return run_job(job, journal)
+
+
+def parse_failure_rate():
+    first_calls = STATS["calls"] - STATS["repairs"]
+    return STATS["parse_failures"] / first_calls if first_calls else 0.0
+
+
+def cache_hit_rate():
+    total = STATS["input_tokens"] + STATS["cache_read_tokens"] + STATS["cache_write_tokens"]
+    return STATS["cache_read_tokens"] / total if total else 0.0
+
+
+def print_stats():
+    """Print a summary of extraction health and token usage for this run."""
+    print(
+        f"Extraction: {STATS['calls']} calls, "
+        f"{parse_failure_rate():.1%} parse failures, "
+        f"{STATS['repaired_fields']} fields repaired, "
+        f"{STATS['conformed_values']} enum values conformed, "
+        f"{STATS['dropped_fields']} fields / {STATS['dropped_items']} items dropped, "
+        f"{STATS['rule_hits']} pages handled by site rules, "
+        f"{STATS['metadata_hits']} by page metadata ({STATS['metadata_hints']} more got hints)"
+    )
+    if STATS["resumed"]:
+        print(f"Resumed: {STATS['resumed']} pages taken from the run journal")
+    print(
+        f"Tokens: {STATS['input_tokens']} uncached in, "
+        f"{STATS['cache_read_tokens']} cache read, "
+        f"{STATS['cache_write_tokens']} cache write "
+        f"({cache_hit_rate():.1%} of input from cache), "
+        f"{STATS['output_tokens']} out"
+    )
+    if STATS["fast_attempts"] or STATS["direct_to_large"]:
+        rate = STATS["escalations"] / STATS["fast_attempts"] if STATS["fast_attempts"] else 0.0
+        print(
+            f"Routing: {STATS['fast_attempts']} fast attempts, "
+            f"{STATS['escalations']} escalated ({rate:.1%}), "
+            f"{STATS['direct_to_large']} sent straight to {MODEL}"
+        )
+    for model, (n, seconds) in LATENCY.items():
+        print(f"  {model}: {n} extractions, {seconds / n:.1f}s avg")
@@ -0,0 +1,212 @@
+"""
+WARC archive of every fetch, and offline replay from it.
+
+Every response the HTTP client receives is appended to a gzipped WARC file
+under ARCHIVE_DIR as a "response" record. Every page Playwright renders is
+appended as a "resource" record with WARC-Fetch-Method: browser. Each run
+writes its own file, archive/<timestamp>-<pid>.warc.gz. Each record is a
+separate gzip member, so the files work with standard WARC tools (warcio,
+pywb). Bodies are stored as the client saw them after decompression, so the
+recorded headers drop Content-Encoding and carry the real Content-Length.
+Set FETCH_ARCHIVE_DIR= (empty) to turn archiving off.
+
+With FETCH_REPLAY set to an archive file or a directory of them, the HTTP
+client and fetcher answer from the archive and never touch the network. If
+a URL was recorded more than once, the newest record wins. Requests the
+archive doesn't have fail like an unreachable host. Replay makes prompt and
+extractor changes quick to try and gives benchmarks fixed inputs. The model
+API is not replayed, since that is usually what is being changed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.message import Message
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+ARCHIVE_DIR = os.getenv("FETCH_ARCHIVE_DIR", "archive")
+REPLAY_PATH = os.getenv("FETCH_REPLAY", "")
+
+# Headers that describe the wire encoding, not the stored body
+WIRE_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+_writer = None
+_replay = None
+_lock = threading.Lock()
+
+
+def request_digest(json_body=None, data=None):
+    """Stable digest of a request body, so POSTs with different payloads stay apart."""
+    if json_body is not None:
+        payload = json.dumps(json_body, sort_keys=True).encode()
+    elif isinstance(data, dict):
+        payload = urlencode(sorted(data.items())).encode()
+    elif data is not None:
+        payload = data if isinstance(data, bytes) else str(data).encode()
+    else:
+        return ""
+    return "sha1:" + hashlib.sha1(payload).hexdigest()
+
+
+def record_key(method, url, digest=""):
+    return f"{method.upper()} {url} {digest}"
+
+
+class ArchiveWriter:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, warc_type, url, block, content_type, extra=None):
+        fields = {
+            "WARC-Type": warc_type,
+            "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+            "WARC-Date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "WARC-Target-URI": url,
+            **(extra or {}),
+            "Content-Type": content_type,
+            "Content-Length": str(len(block)),
+        }
+        head = "WARC/1.1\r\n" + "".join(f"{name}: {value}\r\n" for name, value in fields.items()) + "\r\n"
+        member = gzip.compress(head.encode() + block + b"\r\n\r\n")
+        with self.lock:
+            with open(self.path, "ab") as f:
+                f.write(member)
+
+    def record_response(self, method, url, status_code, headers, body, final_url=None, digest=""):
+        lines = [f"HTTP/1.1 {status_code} {reason(status_code)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items() if name.lower() not in WIRE_HEADERS]
+        lines.append(f"Content-Length: {len(body)}")
+        block = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", errors="replace") + body
+        extra = {"WARC-Request-Method": method.upper()}
+        if final_url and final_url != url:
+            extra["WARC-Final-URI"] = final_url
+        if digest:
+            extra["WARC-Request-Digest"] = digest
+        self.write("response", url, block, "application/http; msgtype=response", extra)
+
+    def record_rendered(self, url, html):
+        self.write("resource", url, html.encode("utf-8"), "text/html; charset=utf-8",
+                   {"WARC-Fetch-Method": "browser"})
+
+
+def reason(status_code):
+    try:
+        return HTTPStatus(status_code).phrase
+    except ValueError:
+        return ""
+
+
+def read_records(path):
+    """Yield (warc headers dict, block bytes) for every record in a .warc.gz file."""
+    with gzip.open(path, "rb") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            headers = {}
+            while True:
+                line = f.readline().decode("utf-8", errors="replace").rstrip("\r\n")
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip()] = value.strip()
+            block = f.read(int(headers.get("Content-Length", 0)))
+            f.readline()
+            f.readline()
+            yield headers, block
+
+
+def parse_http_block(block):
+    """(status_code, headers dict, body) from an application/http response block."""
+    head, _, body = block.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status_code = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip()] = value.strip()
+    return status_code, headers, body
+
+
+def charset(headers):
+    content_type = next((value for name, value in headers.items() if name.lower() == "content-type"), "")
+    if not content_type:
+        return None
+    message = Message()
+    message["Content-Type"] = content_type
+    return message.get_param("charset")
+
+
+class Replay:
+    def __init__(self, path):
+        paths = [path]
+        if os.path.isdir(path):
+            paths = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".warc.gz"))
+        self.responses = {}  # record_key -> (status, headers, body, final_url)
+        self.rendered = {}  # url -> html
+        for archive in paths:
+            for headers, block in read_records(archive):
+                url = headers.get("WARC-Target-URI", "")
+                if headers.get("WARC-Type") == "response":
+                    status_code, http_headers, body = parse_http_block(block)
+                    key = record_key(headers.get("WARC-Request-Method", "GET"), url,
+                                     headers.get("WARC-Request-Digest", ""))
+                    self.responses[key] = (status_code, http_headers, body, headers.get("WARC-Final-URI", url))
+                elif headers.get("WARC-Type") == "resource" and headers.get("WARC-Fetch-Method") == "browser":
+                    self.rendered[url] = block.decode("utf-8", errors="replace")
+        print(f"Replaying {len(self.responses)} responses and {len(self.rendered)} rendered pages from {path}")
+
+    def response(self, method, url, digest=""):
+        """(status, headers, body, final_url) recorded for a request, or None."""
+        found = self.responses.get(record_key(method, url, digest))
+        if found is None and method.upper() == "HEAD":
+            # A page fetched with GET answers a later liveness probe too
+            found = self.responses.get(record_key("GET", url))
+            if found is not None:
+                found = (found[0], found[1], b"", found[3])
+        return found
+
+    def page(self, url):
+        """The rendered page if the browser fetched it, else None."""
+        return self.rendered.get(url)
+
+
+def writer():
+    """The run's ArchiveWriter, or None when archiving is off or replaying."""
+    global _writer
+    if not ARCHIVE_DIR or REPLAY_PATH:
+        return None
+    with _lock:
+        if _writer is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            _writer = ArchiveWriter(os.path.join(ARCHIVE_DIR, f"{stamp}-{os.getpid()}.warc.gz"))
+        return _writer
+
+
+def replay():
+    """The Replay for FETCH_REPLAY, or None when fetching live."""
+    global _replay
+    if not REPLAY_PATH:
+        return None
+    with _lock:
+        if _replay is None:
+            _replay = Replay(REPLAY_PATH)
+        return _replay
+
+
+def use_replay(path):
+    """Switch this process to replaying from path (a file or directory)."""
+    global REPLAY_PATH, _replay
+    with _lock:
+        REPLAY_PATH = path
+        _replay = None
@@ -0,0 +1,221 @@
+"""
+Page fetching shared by the org scrapers.
+
+Some org sites serve their content in plain HTML, and others are JS shells
+that only render in a browser. Trying requests first and falling back to
+Playwright wastes a round trip on every JS-only page. Doing it the other way
+round launches a browser for pages that never needed one. fetch() records
+which method produced usable text for each domain in METHODS_PATH and goes
+straight to that method next time.
+
+Domains recorded as needing the browser are re-probed with plain HTTP after
+REPROBE_DAYS, in case the site changed.
+
+Browser fetches run in a lightweight mode by default. They abort images,
+media, fonts, stylesheets and requests to known tracker domains. They stop
+waiting once the DOM is loaded and the page's text has stopped growing,
+instead of waiting for network idle or sleeping a fixed time. Each render
+is a "browser" tracing span with the bytes transferred and the number of
+requests blocked.
+
+Whether a page has usable text is decided from html_clean's result, so the
+parse runs in the cleaning process pool rather than on the fetch thread.
+fetch_page() hands that result back with the HTML so callers don't parse the
+page a second time.
+
+Rendered pages are written to the fetch_archive WARC file. When replaying,
+fetch() serves the archived render of a page if there is one, and otherwise
+the archived HTTP response. No browser is launched.
+"""
+
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright
+
+import fetch_archive
+import html_clean
+import http_client
+import tracing
+from host_scheduler import Disallowed as RobotsDisallowed
+
+METHODS_PATH = "fetch_methods.json"
+REPROBE_DAYS = 14
+
+BROWSER_TIMEOUT_MS = 30000
+
+# Visible text needed for a page to count as usable
+MIN_TEXT_CHARS = 200
+
+# Lightweight rendering: what to skip, and how long to wait for text to settle
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+TRACKER_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "facebook.net", "connect.facebook.com",
+    "hotjar.com", "segment.com", "segment.io", "intercom.io", "hs-scripts.com",
+    "hs-analytics.net", "clarity.ms", "plausible.io", "fullstory.com",
+    "mixpanel.com", "amplitude.com", "heap.io", "linkedin.com", "ads-twitter.com",
+    "platform.twitter.com", "youtube.com", "vimeo.com", "cookielaw.org",
+]
+TEXT_POLL_MS = 250
+TEXT_STABLE_POLLS = 3
+TEXT_SETTLE_TIMEOUT_MS = 8000
+
+_methods = None
+_methods_lock = threading.Lock()
+
+
+def domain(url):
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def load_methods():
+    global _methods
+    if _methods is None:
+        try:
+            with open(METHODS_PATH) as f:
+                _methods = json.load(f)
+        except FileNotFoundError:
+            _methods = {}
+    return _methods
+
+
+def remember(url, method):
+    with _methods_lock:
+        methods = load_methods()
+        methods[domain(url)] = {"method": method, "checked_at": time.time()}
+        tmp = f"{METHODS_PATH}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(methods, f, indent=2, sort_keys=True)
+        os.replace(tmp, METHODS_PATH)
+
+
+def preferred_method(url):
+    """"http" or "browser" from the cache; None if unknown or due a re-probe."""
+    with _methods_lock:
+        entry = load_methods().get(domain(url))
+    if entry is None:
+        return None
+    if entry["method"] == "browser" and time.time() - entry["checked_at"] > REPROBE_DAYS * 86400:
+        return None
+    return entry["method"]
+
+
+def fetch_http(url):
+    try:
+        response = http_client.get(url)
+    except http_client.HTTPError as e:
+        print(f"    Error fetching {url}: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+    return response.text
+
+
+def is_tracker(url):
+    host = urlparse(url).hostname or ""
+    return any(host == d or host.endswith("." + d) for d in TRACKER_DOMAINS)
+
+
+def wait_for_text(page):
+    """Poll innerText length until it stops changing (or the settle timeout)."""
+    last = -1
+    stable = 0
+    for _ in range(TEXT_SETTLE_TIMEOUT_MS // TEXT_POLL_MS):
+        length = page.evaluate("document.body ? document.body.innerText.length : 0")
+        stable = stable + 1 if length == last and length > 0 else 0
+        if stable >= TEXT_STABLE_POLLS:
+            return
+        last = length
+        page.wait_for_timeout(TEXT_POLL_MS)
+
+
+def fetch_browser(url, lightweight=True):
+    transferred = [0]
+    blocked = [0]
+
+    def block(route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or is_tracker(request.url):
+            blocked[0] += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    def finished(request):
+        try:
+            sizes = request.sizes()
+            transferred[0] += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            pass
+
+    try:
+        http_client.scheduler.admit(url)
+    except RobotsDisallowed as e:
+        print(f"    Skipping {url}: {e}")
+        return None
+
+    with tracing.span("browser", host=urlparse(url).hostname or "", url=url) as span:
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                page = browser.new_page()
+                page.on("requestfinished", finished)
+                if lightweight:
+                    page.route("**/*", block)
+                    page.goto(url, timeout=BROWSER_TIMEOUT_MS, wait_until="domcontentloaded")
+                    wait_for_text(page)
+                else:
+                    page.goto(url, timeout=BROWSER_TIMEOUT_MS, wait_until="networkidle")
+                content = page.content()
+                browser.close()
+        except Exception as e:
+            print(f"    Error rendering {url}: {e}")
+            span.fail(str(e))
+            return None
+        span.set(blocked_requests=blocked[0])
+        span.add(bytes=transferred[0])
+
+    recorder = fetch_archive.writer()
+    if recorder is not None:
+        recorder.record_rendered(url, content)
+    return content
+
+
+FETCHERS = {"http": fetch_http, "browser": fetch_browser}
+
+
+def fetch_page(url):
+    """
+    (html, cleaned) for url, or (None, None) if neither method yields usable text.
+
+    The domain's cached method is tried first; the other one only if it
+    fails, and whichever works is recorded for next time. cleaned is
+    html_clean.clean()'s result for html, computed in the cleaning pool.
+    """
+    archive = fetch_archive.replay()
+    if archive is not None:
+        html = archive.page(url)
+        html = html if html is not None else fetch_http(url)
+        return (html, html_clean.clean(html, url)) if html else (None, None)
+    order = ["browser", "http"] if preferred_method(url) == "browser" else ["http", "browser"]
+    for method in order:
+        html = FETCHERS[method](url)
+        if not html:
+            continue
+        cleaned = html_clean.clean(html, url)
+        if cleaned["text_chars"] >= MIN_TEXT_CHARS:
+            if preferred_method(url) != method:
+                remember(url, method)
+            tracing.annotate(method=method)
+            return html, cleaned
+    return None, None
+
+
+def fetch(url):
+    """The HTML of url, as fetch_page() finds it, or None."""
+    return fetch_page(url)[0]
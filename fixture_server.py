@@ -0,0 +1,339 @@
+"""
+Local stand-in for every site and API a refresh talks to, for benchmark.py.
+
+One threaded HTTP server answers:
+
+    /<host>/<path>                 org pages: http_client's FIXTURE_BASE rewrite
+                                   sends https://<host>/<path> here
+    /anthropic/v1/messages         a fake Messages API: a schema-valid
+                                   tool_use answer for the forced tool, with
+                                   prompt caching modelled (see cache_usage)
+    /api.semanticscholar.org/...   a fake paper search with citation counts
+    /export.arxiv.org/api/query    a fake Atom feed of papers
+
+Pages come from a fetch_archive WARC file or directory when one is given, so
+benchmarks can run on recorded org pages. Anything not in the archive gets
+a synthetic listing page, seeded by its URL so every run sees the same
+bytes. robots.txt is always 404.
+
+Latency and error rates are set per kind (page, llm, api). Each response
+sleeps for its latency, with ±25% jitter. Errors are 500s for pages, 529
+(overloaded) for the LLM unless error_status says otherwise (429 for rate
+limits), 429s for Semantic Scholar and 503s for arXiv. Everything is seeded,
+and calls and injected errors are counted by kind in server.counts. The most
+calls of a kind in flight at once is kept in server.peak.
+
+    python fixture_server.py [--port 8900] [--archive archive/]
+
+runs it standalone; point a script at it with HTTP_FIXTURE_BASE and
+ANTHROPIC_BASE_URL (see benchmark.py).
+"""
+
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+import fetch_archive
+
+JITTER = 0.25
+
+ERROR_STATUS = {"page": 500, "llm": 529}
+
+LLM_ERRORS = {429: "rate_limit_error", 529: "overloaded_error"}
+
+# Shortest prefix the API will cache, in tokens, and how long an entry lives
+# after its last use
+MIN_CACHEABLE_TOKENS = {"haiku": 2048}
+DEFAULT_MIN_CACHEABLE_TOKENS = 1024
+CACHE_TTL = 300
+
+
+def tokens(value):
+    """The fake API's token count: a quarter of the JSON length."""
+    return len(json.dumps(value, sort_keys=True)) // 4
+
+
+def min_cacheable(model):
+    return next((n for family, n in MIN_CACHEABLE_TOKENS.items() if family in model),
+                DEFAULT_MIN_CACHEABLE_TOKENS)
+
+
+def cache_breakpoints(request):
+    """(tokens, key) of the prompt prefix ending at each cache_control block: tools, system, messages."""
+    system = request.get("system") or []
+    blocks = list(request.get("tools") or []) + ([{"type": "text", "text": system}] if isinstance(system, str) else system)
+    for message in request.get("messages", []):
+        content = message["content"]
+        blocks += [{"type": "text", "text": content}] if isinstance(content, str) else content
+    breakpoints = []
+    for i, block in enumerate(blocks):
+        if isinstance(block, dict) and "cache_control" in block:
+            prefix = [request["model"], blocks[:i + 1]]
+            key = hashlib.sha256(json.dumps(prefix, sort_keys=True).encode()).hexdigest()
+            breakpoints.append((tokens(blocks[:i + 1]), key))
+    return breakpoints
+
+WORDS = (
+    "alignment interpretability evaluation oversight robustness governance policy agents "
+    "deception reward modelling scalable control monitoring forecasting benchmark safety "
+    "language models red-teaming elicitation capabilities verification"
+).split()
+
+
+def words(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def synthetic_page(url, items=40):
+    """A deterministic publication listing for url, with nav/footer chrome."""
+    rng = random.Random(url)
+    path = urlparse(url).path.rstrip("/")
+    cards = "".join(
+        f'<article><h3><a href="{path}/item-{i}">{words(rng, 6).title()}</a></h3>'
+        f'<p class="meta">{rng.randint(2019, 2025)} · {words(rng, 3).title()}</p>'
+        f"<p>{words(rng, 40)}.</p></article>"
+        for i in range(items)
+    )
+    nav = "".join(f'<a href="/{word}">{word.title()}</a>' for word in WORDS[:12])
+    return (
+        f"<html><head><title>{escape(url)}</title><script>var analytics = {{}};</script></head>"
+        f"<body><header><nav>{nav}</nav></header><main><h1>Research</h1>{cards}</main>"
+        f"<footer>Contact · Privacy</footer></body></html>"
+    )
+
+
+def fake_value(schema, rng, name="", depth=0):
+    """A value that validates against a (simple) JSON schema."""
+    kind = schema.get("type")
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if kind == "object":
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", properties))
+        return {
+            key: fake_value(sub, rng, key, depth + 1)
+            for key, sub in properties.items()
+            if key in required or rng.random() < 0.7
+        }
+    if kind == "array":
+        count = rng.randint(1, 5) if depth < 2 else rng.randint(0, 2)
+        return [fake_value(schema.get("items", {}), rng, name, depth + 1) for _ in range(count)]
+    if kind in ("number", "integer"):
+        if name == "confidence":
+            return 0.9
+        low, high = schema.get("minimum", 0), schema.get("maximum", 100)
+        value = rng.uniform(low, high)
+        return int(value) if kind == "integer" else round(value, 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if name in ("url", "paper_url", "link"):
+        return f"https://example.org/papers/{rng.randrange(10 ** 9)}"
+    if name == "name":
+        return words(rng, 4).title()
+    return words(rng, 8)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, archive=None, latency=None, error_rate=None, seed=0, error_status=None):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.replay = fetch_archive.Replay(archive) if archive else None
+        self.latency = {"page": 0.0, "llm": 0.0, "api": 0.0, **(latency or {})}
+        self.error_rate = {"page": 0.0, "llm": 0.0, "api": 0.0, **(error_rate or {})}
+        self.error_status = {**ERROR_STATUS, **(error_status or {})}
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.counts = Counter()
+        self.active = Counter()
+        self.peak = Counter()
+        self.counts_lock = threading.Lock()
+        self.cache = {}  # prefix key -> expiry (time.monotonic())
+        self.cache_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, key):
+        with self.counts_lock:
+            self.counts[key] += 1
+
+    def roll(self, kind):
+        """Sleep for kind's latency; True if this call should fail."""
+        with self.rng_lock:
+            delay = self.latency[kind] * self.rng.uniform(1 - JITTER, 1 + JITTER)
+            fail = self.rng.random() < self.error_rate[kind]
+        with self.counts_lock:
+            self.active[kind] += 1
+            self.peak[kind] = max(self.peak[kind], self.active[kind])
+        try:
+            if delay:
+                time.sleep(delay)
+        finally:
+            with self.counts_lock:
+                self.active[kind] -= 1
+        self.count(kind)
+        if fail:
+            self.count(f"{kind}_errors")
+        return fail
+
+    def cache_usage(self, request):
+        """
+        (cache read, cache write) tokens for a request, as the API reports them.
+
+        The longest cached prefix ending at a breakpoint is read, and whatever
+        the longest breakpoint prefix adds beyond it is written, so the next
+        request with the same prefix reads it all. Prefixes shorter than the
+        model's minimum are never cached.
+        """
+        now = time.monotonic()
+        eligible = [(n, key) for n, key in cache_breakpoints(request) if n >= min_cacheable(request["model"])]
+        with self.cache_lock:
+            read = max((n for n, key in eligible if self.cache.get(key, 0) > now), default=0)
+            write = max((n for n, key in eligible if n > read), default=read) - read
+            for n, key in eligible:
+                self.cache[key] = now + CACHE_TTL
+        return read, write
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        body = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def original_url(self):
+        host, _, rest = self.path.lstrip("/").partition("/")
+        return host, f"https://{host}/{rest}"
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        host, url = self.original_url()
+        parsed = urlparse(url)
+        if parsed.path == "/robots.txt":
+            self.send(404, "")
+        elif host == "api.semanticscholar.org":
+            self.semantic_scholar(parse_qs(parsed.query))
+        elif host == "export.arxiv.org":
+            self.arxiv(parse_qs(parsed.query))
+        else:
+            self.page(url)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.rstrip("/").endswith("/v1/messages"):
+            self.messages(json.loads(body))
+        else:
+            # GraphQL and other POST APIs aren't modelled; answer like a page
+            self.page(self.original_url()[1])
+
+    def page(self, url):
+        if self.server.roll("page"):
+            self.send(self.server.error_status["page"], "fixture error")
+            return
+        replay = self.server.replay
+        recorded = replay and (replay.page(url) or replay.response("GET", url))
+        if isinstance(recorded, tuple):
+            status, headers, body, _ = recorded
+            content_type = next((v for k, v in headers.items() if k.lower() == "content-type"), "text/html")
+            self.send(status, body, content_type)
+        elif recorded:
+            self.send(200, recorded)
+        else:
+            self.send(200, synthetic_page(url))
+
+    def messages(self, request):
+        if self.server.roll("llm"):
+            status = self.server.error_status["llm"]
+            error = {"type": "error", "error": {"type": LLM_ERRORS.get(status, "api_error"), "message": "fixture error"}}
+            self.send(status, json.dumps(error), "application/json")
+            return
+        tool_name = request["tool_choice"]["name"]
+        schema = next(tool["input_schema"] for tool in request["tools"] if tool["name"] == tool_name)
+        rng = random.Random(json.dumps(request["messages"], sort_keys=True))
+        tool_input = fake_value(schema, rng)
+        prompt_tokens = tokens({key: request.get(key) for key in ("tools", "system", "messages")})
+        cache_read, cache_write = self.server.cache_usage(request)
+        response = {
+            "id": f"msg_fixture_{rng.randrange(10 ** 12)}",
+            "type": "message",
+            "role": "assistant",
+            "model": request["model"],
+            "content": [{"type": "tool_use", "id": f"toolu_fixture_{rng.randrange(10 ** 12)}",
+                         "name": tool_name, "input": tool_input}],
+            "stop_reason": "tool_use",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": max(0, prompt_tokens - cache_read - cache_write),
+                "output_tokens": tokens(tool_input),
+                "cache_read_input_tokens": cache_read,
+                "cache_creation_input_tokens": cache_write,
+            },
+        }
+        self.send(200, json.dumps(response), "application/json")
+
+    def semantic_scholar(self, query):
+        if self.server.roll("api"):
+            self.send(429, json.dumps({"message": "fixture rate limit"}), "application/json")
+            return
+        title = query.get("query", [""])[0]
+        rng = random.Random(title)
+        paper = {
+            "title": title,
+            "citationCount": rng.randint(0, 500),
+            "influentialCitationCount": rng.randint(0, 30),
+            "year": rng.randint(2018, 2025),
+            "authors": [{"name": words(rng, 2).title()}],
+            "url": f"https://www.semanticscholar.org/paper/{rng.randrange(10 ** 12):x}",
+            "abstract": words(rng, 60),
+        }
+        self.send(200, json.dumps({"total": 1, "data": [paper]}), "application/json")
+
+    def arxiv(self, query):
+        if self.server.roll("api"):
+            self.send(503, "fixture error", "text/plain")
+            return
+        rng = random.Random(json.dumps(query, sort_keys=True))
+        entries = "".join(
+            f"<entry><id>http://arxiv.org/abs/24{rng.randint(1, 12):02d}.{rng.randint(10000, 99999)}</id>"
+            f"<title>{words(rng, 7).title()}</title><summary>{words(rng, 50)}</summary>"
+            f"<published>2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z</published>"
+            f"<author><name>{words(rng, 2).title()}</name></author></entry>"
+            for _ in range(int(query.get("max_results", ["10"])[0]))
+        )
+        feed = f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+        self.send(200, feed, "application/atom+xml")
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[sys.argv.index("--port") + 1]) if "--port" in sys.argv else 8900
+    archive = sys.argv[sys.argv.index("--archive") + 1] if "--archive" in sys.argv else None
+    server = FixtureServer(port, archive=archive)
+    print(f"Fixture server on {server.base_url}")
+    print(f"  HTTP_FIXTURE_BASE={server.base_url} ANTHROPIC_BASE_URL={server.base_url}/anthropic")
+    server.serve_forever()
@@ -0,0 +1,175 @@
+"""
+HTML cleaning off the GIL.
+
+Parsing a 50 KB page with BeautifulSoup, stripping the boilerplate and
+pulling out the text is CPU-bound. When it runs on the fetch threads it holds
+the GIL while other threads wait on the network. clean() and clean_many() send
+the raw page (bytes as read off the wire, or str) to a shared process pool.
+They get back only the compact result: the visible text, cut at
+MAX_TEXT_CHARS, its full length, and the page's absolute links. fetcher
+decides from that length whether a page needs the browser, so fetch threads
+never parse HTML themselves.
+
+Given the page's URL, the result also carries what extraction needs from the
+raw HTML: the page_metadata harvest (citation tags, JSON-LD, OpenGraph) and
+the site_extractors rule records. Extraction jobs take this result instead
+of the HTML, so the extraction threads don't parse pages either.
+
+clean_html() is the plain function the workers run. This module imports
+nothing heavy, so workers start quickly. clean() times each page as a
+"clean" tracing span in the calling process. lxml is used when installed and
+html.parser otherwise.
+
+Run this file to benchmark pages/sec at 1..N worker processes:
+
+    python html_clean.py [page.html ...]
+
+With no files it uses a synthetic 50 KB listing page.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urldefrag, urljoin
+
+from bs4 import BeautifulSoup
+
+import tracing
+from page_metadata import harvest_soup
+from site_extractors import rule_records
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "nav", "footer", "header"]
+
+# The most any extractor reads from one page
+MAX_TEXT_CHARS = 50000
+
+CLEAN_WORKERS = int(os.getenv("CLEAN_WORKERS", "0")) or os.cpu_count() or 2
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def clean_html(raw, base_url=None):
+    """
+    {"text": visible text, "text_chars": its untruncated length, "links": absolute hrefs in page order}.
+
+    With base_url it also has "metadata" (page_metadata.harvest()) and "rules"
+    (site_extractors.rule_records()); without, both are None.
+    """
+    soup = BeautifulSoup(raw, PARSER)
+    # Read before the <script> tags holding JSON-LD are stripped below
+    metadata = harvest_soup(soup, base_url) if base_url else None
+    rules = rule_records(base_url, raw) if base_url else None
+    links = []
+    seen = set()
+    for anchor in soup.find_all("a", href=True):
+        href = anchor["href"].strip()
+        if not href or href.startswith(("#", "mailto:", "javascript:", "tel:")):
+            continue
+        link = urldefrag(urljoin(base_url, href) if base_url else href)[0]
+        if link not in seen:
+            seen.add(link)
+            links.append(link)
+    for element in soup(BOILERPLATE_TAGS):
+        element.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    return {
+        "text": text[:MAX_TEXT_CHARS],
+        "text_chars": len(text),
+        "links": links,
+        "metadata": metadata,
+        "rules": rules,
+    }
+
+
+def clean_item(item):
+    """Pipeline form of clean_html: (context, url, raw, cleaned) with cleaned filled in if None."""
+    context, url, raw, cleaned = item
+    return context, url, raw, cleaned or clean_html(raw, url)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Started fresh rather than forked from a process full of fetch threads
+            _pool = ProcessPoolExecutor(CLEAN_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def clean(raw, base_url=None):
+    """clean_html() on the shared pool as a "clean" span; blocks only the calling thread."""
+    with tracing.span("clean", url=base_url, html_chars=len(raw)) as span:
+        cleaned = get_pool().submit(clean_html, raw, base_url).result()
+        span.set(text_chars=cleaned["text_chars"], links=len(cleaned["links"]))
+    return cleaned
+
+
+def clean_many(pages):
+    """clean_html() for every (raw, base_url) in pages, in order, on the shared pool."""
+    pages = list(pages)
+    chunksize = max(1, len(pages) // (4 * CLEAN_WORKERS))
+    return list(get_pool().map(clean_html, *zip(*pages), chunksize=chunksize)) if pages else []
+
+
+def synthetic_page(items=120):
+    """A ~50 KB publication listing with the usual chrome around it."""
+    cards = "".join(
+        f'<article class="card"><h3><a href="/publications/paper-{i}">Paper {i}: '
+        f'evaluating model behaviour under distribution shift</a></h3>'
+        f'<p class="authors">A. Author, B. Author, C. Author</p>'
+        f'<p>{"An abstract sentence about alignment and evaluations. " * 5}</p></article>'
+        for i in range(items)
+    )
+    return (
+        "<html><head><title>Publications</title><style>body{font:14px sans-serif}</style>"
+        "<script>window.analytics=function(){};</script></head><body>"
+        "<header><nav>" + "".join(f'<a href="/section-{i}">Section {i}</a>' for i in range(30)) + "</nav></header>"
+        f"<main>{cards}</main><footer>© Example Org</footer></body></html>"
+    ).encode()
+
+
+def benchmark(pages, rounds=3):
+    """Print pages/sec for the inline baseline and for 1..cpu_count worker processes."""
+    pages = [(raw, "https://example.org/publications/") for raw in pages]
+    print(f"{len(pages)} pages, {sum(len(raw) for raw, _ in pages) / len(pages) / 1024:.0f} KB avg, parser {PARSER}")
+
+    start = time.perf_counter()
+    for raw, url in pages:
+        clean_html(raw, url)
+    inline = len(pages) / (time.perf_counter() - start)
+    print(f"  inline      {inline:7.1f} pages/sec")
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    for workers in counts:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            # Warm the workers so process start-up isn't timed
+            list(pool.map(clean_html, [pages[0][0]] * workers, [pages[0][1]] * workers))
+            chunksize = max(1, len(pages) // (4 * workers))
+            start = time.perf_counter()
+            for _ in range(rounds):
+                list(pool.map(clean_html, *zip(*pages), chunksize=chunksize))
+            rate = rounds * len(pages) / (time.perf_counter() - start)
+        print(f"  {workers:2d} workers  {rate:7.1f} pages/sec  ({rate / inline:.1f}x inline)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sample = []
+        for path in sys.argv[1:]:
+            with open(path, "rb") as f:
+                sample.append(f.read())
+    else:
+        sample = [synthetic_page()] * 200
+    benchmark(sample)
@@ -0,0 +1,243 @@
+"""
+Shared HTTP client for the scrapers.
+
+One process-wide httpx.Client keeps connections alive per host, so repeated
+calls to the same API or site reuse a TCP/TLS connection instead of
+handshaking each time. HTTP/2 is negotiated when the `h2` package is
+installed, and brotli is offered alongside gzip/deflate when `brotli` is.
+Bodies are streamed and cut off at max_bytes so one huge page can't blow up
+memory or the extraction budget. Timeouts and the User-Agent are the same
+everywhere.
+
+Requests are admitted by a host_scheduler.HostScheduler first, so they obey
+each host's robots.txt and crawl delay; pass polite=False only for the
+robots.txt fetch itself.
+
+Every response is also written to the fetch_archive WARC file. When
+fetch_archive replay is on, requests are answered from the archive instead
+and nothing goes over the network.
+
+With FIXTURE_BASE set (HTTP_FIXTURE_BASE, used by benchmark.py), every
+request is sent to a local fixture server instead. https://host/path goes to
+FIXTURE_BASE/host/path. Callers, the scheduler and the archive still see the
+original URLs.
+
+get/post/head return a small Response with the parts of the requests API
+the scrapers use (status_code, headers, url, content, text, json(),
+raise_for_status()). Every network failure raises TransportError (as its
+ConnectionRefused subclass when the host refused the connection), every
+raise_for_status() failure raises StatusError, and a URL robots.txt forbids
+raises Disallowed; all subclass HTTPError.
+
+Each request is an "http" tracing span with its host, status and body size,
+counted as an error on a transport failure, a 429 or a 5xx. Time spent
+waiting for the scheduler to admit it is left out.
+"""
+
+import json as jsonlib
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+import fetch_archive
+import tracing
+from host_scheduler import HostScheduler
+from host_scheduler import Disallowed as RobotsDisallowed
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+TIMEOUT = 30
+CONNECT_TIMEOUT = 10
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE = 32
+
+FIXTURE_BASE = os.getenv("HTTP_FIXTURE_BASE", "").rstrip("/")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class HTTPError(Exception):
+    pass
+
+
+class TransportError(HTTPError):
+    """DNS, connection, TLS or timeout failure."""
+
+
+class ConnectionRefused(TransportError):
+    """The host actively refused the connection."""
+
+
+class Disallowed(HTTPError):
+    """robots.txt forbids this URL."""
+
+
+class StatusError(HTTPError):
+    def __init__(self, response):
+        super().__init__(f"{response.status_code} for {response.url}")
+        self.response = response
+
+
+class Response:
+    def __init__(self, status_code, headers, url, content, encoding, truncated):
+        self.status_code = status_code
+        self.headers = headers
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        self.truncated = truncated
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise StatusError(self)
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                http2=HTTP2,
+                follow_redirects=True,
+                timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE),
+                headers={"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING},
+            )
+        return _client
+
+
+def to_fixture(url):
+    parsed = urlparse(url)
+    return f"{FIXTURE_BASE}/{parsed.netloc}{parsed.path or '/'}" + (f"?{parsed.query}" if parsed.query else "")
+
+
+def from_fixture(url):
+    if not url.startswith(FIXTURE_BASE + "/"):
+        return url
+    return "https://" + url[len(FIXTURE_BASE) + 1:]
+
+
+def request(method, url, params=None, headers=None, json=None, data=None,
+            timeout=None, max_bytes=MAX_BODY_BYTES, follow_redirects=True, polite=True):
+    """Send a request on the shared client and read at most max_bytes of body."""
+    full_url = str(httpx.URL(url, params=params)) if params else url
+    with tracing.span("http", method=method, host=urlparse(url).hostname or "", url=full_url) as span:
+        response = _request(span, method, url, full_url, params=params, headers=headers, json=json, data=data,
+                            timeout=timeout, max_bytes=max_bytes, follow_redirects=follow_redirects, polite=polite)
+        span.set(status=response.status_code, truncated=response.truncated)
+        span.add(bytes=len(response.content))
+        # The host failed or throttled us; other statuses are the caller's business
+        if response.status_code == 429 or response.status_code >= 500:
+            span.fail(f"HTTP {response.status_code}")
+        return response
+
+
+def _request(span, method, url, full_url, params, headers, json, data, timeout, max_bytes,
+             follow_redirects, polite):
+    digest = fetch_archive.request_digest(json, data)
+    archive = fetch_archive.replay()
+    if archive is not None:
+        span.set(replay=True)
+        return replayed(archive, method, full_url, digest, max_bytes)
+    if polite:
+        # Crawl delays are ours, not the host's, so they aren't counted against it
+        admitted = time.monotonic()
+        try:
+            scheduler.admit(url)
+        except RobotsDisallowed as e:
+            raise Disallowed(str(e)) from e
+        finally:
+            span.exclude(time.monotonic() - admitted)
+    kwargs = {"params": params, "headers": headers, "json": json, "data": data,
+              "follow_redirects": follow_redirects}
+    if timeout is not None:
+        kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, CONNECT_TIMEOUT))
+    try:
+        target = to_fixture(url) if FIXTURE_BASE else url
+        with get_client().stream(method, target, **kwargs) as raw:
+            chunks = []
+            size = 0
+            truncated = False
+            for chunk in raw.iter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= max_bytes:
+                    truncated = True
+                    break
+            content = b"".join(chunks)[:max_bytes]
+            final_url = from_fixture(str(raw.url)) if FIXTURE_BASE else str(raw.url)
+            response = Response(raw.status_code, raw.headers, final_url, content, raw.encoding, truncated)
+    except httpx.HTTPError as e:
+        error = ConnectionRefused if refused(e) else TransportError
+        raise error(f"{method} {url}: {e}") from e
+    recorder = fetch_archive.writer()
+    if recorder is not None:
+        recorder.record_response(method, full_url, response.status_code, response.headers,
+                                 response.content, final_url=response.url, digest=digest)
+    return response
+
+
+def refused(error):
+    """Whether an httpx error was caused by a refused connection."""
+    while error is not None:
+        if isinstance(error, ConnectionRefusedError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def replayed(archive, method, url, digest, max_bytes):
+    found = archive.response(method, url, digest)
+    if found is None:
+        raise TransportError(f"{method} {url}: not in the replay archive")
+    status_code, headers, body, final_url = found
+    return Response(status_code, httpx.Headers(headers), final_url, body[:max_bytes],
+                    fetch_archive.charset(headers), len(body) > max_bytes)
+
+
+def fetch_robots(url):
+    response = request("GET", url, timeout=CONNECT_TIMEOUT, max_bytes=512 * 1024, polite=False)
+    return response.status_code, response.text
+
+
+scheduler = HostScheduler(fetch_robots)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
@@ -0,0 +1,168 @@
+"""
+Bounded crawler for paginated publication listings.
+
+Listing pages like /publications/ usually continue on ?page=2 or /page/2/,
+or link to the next page with rel="next" or a "Next"/"Older" link. crawl()
+follows them and yields (url, html) for each page as soon as it is fetched.
+That way a caller can hand pages to extract_all() while later pages are
+still downloading.
+
+When the URL carries a page number, the next WINDOW pages are fetched
+concurrently. At most PER_HOST_LIMIT requests run against one host at a
+time. Otherwise the crawler follows next links one page at a time. It stops
+at the first page that:
+- links to an already-known item, since listings are newest-first
+- fails to fetch, or has no links that earlier pages didn't already have
+- comes after max_pages
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
+
+from bs4 import BeautifulSoup
+
+import http_client
+
+MAX_PAGES = 20
+WINDOW = 4
+PER_HOST_LIMIT = 2
+
+PAGE_PARAMS = ["page", "paged", "p", "pg"]
+PATH_PAGE = re.compile(r"/page/(\d+)/?$")
+NEXT_TEXT = re.compile(r"^\s*(next|older|more)\b|^[›»→]+$|\bnext page\b", re.I)
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def host_slot(url):
+    host = urlparse(url).hostname or ""
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.Semaphore(PER_HOST_LIMIT)
+        return _host_slots[host]
+
+
+def fetch(url):
+    """GET url within the host's concurrency limit. Returns HTML or None."""
+    with host_slot(url):
+        try:
+            response = http_client.get(url)
+        except http_client.HTTPError:
+            return None
+    if response.status_code != 200:
+        return None
+    return response.text
+
+
+def page_number(url):
+    """(number, template) if the URL carries a page number, else (None, None)."""
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    for param in PAGE_PARAMS:
+        if param in query and query[param][0].isdigit():
+            def template(n, param=param):
+                query[param] = [str(n)]
+                return urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
+            return int(query[param][0]), template
+    match = PATH_PAGE.search(parsed.path)
+    if match:
+        def template(n):
+            path = parsed.path[:match.start()] + f"/page/{n}/"
+            return urlunparse(parsed._replace(path=path))
+        return int(match.group(1)), template
+    return None, None
+
+
+def next_link(soup, url):
+    """The page's next-page URL from rel="next" or a "Next"-style link."""
+    for tag in soup.find_all(["link", "a"], rel=True):
+        if "next" in tag.get("rel", []) and tag.get("href"):
+            return urljoin(url, tag["href"])
+    for a in soup.find_all("a", href=True):
+        label = a.get_text(" ", strip=True) or a.get("aria-label", "")
+        classes = " ".join(a.get("class", []))
+        if NEXT_TEXT.search(label) or "next" in classes.lower():
+            candidate = urljoin(url, a["href"])
+            if candidate != url and urlparse(candidate).hostname == urlparse(url).hostname:
+                return candidate
+    return None
+
+
+def links(soup, url):
+    return {urljoin(url, a["href"]).split("#")[0] for a in soup.find_all("a", href=True)}
+
+
+class Listing:
+    """Crawl bookkeeping: which links have been seen and when to stop."""
+
+    def __init__(self, known):
+        self.known = set(known)
+        self.seen_links = set()
+
+    def check(self, url, html):
+        """Returns (soup, keep, stop) for a fetched page."""
+        soup = BeautifulSoup(html, "html.parser")
+        page_links = links(soup, url)
+        # Past the last page sites repeat a page or render an empty list
+        if not page_links - self.seen_links:
+            return soup, False, True
+        self.seen_links |= page_links
+        return soup, True, bool(self.known & page_links)
+
+
+def crawl(start_url, html=None, known=(), max_pages=MAX_PAGES):
+    """
+    Yield (url, html) for start_url and the listing pages after it.
+
+    html is start_url's body if the caller already has it. known holds item
+    URLs already in the dataset; the first page linking to one of them is
+    yielded and the crawl stops there.
+    """
+    listing = Listing(known)
+    url = start_url
+    html = html if html is not None else fetch(start_url)
+    pages = 0
+
+    while html is not None and pages < max_pages:
+        soup, keep, stop = listing.check(url, html)
+        if not keep:
+            return
+        pages += 1
+        yield url, html
+        if stop or pages >= max_pages:
+            return
+
+        following = next_link(soup, url)
+        number, template = page_number(following or url)
+        if following is None and number is None:
+            return
+        if number is None:
+            # Only a next link to go on: one page at a time
+            url, html = following, fetch(following)
+            continue
+
+        # Numbered pages: fetch a window ahead, yield in order
+        first = number if following else number + 1
+        yield from crawl_numbered(template, first, listing, max_pages - pages)
+        return
+
+
+def crawl_numbered(template, first, listing, budget):
+    with ThreadPoolExecutor(max_workers=WINDOW) as pool:
+        n = first
+        while budget > 0:
+            batch = [template(i) for i in range(n, n + min(WINDOW, budget))]
+            for url, html in zip(batch, pool.map(fetch, batch)):
+                if html is None:
+                    return
+                _, keep, stop = listing.check(url, html)
+                if not keep:
+                    return
+                budget -= 1
+                yield url, html
+                if stop:
+                    return
+            n += len(batch)
@@ -0,0 +1,29 @@
+"""
+Substring matching of names for the MATS and FLI matchers.
+
+check_mats_papers.py and the FLI scripts ask "which known name contains this
+string, or is contained in it?". NameIndex is a dict of normalized name ->
+value (callers lowercase or normalize() the names and queries) that answers
+with an exact dict hit first, then the earliest-inserted name that matches,
+by scanning the names in order. At a few hundred orgs and about a thousand
+project titles a scan costs well under a millisecond per query; see
+scale_benchmark.py for how it grows.
+"""
+
+
+class NameIndex(dict):
+    def match(self, query, min_len=0):
+        """Value of query itself, else of the earliest name (of min_len+ chars) it contains or is contained in."""
+        if query in self and len(query) >= min_len:
+            return self[query]
+        for name, value in self.items():
+            if len(name) >= min_len and (query in name or name in query):
+                return value
+        return None
+
+    def match_containing(self, *queries):
+        """Value of the earliest name that contains any of queries."""
+        for name, value in self.items():
+            if any(query in name for query in queries):
+                return value
+        return None
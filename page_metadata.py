@@ -0,0 +1,183 @@
+"""
+Harvest publication metadata embedded in a page's <head>.
+
+Paper pages (arXiv, OpenReview, journals, most CMS publication templates)
+describe themselves with Highwire `citation_*` meta tags, JSON-LD
+ScholarlyArticle objects and OpenGraph tags. The scrapers strip all of that
+when they reduce the soup to plain text, so harvest() reads it from the raw
+HTML first:
+
+- publications: records in the PUBLICATION shape, from citation_* tags and
+  JSON-LD scholarly items. own_paper() picks out a page that is a single
+  paper's own page; only that is fully described without the LLM. Listing
+  pages often carry metadata for just one featured item.
+- hints: title/description/type/date from OpenGraph and friends. With any
+  harvested publications, they go to the model as a short preamble for pages
+  that still need extraction.
+"""
+
+import json
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+SCHOLARLY_TYPES = {"ScholarlyArticle", "Report", "Thesis", "TechArticle"}
+
+HINT_TAGS = {
+    "title": ["og:title", "twitter:title", "dc.title"],
+    "description": ["og:description", "description", "twitter:description"],
+    "type": ["og:type"],
+    "site": ["og:site_name"],
+    "published": ["article:published_time", "dc.date"],
+}
+
+
+def read_meta(soup):
+    """Map lowercased meta name/property -> list of content values."""
+    meta = {}
+    for tag in soup.find_all("meta"):
+        key = tag.get("name") or tag.get("property")
+        value = tag.get("content")
+        if key and value and value.strip():
+            meta.setdefault(key.strip().lower(), []).append(value.strip())
+    return meta
+
+
+def first(meta, *keys):
+    for key in keys:
+        if meta.get(key):
+            return meta[key][0]
+    return None
+
+
+def citation_record(meta, url):
+    """One publication from Highwire citation_* tags, or None."""
+    title = first(meta, "citation_title")
+    if not title:
+        return None
+    record = {
+        "name": " ".join(title.split()),
+        "authors": meta.get("citation_author", []),
+        "url": urljoin(url, first(meta, "citation_abstract_html_url", "og:url") or url),
+        "status": "published",
+    }
+    pdf = first(meta, "citation_pdf_url")
+    if pdf:
+        record["pdf_url"] = urljoin(url, pdf)
+    description = first(meta, "citation_abstract", "description", "og:description")
+    if description:
+        record["description"] = description[:500]
+    date = first(meta, "citation_publication_date", "citation_date", "citation_online_date")
+    if date:
+        record["date"] = date
+    return record
+
+
+def jsonld_objects(soup):
+    """Every dict in the page's JSON-LD, flattening @graph, lists and ItemLists."""
+    stack = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            stack.append(json.loads(script.string or ""))
+        except ValueError:
+            continue
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            yield node
+            for key in ("@graph", "itemListElement", "item", "hasPart"):
+                if key in node:
+                    stack.append(node[key])
+
+
+def jsonld_types(obj):
+    kind = obj.get("@type", [])
+    return set(kind) if isinstance(kind, list) else {kind}
+
+
+def person_names(value):
+    people = value if isinstance(value, list) else [value]
+    names = []
+    for person in people:
+        if isinstance(person, dict) and person.get("name"):
+            names.append(person["name"])
+        elif isinstance(person, str):
+            names.append(person)
+    return names
+
+
+def jsonld_record(obj, url):
+    title = obj.get("headline") or obj.get("name")
+    if not isinstance(title, str) or not title.strip():
+        return None
+    record = {
+        "name": " ".join(title.split()),
+        "authors": person_names(obj.get("author", [])),
+        "url": urljoin(url, obj.get("url") or obj.get("@id") or url),
+        "status": "published",
+    }
+    description = obj.get("abstract") or obj.get("description")
+    if isinstance(description, str):
+        record["description"] = description.strip()[:500]
+    if obj.get("datePublished"):
+        record["date"] = obj["datePublished"]
+    return record
+
+
+def harvest(html, url):
+    """Return {"publications": [...], "hints": {...}} for a raw HTML page."""
+    return harvest_soup(BeautifulSoup(html, "html.parser"), url)
+
+
+def harvest_soup(soup, url):
+    """harvest() for a page already parsed, before its <script> tags are stripped."""
+    meta = read_meta(soup)
+
+    publications = []
+    seen = set()
+    candidates = [citation_record(meta, url)]
+    candidates += [jsonld_record(obj, url) for obj in jsonld_objects(soup) if jsonld_types(obj) & SCHOLARLY_TYPES]
+    for record in candidates:
+        if record and record["name"].lower() not in seen:
+            seen.add(record["name"].lower())
+            publications.append(record)
+
+    hints = {}
+    for field, keys in HINT_TAGS.items():
+        value = first(meta, *keys)
+        if value:
+            hints[field] = value[:300]
+    if "title" not in hints and soup.title and soup.title.string:
+        hints["title"] = soup.title.string.strip()[:300]
+
+    return {"publications": publications, "hints": hints}
+
+
+def page_key(url):
+    """A URL without scheme, www., fragment or trailing slash."""
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return host, parsed.path.rstrip("/"), parsed.query
+
+
+def own_paper(metadata, url):
+    """The page's one publication if it is that paper's own page, else None."""
+    publications = metadata["publications"]
+    if len(publications) == 1 and page_key(publications[0]["url"]) == page_key(url):
+        return publications[0]
+    return None
+
+
+def format_hints(hints, publications=()):
+    """Render hints and harvested publications as a preamble for the extraction prompt."""
+    if not hints and not publications:
+        return ""
+    lines = [f"- {field}: {value}" for field, value in hints.items()]
+    for record in publications:
+        authors = ", ".join(record.get("authors", [])[:5])
+        lines.append(f"- publication: {record['name']}{f' ({authors})' if authors else ''} {record['url']}")
+    return "Page metadata:\n" + "\n".join(lines) + "\n\n"
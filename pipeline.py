@@ -0,0 +1,161 @@
+"""
+A staged pipeline with bounded queues between the stages.
+
+Each Stage runs fn(item) on its own workers: threads for I/O-bound work
+(fetching, API calls) or a process pool for CPU-bound work (HTML parsing).
+Stages are joined by queues holding at most queue_size items, so a stage
+that falls behind makes the one before it block instead of buffering
+everything in memory. All stages run at once, and a run takes about as long
+as its slowest stage rather than the sum of them.
+
+fn returns the item for the next stage, or None to drop it. With
+fan_out=True it returns an iterable of items instead; process stages must
+return a list, since generators can't cross process boundaries. An exception
+drops the item and is printed with the stage name.
+
+Each item a stage handles is a tracing span named after the stage, so fn can
+annotate it (and the HTTP and model spans it opens nest under it). Time spent
+blocked on the next stage is left out of the span. A process stage's fn can't
+reach the span, so describe(item, out), if given, returns its attributes
+from this process instead.
+
+Pipeline.run() returns the last stage's outputs in completion order.
+print_report() shows each stage's counts and utilization, which is the share
+of the run its workers spent busy. The stage nearest 100% is the bottleneck,
+and a stage with a lot of time "blocked" is waiting on the stage after it.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import tracing
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, fn, workers=1, processes=False, fan_out=False, queue_size=None, describe=None):
+        self.name = name
+        self.fn = fn
+        self.describe = describe
+        self.workers = workers
+        self.processes = processes
+        self.fan_out = fan_out
+        self.queue_size = queue_size or 2 * workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy = 0.0  # worker-seconds spent in fn
+        self.blocked = 0.0  # worker-seconds spent waiting for room downstream
+        self.lock = threading.Lock()
+
+    def add(self, **amounts):
+        with self.lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+
+class Pipeline:
+    def __init__(self, stages):
+        self.stages = stages
+        self.wall = 0.0
+
+    def run(self, items):
+        stages = self.stages
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        # Workers are started fresh rather than forked from this multi-threaded process
+        context = multiprocessing.get_context("spawn")
+        pools = [ProcessPoolExecutor(stage.workers, mp_context=context) if stage.processes else None
+                 for stage in stages]
+        running = [stage.workers for stage in stages]
+        running_lock = threading.Lock()
+        results = []
+
+        def emit(index, item):
+            """Hand item to the next stage; returns seconds spent blocked."""
+            if index + 1 == len(stages):
+                results.append(item)
+                return 0.0
+            start = time.monotonic()
+            queues[index + 1].put(item)
+            return time.monotonic() - start
+
+        def work(index):
+            stage = stages[index]
+            while True:
+                item = queues[index].get()
+                if item is _DONE:
+                    break
+                start = time.monotonic()
+                blocked = 0.0
+                emitted = 0
+                try:
+                    with tracing.span(stage.name) as span:
+                        if pools[index]:
+                            out = pools[index].submit(stage.fn, item).result()
+                        else:
+                            out = stage.fn(item)
+                        if stage.describe:
+                            span.set(**stage.describe(item, out))
+                        outs = (out or ()) if stage.fan_out else ([] if out is None else [out])
+                        # Fanned-out generators run while being drained, so this is still fn time
+                        for each in outs:
+                            waited = emit(index, each)
+                            span.exclude(waited)
+                            blocked += waited
+                            emitted += 1
+                except Exception as e:
+                    print(f"  ✗ {stage.name}: {e}")
+                    stage.add(errors=1)
+                stage.add(items_in=1, items_out=emitted, blocked=blocked,
+                          busy=time.monotonic() - start - blocked)
+            with running_lock:
+                running[index] -= 1
+                last = running[index] == 0
+            # The last worker out tells every worker of the next stage to finish
+            if last and index + 1 < len(stages):
+                for _ in range(stages[index + 1].workers):
+                    queues[index + 1].put(_DONE)
+
+        def feed():
+            try:
+                for item in items:
+                    queues[0].put(item)
+            except Exception as e:
+                print(f"  ✗ pipeline input: {e}")
+            finally:
+                for _ in range(stages[0].workers):
+                    queues[0].put(_DONE)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for index, stage in enumerate(stages):
+            threads += [threading.Thread(target=work, args=(index,), daemon=True) for _ in range(stage.workers)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            for pool in pools:
+                if pool:
+                    pool.shutdown()
+            self.wall = time.monotonic() - started
+        return results
+
+    def utilization(self, stage):
+        capacity = stage.workers * self.wall
+        return stage.busy / capacity if capacity else 0.0
+
+    def print_report(self):
+        print(f"Pipeline: {self.wall:.1f}s wall")
+        for stage in self.stages:
+            kind = "processes" if stage.processes else "threads"
+            print(
+                f"  {stage.name:<8} {stage.items_in} in, {stage.items_out} out, {stage.errors} errors, "
+                f"{stage.workers} {kind}, {self.utilization(stage):.0%} busy, "
+                f"{stage.blocked:.1f}s blocked downstream"
+            )
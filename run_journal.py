@@ -0,0 +1,81 @@
+"""
+Append-only journal that makes long scrape runs resumable.
+
+A scraper records each finished unit of work (an org's fetched pages, one
+page's extraction result) under a string key as soon as it completes. Every
+record is one JSON line, flushed and fsynced before record() returns, so a
+crash or Ctrl-C loses at most the unit in flight. The next run opens the same
+journal, skips every key already in it and reuses the recorded value.
+
+The journal is cleared once a run has saved its merged output. Until then it
+can also be merged as-is (the scrapers' --partial flag), which writes out
+whatever has finished without fetching or extracting anything new.
+"""
+
+import json
+import os
+import threading
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+class Journal:
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        try:
+            with open(path) as f:
+                text = f.read()
+        except FileNotFoundError:
+            return
+        complete, _, torn = text.rpartition("\n")
+        if torn:
+            # Drop a line cut short by a crash mid-write so the next record starts clean
+            with open(path, "w") as f:
+                f.write(complete + "\n" if complete else "")
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.entries[entry["key"]] = entry["value"]
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.entries.get(key, default)
+
+    def record(self, key, value):
+        line = json.dumps({"key": key, "value": value})
+        with self.lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[key] = value
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def open_journal(name, fresh=False):
+    """The journal for a script run (name.journal.jsonl); fresh discards it."""
+    journal = Journal(f"{name}{JOURNAL_SUFFIX}")
+    if fresh:
+        journal.clear()
+    elif len(journal):
+        print(f"Resuming from {journal.path} ({len(journal)} finished units)")
+    return journal
@@ -0,0 +1,438 @@
+"""
+Run every due source in sources.json in one pass.
+
+Sources are planned together before anything is fetched: a URL listed by
+several sources or orgs is fetched once, extracted once per extractor, and its
+result is merged into every org that lists it. A source is due when
+cadence_days have passed since it last ran (SOURCE_STATE_PATH). A run only
+counts if the source fetched pages and at least one of them was extracted.
+--all ignores the cadence, and --batch NAME / --org NAME narrow the selection.
+
+The run is a pipeline.Pipeline of fetch → clean → extract → merge, plus
+enrich (Semantic Scholar citations for new publications) with --enrich.
+Every stage works at once with bounded queues in between, so pages are
+extracted while others are still downloading, and the run report shows how
+busy each stage was. Merges happen in completion order. --export runs
+export_web_data.py once the dataset is saved, unless --output sent it
+elsewhere.
+
+--replay PATH runs every selected source from a fetch_archive WARC file or
+directory instead of the network, without touching source_runs.json. It uses
+its own journal, discarded at the start, so nothing from a live run (or a
+live run's resume journal) is reused or cleared, and it only writes the
+merged dataset with --output PATH. --output also redirects a normal run.
+
+run_sources() returns the finished Pipeline, whose stages carry the counts and
+timings benchmark.py reports.
+
+Every item a stage handles is a tracing span annotated with its source, org
+and URL. The HTTP requests, browser renders and model calls made for it nest
+under it. The trace goes to tracing.TRACE_DIR, and the run ends with
+tracing's summary of time, bytes, tokens, cache hits and errors per stage,
+host and prompt. --metrics PATH (or METRICS_TEXTFILE) also writes those
+totals as a Prometheus textfile.
+
+Fetched pages and extractions are journaled like scrape_all_orgs.py, so
+--partial and --fresh work the same way here.
+"""
+
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import export_web_data
+import fetch_archive
+import http_client
+import source_registry
+import tracing
+from add_citations import get_semantic_scholar_data
+from extraction import print_stats, run_job, MAX_WORKERS, ORG_PROFILE_SCHEMA
+from fetcher import fetch_page
+from html_clean import clean_item, CLEAN_WORKERS
+from listing_crawler import crawl
+from pipeline import Pipeline, Stage
+from run_journal import open_journal
+from scrape_all_orgs import extraction_job as research_job
+from scrape_final_orgs import extraction_job as projects_people_job
+from scrape_research_orgs import publications_job
+from scraper import EXTRACTION_PROMPT as PROFILE_PROMPT
+
+SOURCE_STATE_PATH = "source_runs.json"
+DATASET_PATH = "ai_safety_orgs.json"
+
+# Sources worked on at once; per-host pacing is up to the HTTP client's scheduler
+FETCH_WORKERS = 8
+
+# Semantic Scholar lookups are paced by the host scheduler anyway
+ENRICH_WORKERS = 2
+
+# Fewer characters than this and a "probe" source tries its next URL
+PROBE_MIN_CHARS = 500
+
+LIST_FIELDS = ("projects", "benchmarks", "key_people")
+
+
+def load_state():
+    try:
+        with open(SOURCE_STATE_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state):
+    with open(SOURCE_STATE_PATH, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def due(source, state, now):
+    last_run = state.get(source["id"])
+    return last_run is None or now - last_run >= source["cadence_days"] * 86400
+
+
+def fetch_http(url):
+    try:
+        response = http_client.get(url, timeout=15)
+        response.raise_for_status()
+        return response.text
+    except Exception as e:
+        print(f"  Error fetching {url}: {e}")
+        return None
+
+
+def profile_job(org_name, text, url, cleaned):
+    return {
+        "instructions": PROFILE_PROMPT,
+        "content": text[:8000],
+        "schema": ORG_PROFILE_SCHEMA,
+        "system": "You extract structured data about AI safety organizations.",
+        "max_tokens": 2048,
+        "label": org_name,
+        "url": url,
+        "cleaned": cleaned,
+    }
+
+
+def build_job(extractor, org, url, cleaned):
+    """The extract_all() job for one page, as the owning script would build it."""
+    text = cleaned["text"]
+    if extractor == "publications":
+        return publications_job(cleaned, org["name"], url)
+    if extractor == "research":
+        return research_job(org["name"], text, org.get("type", ""), url, cleaned)
+    if extractor == "projects_people":
+        return {**projects_people_job(org["name"], text), "url": url, "cleaned": cleaned}
+    return profile_job(org["name"], text, url, cleaned)
+
+
+class Once:
+    """fn(key) computed at most once per key, however many threads ask for it."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.values = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def get(self, key):
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self.values:
+                self.values[key] = self.fn(key)
+            return self.values[key]
+
+
+def page_loader(methods, journal, cleaned_pages, partial=False):
+    """
+    Load a page from the journal, or fetch and journal it (methods: url -> http/auto).
+
+    Pages fetched with fetcher.fetch_page() were already cleaned to decide on
+    the browser; that result goes in cleaned_pages so the clean stage reuses it.
+    """
+    def load(url):
+        html = journal.get(f"page:{url}")
+        if html is not None or partial:
+            return html
+        with tracing.span("page", url=url, host=urlparse(url).hostname or "", method=methods[url]) as span:
+            if methods[url] == "http":
+                html = fetch_http(url)
+            else:
+                html, cleaned = fetch_page(url)
+                if cleaned:
+                    cleaned_pages[url] = cleaned
+            if not html:
+                span.fail("no page")
+        if html:
+            journal.record(f"page:{url}", html)
+        return html
+    return load
+
+
+def fetch_methods(sources):
+    """How each URL is fetched; the browser-capable fetcher wins if any source wants it."""
+    methods = {}
+    for source in sources:
+        method = "http" if source["fetch"] == "http" else "auto"
+        for url in source["urls"]:
+            if methods.get(url) != "auto":
+                methods[url] = method
+    return methods
+
+
+def source_pages(source, cache, journal, known, partial=False):
+    """(url, html) for every page a source yields this run."""
+    if source["fetch"] == "crawl":
+        start = source["urls"][0]
+        crawled = journal.get(f"crawl:{start}")
+        if crawled is None and not partial:
+            html = cache.get(start)
+            crawled = list(crawl(start, html=html, known=known)) if html else []
+            if crawled:
+                journal.record(f"crawl:{start}", crawled)
+        return [tuple(page) for page in crawled or []]
+
+    pages = []
+    for url in source["urls"]:
+        html = cache.get(url)
+        if not html:
+            continue
+        if source["fetch"] == "probe":
+            if len(html) > PROBE_MIN_CHARS:
+                return [(url, html)]
+            continue
+        pages.append((url, html))
+    return pages
+
+
+def clean_attributes(item, out):
+    """Span attributes for a clean item, read here since clean_item runs in a worker process."""
+    _, url, raw, cleaned = out
+    return {"url": url, "html_chars": len(raw), "text_chars": len(cleaned["text"]),
+            "links": len(cleaned["links"])}
+
+
+def dataset_org(orgs_data, lookup, name):
+    """The dataset entry for an org, added from its registry metadata if missing."""
+    if name not in lookup:
+        meta = source_registry.org(name)
+        org = {
+            "name": name,
+            "url": meta.get("url", ""),
+            "type": meta.get("type", ""),
+            "country": meta.get("country", ""),
+            "mission": meta.get("mission", ""),
+            "focus_areas": meta.get("focus_areas", []),
+            "projects": [],
+            "benchmarks": [],
+            "key_people": [],
+        }
+        orgs_data.append(org)
+        lookup[name] = org
+        print(f"  + Added new organization {name}")
+    return lookup[name]
+
+
+def merge_items(org, extracted):
+    """Add items not already on the org (by name); returns how many were added."""
+    added = 0
+    for field in LIST_FIELDS:
+        existing = {item["name"].lower() for item in org.get(field, [])}
+        for item in extracted.get(field, []):
+            if item["name"].lower() not in existing:
+                org.setdefault(field, []).append(item)
+                existing.add(item["name"].lower())
+                added += 1
+    # Profiles also fill scalar fields the org doesn't have yet
+    for field in ("mission", "notes"):
+        if extracted.get(field) and not org.get(field):
+            org[field] = extracted[field]
+    if extracted.get("focus_areas") and not org.get("focus_areas"):
+        org["focus_areas"] = extracted["focus_areas"]
+    return added
+
+
+def merge_publications(org, publications):
+    """Add publications not already on the org as projects; returns the new projects."""
+    existing_urls = {p.get("url", "") for p in org.get("projects", [])}
+    existing_titles = {p.get("name", "").lower() for p in org.get("projects", [])}
+    added = []
+    for pub in publications:
+        if pub.get("url") in existing_urls or pub.get("name", "").lower() in existing_titles:
+            continue
+        project = {
+            "name": pub.get("name", "Untitled"),
+            "description": pub.get("description", ""),
+            "status": "published",
+            "url": pub.get("url", ""),
+            "paper_url": pub.get("url", ""),
+            "focus_areas": org.get("focus_areas", []),
+        }
+        org.setdefault("projects", []).append(project)
+        existing_urls.add(project["url"])
+        existing_titles.add(project["name"].lower())
+        added.append(project)
+    return added
+
+
+def enrich(project):
+    """Enrich stage: citation counts for a newly added publication."""
+    data = get_semantic_scholar_data(project["name"], project.get("paper_url"))
+    tracing.annotate(title=project["name"], found=bool(data))
+    if data:
+        project["citations"] = data["citations"]
+        project["influential_citations"] = data.get("influential_citations", 0)
+        if data.get("year"):
+            project.setdefault("year", data["year"])
+        if data.get("semantic_scholar_url"):
+            project["semantic_scholar_url"] = data["semantic_scholar_url"]
+
+
+def run_sources(run_all=False, batch=None, org_name=None, fresh=False, partial=False,
+                enrich_citations=False, export=False, replay=None, output=None, metrics=None):
+    print("=" * 60)
+    print("RUNNING SOURCES")
+    print("=" * 60)
+    if replay:
+        # Offline re-runs ignore cadence and don't count as runs
+        fetch_archive.use_replay(replay)
+        run_all = True
+    else:
+        output = output or DATASET_PATH
+
+    with open(DATASET_PATH, "r") as f:
+        orgs_data = json.load(f)
+    lookup = {org["name"]: org for org in orgs_data}
+
+    state = load_state()
+    now = time.time()
+    selected = [
+        source for source in source_registry.sources(batch)
+        if (org_name is None or source["org"] == org_name) and (run_all or due(source, state, now))
+    ]
+    methods = fetch_methods(selected)
+    print(f"{len(selected)} sources due, {len(methods)} distinct URLs")
+
+    if replay:
+        journal = open_journal("run_sources-replay", fresh=True)
+    else:
+        journal = open_journal("run_sources", fresh=fresh)
+    # url -> html_clean result for pages already parsed while fetching
+    cleaned_pages = {}
+    cache = Once(page_loader(methods, journal, cleaned_pages, partial=partial))
+    # Keyed "<extractor>:<url>", so a page shared by several sources is extracted once
+    jobs = {}
+    extractions = Once(lambda key: run_job(jobs[key], journal))
+    added_by_source = {source["id"]: 0 for source in selected}
+    pages_by_source = {source["id"]: 0 for source in selected}
+    extracted_by_source = {source["id"]: 0 for source in selected}
+
+    def fetch_stage(source):
+        org = lookup.get(source["org"], {})
+        known = {p.get("url") or p.get("paper_url") for p in org.get("projects", [])} - {"", None}
+        pages = source_pages(source, cache, journal, known, partial=partial)
+        pages_by_source[source["id"]] = len(pages)
+        tracing.annotate(source=source["id"], org=source["org"], pages=len(pages))
+        return [(source, url, html, cleaned_pages.get(url)) for url, html in pages]
+
+    def extract_stage(item):
+        source, url, _, cleaned = item
+        key = f"{source['extractor']}:{url}"
+        tracing.annotate(source=source["id"], org=source["org"], extractor=source["extractor"], url=url)
+        if partial and key not in journal:
+            return None
+        org = source_registry.org(source["org"])
+        jobs.setdefault(key, {**build_job(source["extractor"], org, url, cleaned), "key": key})
+        return source, url, extractions.get(key)
+
+    def merge_stage(item):
+        source, url, extracted = item
+        tracing.annotate(source=source["id"], org=source["org"], url=url)
+        if not extracted:
+            return []
+        extracted_by_source[source["id"]] += 1
+        org = dataset_org(orgs_data, lookup, source["org"])
+        if not org.get("url"):
+            org["url"] = url
+        if source["extractor"] == "publications":
+            new_projects = merge_publications(org, extracted.get("publications", []))
+            added_by_source[source["id"]] += len(new_projects)
+            tracing.annotate(added=len(new_projects))
+            return new_projects if enrich_citations else []
+        added = merge_items(org, extracted)
+        added_by_source[source["id"]] += added
+        tracing.annotate(added=added)
+        return []
+
+    stages = [
+        Stage("fetch", fetch_stage, workers=FETCH_WORKERS, fan_out=True),
+        # HTML parsing is CPU-bound, so it runs in a process per core (skipped if fetch_page() did it)
+        Stage("clean", clean_item, workers=CLEAN_WORKERS, processes=True, describe=clean_attributes),
+        Stage("extract", extract_stage, workers=MAX_WORKERS),
+        # One merge worker, so the dataset is only ever mutated from one thread
+        Stage("merge", merge_stage, fan_out=True),
+    ]
+    if enrich_citations:
+        stages.append(Stage("enrich", enrich, workers=ENRICH_WORKERS))
+    pipeline = Pipeline(stages)
+    pipeline.run(selected)
+
+    for source in selected:
+        if pages_by_source[source["id"]]:
+            print(f"  ✓ {source['id']}: +{added_by_source[source['id']]} items "
+                  f"from {pages_by_source[source['id']]} pages")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(orgs_data, f, indent=2)
+    else:
+        print("\nReplay without --output; the merged dataset was not saved")
+    if partial:
+        print(f"\nPartial merge; {journal.path} kept for the next run")
+    else:
+        if not replay:
+            # A source that fetched nothing or whose extractions all failed stays due
+            for source in selected:
+                if pages_by_source[source["id"]] and extracted_by_source[source["id"]]:
+                    state[source["id"]] = now
+            save_state(state)
+        journal.clear()
+    if export and output == export_web_data.SOURCE_PATH:
+        export_web_data.main()
+
+    print("\n" + "=" * 60)
+    print("COMPLETE")
+    print("=" * 60)
+    print(f"Sources run: {len(selected)}")
+    print(f"Pages read: {sum(pages_by_source.values())}")
+    print(f"Items added: {sum(added_by_source.values())}")
+    pipeline.print_report()
+    print_stats()
+    tracing.print_summary()
+    written = tracing.write_metrics(metrics)
+    if written:
+        print(f"Metrics: {written}")
+    return pipeline
+
+
+def flag_value(flag):
+    if flag in sys.argv:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return None
+
+
+if __name__ == "__main__":
+    run_sources(
+        run_all="--all" in sys.argv,
+        batch=flag_value("--batch"),
+        org_name=flag_value("--org"),
+        fresh="--fresh" in sys.argv,
+        partial="--partial" in sys.argv,
+        enrich_citations="--enrich" in sys.argv,
+        export="--export" in sys.argv,
+        replay=flag_value("--replay"),
+        output=flag_value("--output"),
+        metrics=flag_value("--metrics"),
+    )
@@ -0,0 +1,237 @@
+"""
+How the matching, merging and exporting steps scale with the dataset.
+
+Each scale builds a synthetic_dataset.generate() dataset and times each step
+on it. Matching inputs grow with the dataset: PAPERS_PER_SCALE MATS papers and
+RESEARCHERS_PER_SCALE FLI researchers per 1x. The steps:
+
+    match_mats       check_mats_papers.find_missing()
+    match_fli        add_fli_researchers.add_researchers()
+    match_fli_page   scrape_fli_researchers.add_researchers_to_orgs()
+    match_fli_full   scrape_fli_full.add_researchers_to_orgs()
+    merge_items      run_sources.merge_items(): one extraction per org, half
+                     of it already present
+    merge_pubs       run_sources.merge_publications(), the same way
+    export           export_web_data.main(embeddings=False): data.json,
+                     version, BM25 index
+    airtable         convert_to_airtable.main()
+
+Steps that mutate the dataset get their own copy of the lists they touch.
+Exports run in a scratch directory. Between two scales, a step's growth
+exponent is log(t2 / t1) / log(s2 / s1). It is 1.0 for linear work and 2.0
+for a loop over everything per item. A step above MAX_EXPONENT is reported as
+a scaling regression and the run exits 1. The SCANNING name matchers are
+quadratic by design and are held to SCAN_MAX_EXPONENT instead, so they still
+fail the run if they grow worse than that. A step that takes longer than
+--budget seconds is skipped at the larger scales.
+
+    python scale_benchmark.py [--scales 10,100,1000] [--budget 120] [--seed 0]
+                              [--out scale.json] [--compare base.json]
+"""
+
+import contextlib
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import add_fli_researchers
+import check_mats_papers
+import convert_to_airtable
+import export_web_data
+import scrape_fli_full
+import scrape_fli_researchers
+import synthetic_dataset
+from run_sources import merge_items, merge_publications
+
+SCALES = (10, 100, 1000)
+
+PAPERS_PER_SCALE = 150
+RESEARCHERS_PER_SCALE = 150
+
+# Anything past this between two scales is treated as superlinear
+MAX_EXPONENT = 1.3
+
+# The name matchers scan every name per query (name_index.py). That is
+# quadratic by design and cheap at the real dataset's size, so they get a
+# looser bound: quadratic plus noise (match_mats measures 1.9-2.1), which a
+# scan nested in another loop over the dataset would still exceed.
+SCANNING = {"match_mats", "match_fli", "match_fli_page", "match_fli_full"}
+SCAN_MAX_EXPONENT = 2.3
+
+# Don't fit an exponent to timings this small; they are mostly noise
+MIN_SECONDS = 0.05
+
+DEFAULT_BUDGET = 120.0
+
+
+def people_copy(orgs):
+    """orgs with fresh key_people lists, so FLI steps can append without side effects."""
+    return [{**org, "key_people": list(org.get("key_people", []))} for org in orgs]
+
+
+def extractions(orgs, field):
+    """Per-org extraction results: half names the org already has, half new ones."""
+    results = []
+    for org in orgs:
+        items = org.get(field, [])
+        known = items[: len(items) // 2]
+        new = [{**item, "name": f"{item['name']} (revised)"} for item in items[len(items) // 2:]]
+        results.append(known + new)
+    return results
+
+
+def export(orgs):
+    workdir = tempfile.mkdtemp(prefix="scale-")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        os.makedirs("web/app")
+        with open(export_web_data.SOURCE_PATH, "w") as f:
+            json.dump(orgs, f)
+        export_web_data.main(embeddings=False)
+        convert_start = time.perf_counter()
+        convert_to_airtable.main()
+        return time.perf_counter() - convert_start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_scale(orgs, scale, skip, seed=0):
+    """{step: seconds} for one scale; steps in skip are left out."""
+    dataset = synthetic_dataset.generate(orgs, scale, seed)
+    papers = synthetic_dataset.mats_papers(dataset, PAPERS_PER_SCALE * scale, seed)
+    researchers = synthetic_dataset.fli_researchers(dataset, RESEARCHERS_PER_SCALE * scale, seed)
+    steps = {
+        "match_mats": (lambda: None, lambda _: check_mats_papers.find_missing(dataset, papers)),
+        "match_fli": (lambda: people_copy(dataset),
+                      lambda copy: add_fli_researchers.add_researchers(researchers, copy)),
+        "match_fli_page": (lambda: people_copy(dataset),
+                           lambda copy: scrape_fli_researchers.add_researchers_to_orgs(researchers, copy)),
+        "match_fli_full": (lambda: people_copy(dataset),
+                           lambda copy: scrape_fli_full.add_researchers_to_orgs(researchers, copy)),
+        "merge_items": (
+            lambda: ([{**org, "projects": list(org.get("projects", [])),
+                       "key_people": list(org.get("key_people", []))} for org in dataset],
+                     extractions(dataset, "projects"), extractions(dataset, "key_people")),
+            lambda setup: [merge_items(org, {"projects": projects, "key_people": people})
+                           for org, projects, people in zip(*setup)],
+        ),
+        "merge_pubs": (
+            lambda: ([{**org, "projects": list(org.get("projects", []))} for org in dataset],
+                     extractions(dataset, "projects")),
+            lambda setup: [merge_publications(org, pubs) for org, pubs in zip(*setup)],
+        ),
+    }
+    timings = {}
+    print(f"\n{scale}x: {len(dataset)} orgs, {sum(len(o.get('projects', [])) for o in dataset)} projects, "
+          f"{len(papers)} papers, {len(researchers)} researchers")
+    for name, (setup, step) in steps.items():
+        if name in skip:
+            continue
+        prepared = setup()
+        start = time.perf_counter()
+        # The FLI steps print a line per researcher
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            step(prepared)
+        timings[name] = time.perf_counter() - start
+        print(f"  {name:<15} {timings[name]:8.2f}s")
+    if "export" not in skip:
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            airtable = export(dataset)
+        timings["export"] = time.perf_counter() - start - airtable
+        timings["airtable"] = airtable
+        print(f"  {'export':<15} {timings['export']:8.2f}s")
+        print(f"  {'airtable':<15} {timings['airtable']:8.2f}s")
+    return timings
+
+
+def exponent(t1, t2, s1, s2):
+    if t1 < MIN_SECONDS or t2 < MIN_SECONDS:
+        return None
+    return math.log(t2 / t1) / math.log(s2 / s1)
+
+
+def run(scales=SCALES, budget=DEFAULT_BUDGET, seed=0):
+    with open(synthetic_dataset.SOURCE_PATH) as f:
+        orgs = json.load(f)
+    results = {}
+    skip = set()
+    for scale in scales:
+        timings = run_scale(orgs, scale, skip, seed)
+        results[scale] = timings
+        skip |= {name for name, seconds in timings.items() if seconds > budget}
+    return results
+
+
+def growth(results):
+    """{step: [exponent between consecutive scales, ...]}"""
+    scales = sorted(results)
+    steps = {name for timings in results.values() for name in timings}
+    return {
+        name: [
+            exponent(results[s1][name], results[s2][name], s1, s2)
+            if name in results[s1] and name in results[s2] else None
+            for s1, s2 in zip(scales, scales[1:])
+        ]
+        for name in sorted(steps)
+    }
+
+
+def print_report(results, base=None):
+    scales = sorted(results)
+    exponents = growth(results)
+    print("\n" + "=" * 60)
+    print("SCALING")
+    print("=" * 60)
+    print(f"  {'step':<15}" + "".join(f"{f'{s}x':>10}" for s in scales) + "   growth")
+    regressions = []
+    for name, steps in exponents.items():
+        cells = "".join(
+            f"{results[s][name]:>9.2f}s" if name in results[s] else f"{'skipped':>10}" for s in scales
+        )
+        shown = ", ".join("-" if e is None else f"{e:.2f}" for e in steps)
+        flag = ""
+        limit = SCAN_MAX_EXPONENT if name in SCANNING else MAX_EXPONENT
+        if any(e is not None and e > limit for e in steps):
+            flag = "  ✗ superquadratic" if name in SCANNING else "  ✗ superlinear"
+            regressions.append(name)
+        elif name in SCANNING:
+            flag = f"  (scans names, max {SCAN_MAX_EXPONENT})"
+        print(f"  {name:<15}{cells}   {shown}{flag}")
+    if base:
+        print("\nCompared with the saved run:")
+        for scale in scales:
+            for name, seconds in results[scale].items():
+                old = base.get(str(scale), {}).get(name)
+                if old:
+                    print(f"  {f'{scale}x':>6} {name:<15} {old:.2f}s → {seconds:.2f}s ({(seconds - old) / old:+.0%})")
+    return regressions
+
+
+def flag_value(flag):
+    if flag in sys.argv:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return None
+
+
+if __name__ == "__main__":
+    scales = tuple(int(s) for s in flag_value("--scales").split(",")) if flag_value("--scales") else SCALES
+    results = run(scales, float(flag_value("--budget") or DEFAULT_BUDGET), int(flag_value("--seed") or 0))
+    base = None
+    if flag_value("--compare"):
+        with open(flag_value("--compare")) as f:
+            base = json.load(f)
+    regressions = print_report(results, base)
+    if flag_value("--out"):
+        with open(flag_value("--out"), "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved to {flag_value('--out')}")
+    if regressions:
+        print(f"\n✗ Scaling past the bound in: {', '.join(regressions)}")
+        sys.exit(1)
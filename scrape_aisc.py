@@ -3,10 +3,10 @@ Scrape AI Safety Camp (AISC) data.
 AISC runs camps where participants work on alignment research projects.
 """
 
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
-import time
+from site_extractors import alignment_forum_posts, arxiv_atom
 
 def scrape_aisc():
     """Scrape AISC website for camp info and projects."""
@@ -14,7 +14,7 @@ def scrape_aisc():
     url = "https://aisafety.camp/"
     
     try:
-        response = requests.get(url, timeout=30)
+        response = http_client.get(url, timeout=30)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, "html.parser")
         
@@ -67,7 +67,7 @@ def scrape_alignment_forum():
     """
     
     try:
-        response = requests.post(
+        response = http_client.post(
             api_url,
             json={"query": query},
             headers={"Content-Type": "application/json"},
@@ -75,17 +75,16 @@ def scrape_alignment_forum():
         )
         
         if response.status_code == 200:
-            data = response.json()
-            posts = data.get("data", {}).get("posts", {}).get("results", [])
+            posts = alignment_forum_posts(response.text, api_url)["publications"]
             
             publications = []
             for post in posts:
                 publications.append({
-                    "title": post.get("title"),
-                    "url": f"https://www.alignmentforum.org/posts/{post.get('slug')}",
-                    "author": post.get("author"),
-                    "score": post.get("baseScore"),
-                    "date": post.get("postedAt"),
+                    "title": post["name"],
+                    "url": post["url"],
+                    "author": post["authors"][0] if post["authors"] else None,
+                    "score": post["score"],
+                    "date": post["date"],
                 })
             
             return publications
@@ -126,34 +125,26 @@ def scrape_arxiv_safety_papers(max_results=100):
         }
         
         try:
-            response = requests.get(base_url, params=params, timeout=30)
+            response = http_client.get(base_url, params=params, timeout=30)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, "xml")
-                entries = soup.find_all("entry")
+                entries = arxiv_atom(response.text, response.url)["publications"]
                 
                 for entry in entries:
-                    arxiv_id = entry.find("id").text.split("/")[-1]
+                    arxiv_id = entry["arxiv_id"]
                     
                     if arxiv_id in seen_ids:
                         continue
                     seen_ids.add(arxiv_id)
                     
-                    title = entry.find("title").text.strip().replace("\n", " ")
-                    authors = [a.find("name").text for a in entry.find_all("author")]
-                    summary = entry.find("summary").text.strip()[:500]
-                    published = entry.find("published").text[:10]
-                    
                     all_papers.append({
-                        "title": title,
-                        "url": f"https://arxiv.org/abs/{arxiv_id}",
-                        "authors": authors,
-                        "summary": summary,
-                        "date": published,
+                        "title": entry["name"],
+                        "url": entry["url"],
+                        "authors": entry["authors"],
+                        "summary": entry["description"],
+                        "date": entry["date"],
                         "source": "arXiv"
                     })
-                
-            time.sleep(1)  # Be nice to arXiv
             
         except Exception as e:
             print(f"Error searching arXiv for '{term}': {e}")
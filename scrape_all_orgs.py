@@ -1,348 +1,108 @@
 """
 Comprehensive scraper for AI safety organizations.
 Extracts research projects, publications, and benchmarks from each org.
+
+With --refresh, only the items that appeared in each org's feeds and
+sitemaps since the last run are fetched, instead of the listing pages. The
+first refresh only records what they list, and items the org already has are
+skipped.
+Items that couldn't be fetched or extracted are tried again next refresh.
+
+Finished orgs and page extractions are journaled as they complete, so a
+crashed or interrupted run picks up where it stopped. --partial merges just
+what the journal already holds, --fresh discards it and starts over.
+
+Fetches, cleans, extractions and merges are tracing spans, summarized at the
+end of the run.
 """
 
 import json
-import time
-import re
-import os
-import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
-from anthropic import Anthropic
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+import sys
+import source_registry
+import tracing
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from discovery import discover, load_state, save_state, settle, site_key, site_root
+from extraction import extract_all, print_stats, RESEARCH_SCHEMA
+from fetcher import fetch_page
+from run_journal import open_journal
 
-# Initialize Anthropic client with API key from env
-api_key = os.getenv("ANTHROPIC_API_KEY")
-if not api_key:
-    raise ValueError("ANTHROPIC_API_KEY not found in environment")
-client = Anthropic(api_key=api_key)
+# Orgs fetched at once; per-host pacing is up to the HTTP client's scheduler
+FETCH_WORKERS = 8
 
-# Organization URLs for research/projects pages
+# Organization URLs for research/projects pages (see sources.json)
 ORGS_TO_SCRAPE = {
-    "US AI Safety Institute": {
-        "urls": [
-            "https://www.nist.gov/aisi",
-            "https://www.nist.gov/artificial-intelligence/executive-order-safe-secure-and-trustworthy-artificial-intelligence"
-        ],
-        "type": "Government AISI"
-    },
-    "UK AI Safety Institute": {
-        "urls": [
-            "https://www.aisi.gov.uk/work",
-            "https://www.aisi.gov.uk/research"
-        ],
-        "type": "Government AISI"
-    },
-    "EU AI Office": {
-        "urls": [
-            "https://digital-strategy.ec.europa.eu/en/policies/ai-office"
-        ],
-        "type": "Government AISI"
-    },
-    "Japan AI Safety Institute": {
-        "urls": [
-            "https://aisi.go.jp/en/"
-        ],
-        "type": "Government AISI"
-    },
-    "Anthropic": {
-        "urls": [
-            "https://www.anthropic.com/research",
-            "https://www.anthropic.com/news"
-        ],
-        "type": "Lab Safety Team"
-    },
-    "OpenAI Safety": {
-        "urls": [
-            "https://openai.com/safety",
-            "https://openai.com/research"
-        ],
-        "type": "Lab Safety Team"
-    },
-    "Google DeepMind Safety": {
-        "urls": [
-            "https://deepmind.google/discover/blog/",
-            "https://deepmind.google/research/"
-        ],
-        "type": "Lab Safety Team"
-    },
-    "Conjecture": {
-        "urls": [
-            "https://www.conjecture.dev/research"
-        ],
-        "type": "Lab Safety Team"
-    },
-    "MIRI": {
-        "urls": [
-            "https://intelligence.org/research/",
-            "https://intelligence.org/blog/"
-        ],
-        "type": "Nonprofit"
-    },
-    "Redwood Research": {
-        "urls": [
-            "https://www.redwoodresearch.org/research"
-        ],
-        "type": "Nonprofit"
-    },
-    "ARC (Alignment Research Center)": {
-        "urls": [
-            "https://www.alignment.org/"
-        ],
-        "type": "Nonprofit"
-    },
-    "Apollo Research": {
-        "urls": [
-            "https://www.apolloresearch.ai/research",
-            "https://www.apolloresearch.ai/blog"
-        ],
-        "type": "Nonprofit"
-    },
-    "METR": {
-        "urls": [
-            "https://metr.org/research",
-            "https://metr.org/blog"
-        ],
-        "type": "Nonprofit"
-    },
-    "Center for AI Safety": {
-        "urls": [
-            "https://www.safe.ai/research",
-            "https://www.safe.ai/work"
-        ],
-        "type": "Nonprofit"
-    },
-    "Center on Long-Term Risk": {
-        "urls": [
-            "https://longtermrisk.org/research/"
-        ],
-        "type": "Nonprofit"
-    },
-    "MATS": {
-        "urls": [
-            "https://www.matsprogram.org/research"
-        ],
-        "type": "Nonprofit"
-    },
-    "FAR AI": {
-        "urls": [
-            "https://far.ai/publication/",
-            "https://far.ai/research/"
-        ],
-        "type": "Nonprofit"
-    },
-    "Epoch AI": {
-        "urls": [
-            "https://epoch.ai/research",
-            "https://epoch.ai/blog"
-        ],
-        "type": "Nonprofit"
-    },
-    "Apart Research": {
-        "urls": [
-            "https://apartresearch.com/research"
-        ],
-        "type": "Nonprofit"
-    },
-    "EleutherAI": {
-        "urls": [
-            "https://www.eleuther.ai/research",
-            "https://blog.eleuther.ai/"
-        ],
-        "type": "Nonprofit"
-    },
-    "Future of Life Institute": {
-        "urls": [
-            "https://futureoflife.org/project/",
-            "https://futureoflife.org/cause-area/artificial-intelligence/"
-        ],
-        "type": "Nonprofit"
-    },
-    "AI Safety Camp": {
-        "urls": [
-            "https://aisafety.camp/projects/"
-        ],
-        "type": "Nonprofit"
-    },
-    "Ought / Elicit": {
-        "urls": [
-            "https://elicit.com/",
-            "https://ought.org/research"
-        ],
-        "type": "Nonprofit"
-    },
-    "CSET Georgetown": {
-        "urls": [
-            "https://cset.georgetown.edu/publications/",
-            "https://cset.georgetown.edu/research/"
-        ],
-        "type": "Think Tank"
-    },
-    "GovAI Oxford": {
-        "urls": [
-            "https://www.governance.ai/research",
-            "https://www.governance.ai/research-paper"
-        ],
-        "type": "Think Tank"
-    },
-    "CHAI Berkeley": {
-        "urls": [
-            "https://humancompatible.ai/research",
-            "https://humancompatible.ai/publications"
-        ],
-        "type": "Academic"
-    },
+    source["org"]: {
+        "urls": source["urls"],
+        "type": source_registry.org(source["org"])["type"],
+        "source": source["id"],
+    }
+    for source in source_registry.sources("all_orgs")
 }
 
+# Same for every page so it can be served from the prompt cache
+EXTRACTION_INSTRUCTIONS = """Extract research projects, publications, and benchmarks from the AI safety organization's webpage content in the user message.
 
-def fetch_page_content(url, use_playwright=False):
-    """Fetch page content, optionally using Playwright for JS-rendered pages."""
-    try:
-        if use_playwright:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.goto(url, timeout=30000)
-                time.sleep(2)  # Wait for JS
-                content = page.content()
-                browser.close()
-                return content
-        else:
-            response = requests.get(
-                url, 
-                headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"},
-                timeout=30
-            )
-            return response.text
-    except Exception as e:
-        print(f"    Error fetching {url}: {e}")
-        return None
+Only include items you can clearly identify from the content. If you can't find any items for a category, return an empty array.
+Focus on AI safety research, evaluations, alignment work, and safety benchmarks."""
 
 
-def extract_with_llm(org_name, content, org_type):
-    """Use Claude to extract structured research data from page content."""
+def extraction_job(org_name, content, org_type, url=None, cleaned=None):
+    """Build the extract() arguments for one page of research content."""
     
     # Truncate content if too long
     if len(content) > 50000:
         content = content[:50000]
     
-    prompt = f"""Extract research projects, publications, and benchmarks from this {org_type} organization's webpage content.
-
-Organization: {org_name}
-
-Return a JSON object with this exact structure:
-{{
-    "projects": [
-        {{
-            "name": "Project name",
-            "description": "Brief description",
-            "status": "Active" or "Completed" or "published",
-            "paper_url": "URL if available, otherwise empty string"
-        }}
-    ],
-    "benchmarks": [
-        {{
-            "name": "Benchmark name",
-            "measures": "What it measures",
-            "status": "Active"
-        }}
-    ],
-    "key_people": [
-        {{
-            "name": "Person name",
-            "role": "Their role"
-        }}
-    ]
-}}
-
-Only include items you can clearly identify from the content. If you can't find any items for a category, return an empty array.
-Focus on AI safety research, evaluations, alignment work, and safety benchmarks.
-
-Webpage content:
-{content}
+    return {
+        "instructions": EXTRACTION_INSTRUCTIONS,
+        "content": f"Organization: {org_name} ({org_type})\n\nWebpage content:\n{content}",
+        "schema": RESEARCH_SCHEMA,
+        "max_tokens": 4000,
+        "label": org_name,
+        "url": url,
+        "cleaned": cleaned,
+    }
 
-Return ONLY the JSON object, no other text."""
 
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        result_text = response.content[0].text.strip()
-        
-        # Clean up response
-        if result_text.startswith("```"):
-            result_text = re.sub(r'^```json?\n?', '', result_text)
-            result_text = re.sub(r'\n?```$', '', result_text)
+def fetch_org_pages(org_name, config):
+    """Fetch every research page of an organization as (url, cleaned), one "fetch" span each."""
+    pages = []
+    
+    for url in config["urls"]:
+        with tracing.span("fetch", org=org_name, url=url, host=urlparse(url).hostname or "") as span:
+            # Plain HTTP or Playwright, whichever worked for this domain before
+            content, cleaned = fetch_page(url)
+            
+            if not content:
+                span.fail("no page")
+                continue
+            
+            # Parsed in the cleaning process pool while deciding how to fetch
+            text_content = cleaned["text"]
+            span.set(text_chars=len(text_content))
+            
+            if len(text_content) < 200:
+                span.fail("not enough content")
+                continue
         
-        return json.loads(result_text)
-    except Exception as e:
-        print(f"    LLM extraction error: {e}")
-        return {"projects": [], "benchmarks": [], "key_people": []}
+        pages.append((url, cleaned))
+    
+    return pages
 
 
-def scrape_org(org_name, config):
-    """Scrape a single organization."""
-    print(f"\n{'='*60}")
-    print(f"Scraping: {org_name}")
-    print(f"{'='*60}")
-    
+def combine_results(extracted_pages):
+    """Concatenate per-page extractions and deduplicate by name."""
     all_projects = []
     all_benchmarks = []
     all_people = []
     
-    for url in config["urls"]:
-        print(f"  → {url}")
-        
-        # Try regular fetch first, then Playwright
-        content = fetch_page_content(url, use_playwright=False)
-        if not content or len(content) < 1000:
-            print(f"    Trying Playwright...")
-            content = fetch_page_content(url, use_playwright=True)
-        
-        if not content:
-            print(f"    Failed to fetch content")
+    for extracted in extracted_pages:
+        if not extracted:
             continue
-        
-        # Parse with BeautifulSoup to get text
-        soup = BeautifulSoup(content, "html.parser")
-        
-        # Remove script and style elements
-        for element in soup(["script", "style", "nav", "footer", "header"]):
-            element.decompose()
-        
-        text_content = soup.get_text(separator="\n", strip=True)
-        
-        if len(text_content) < 200:
-            print(f"    Not enough content ({len(text_content)} chars)")
-            continue
-        
-        print(f"    Got {len(text_content)} chars, extracting with LLM...")
-        
-        # Extract with LLM
-        extracted = extract_with_llm(org_name, text_content, config["type"])
-        
-        if extracted.get("projects"):
-            print(f"    Found {len(extracted['projects'])} projects")
-            all_projects.extend(extracted["projects"])
-        
-        if extracted.get("benchmarks"):
-            print(f"    Found {len(extracted['benchmarks'])} benchmarks")
-            all_benchmarks.extend(extracted["benchmarks"])
-        
-        if extracted.get("key_people"):
-            print(f"    Found {len(extracted['key_people'])} people")
-            all_people.extend(extracted["key_people"])
-        
-        # Rate limit
-        time.sleep(1)
+        all_projects.extend(extracted.get("projects", []))
+        all_benchmarks.extend(extracted.get("benchmarks", []))
+        all_people.extend(extracted.get("key_people", []))
     
     # Deduplicate
     seen_projects = set()
@@ -376,7 +136,14 @@ def scrape_org(org_name, config):
     }
 
 
-def main():
+def scrape_org(org_name, config):
+    """Scrape a single organization."""
+    pages = fetch_org_pages(org_name, config)
+    jobs = [extraction_job(org_name, cleaned["text"], config["type"], url, cleaned) for url, cleaned in pages]
+    return combine_results(extract_all(jobs))
+
+
+def main(refresh=False, fresh=False, partial=False):
     print("=" * 60)
     print("COMPREHENSIVE AI SAFETY ORG SCRAPER")
     print("=" * 60)
@@ -394,52 +161,127 @@ def main():
     total_new_benchmarks = 0
     total_new_people = 0
     
-    # Scrape each org
-    for org_name, config in ORGS_TO_SCRAPE.items():
+    # Fetch every page first, then run all LLM extractions concurrently
+    discovery_state = load_state() if refresh else None
+    # org -> URLs discover() handed out this run
+    discovered = {}
+    journal = open_journal("scrape_all_orgs", fresh=fresh)
+    
+    def fetch_org(item):
+        org_name, config = item
+        site = site_key(site_root(config["urls"][0]), config["source"])
+        done = journal.get(f"pages:{org_name}")
+        if done is not None:
+            if refresh and done["discovery"] is not None:
+                discovery_state[site] = done["discovery"]
+                discovered[org_name] = done["discovered"]
+            return [tuple(page) for page in done["pages"]]
+        if partial:
+            return []
+        if refresh:
+            # Items the org already has aren't fetched again
+            org = org_lookup.get(org_name, {})
+            known = {p.get("url") or p.get("paper_url") for p in org.get("projects", [])}
+            with tracing.span("discover", org=org_name) as span:
+                new_urls = discover(site_root(config["urls"][0]), discovery_state,
+                                    source=config["source"], known=known - {"", None})
+                span.set(items=len(new_urls))
+            discovered[org_name] = new_urls
+            config = {**config, "urls": new_urls}
         try:
-            result = scrape_org(org_name, config)
-            
-            if org_name in org_lookup:
-                org = org_lookup[org_name]
-                
-                # Add new projects
-                existing_project_names = {p["name"].lower() for p in org.get("projects", [])}
-                for project in result["projects"]:
-                    if project["name"].lower() not in existing_project_names:
-                        if "projects" not in org:
-                            org["projects"] = []
-                        org["projects"].append(project)
-                        total_new_projects += 1
+            pages = fetch_org_pages(org_name, config)
+        except Exception as e:
+            print(f"  ✗ Error fetching {org_name}: {e}")
+            return []
+        journal.record(f"pages:{org_name}", {
+            "pages": pages,
+            "discovery": discovery_state.get(site) if refresh else None,
+            "discovered": discovered.get(org_name),
+        })
+        return pages
+    
+    # Orgs are fetched in parallel; the HTTP client spaces requests per host
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        pages_by_org = dict(zip(ORGS_TO_SCRAPE, pool.map(fetch_org, ORGS_TO_SCRAPE.items())))
+    
+    jobs = []
+    owners = []
+    for org_name, pages in pages_by_org.items():
+        for url, cleaned in pages:
+            key = f"extract:{org_name}:{url}"
+            if partial and key not in journal:
+                continue
+            job = extraction_job(org_name, cleaned["text"], ORGS_TO_SCRAPE[org_name]["type"], url, cleaned)
+            jobs.append({**job, "key": key})
+            owners.append((org_name, url))
+    
+    print(f"\nExtracting {len(jobs)} pages with LLM...")
+    extracted_by_org = {org_name: [] for org_name in pages_by_org}
+    extracted_urls = set()
+    for (org_name, url), extracted in zip(owners, extract_all(jobs, journal=journal)):
+        extracted_by_org[org_name].append(extracted)
+        if extracted is not None:
+            extracted_urls.add((org_name, url))
+    
+    # Merge in the original org order
+    for org_name, extracted_pages in extracted_by_org.items():
+        try:
+            with tracing.span("merge", org=org_name) as span:
+                result = combine_results(extracted_pages)
                 
-                # Add new benchmarks
-                existing_benchmark_names = {b["name"].lower() for b in org.get("benchmarks", [])}
-                for benchmark in result["benchmarks"]:
-                    if benchmark["name"].lower() not in existing_benchmark_names:
-                        if "benchmarks" not in org:
-                            org["benchmarks"] = []
-                        org["benchmarks"].append(benchmark)
-                        total_new_benchmarks += 1
+                if org_name in org_lookup:
+                    org = org_lookup[org_name]
+                    
+                    # Add new projects
+                    existing_project_names = {p["name"].lower() for p in org.get("projects", [])}
+                    for project in result["projects"]:
+                        if project["name"].lower() not in existing_project_names:
+                            if "projects" not in org:
+                                org["projects"] = []
+                            org["projects"].append(project)
+                            existing_project_names.add(project["name"].lower())
+                            total_new_projects += 1
+                    
+                    # Add new benchmarks
+                    existing_benchmark_names = {b["name"].lower() for b in org.get("benchmarks", [])}
+                    for benchmark in result["benchmarks"]:
+                        if benchmark["name"].lower() not in existing_benchmark_names:
+                            if "benchmarks" not in org:
+                                org["benchmarks"] = []
+                            org["benchmarks"].append(benchmark)
+                            existing_benchmark_names.add(benchmark["name"].lower())
+                            total_new_benchmarks += 1
+                    
+                    # Add new people
+                    existing_people_names = {p["name"].lower() for p in org.get("key_people", [])}
+                    for person in result["key_people"]:
+                        if person["name"].lower() not in existing_people_names:
+                            if "key_people" not in org:
+                                org["key_people"] = []
+                            org["key_people"].append(person)
+                            existing_people_names.add(person["name"].lower())
+                            total_new_people += 1
                 
-                # Add new people
-                existing_people_names = {p["name"].lower() for p in org.get("key_people", [])}
-                for person in result["key_people"]:
-                    if person["name"].lower() not in existing_people_names:
-                        if "key_people" not in org:
-                            org["key_people"] = []
-                        org["key_people"].append(person)
-                        total_new_people += 1
-            
-            print(f"  ✓ {org_name}: +{len(result['projects'])} projects, +{len(result['benchmarks'])} benchmarks, +{len(result['key_people'])} people")
+                span.set(projects=len(result["projects"]), benchmarks=len(result["benchmarks"]),
+                         people=len(result["key_people"]))
             
         except Exception as e:
-            print(f"  ✗ Error scraping {org_name}: {e}")
-        
-        # Rate limit between orgs
-        time.sleep(1)
+            print(f"  ✗ Error merging {org_name}: {e}")
     
     # Save updated data
     with open("ai_safety_orgs.json", "w") as f:
         json.dump(existing_orgs, f, indent=2)
+    if partial:
+        print(f"\nPartial merge; {journal.path} kept for the next run")
+    else:
+        if refresh:
+            # Items whose fetch or extraction failed are handed out again next time
+            for org_name, urls in discovered.items():
+                failed = [url for url in urls if (org_name, url) not in extracted_urls]
+                config = ORGS_TO_SCRAPE[org_name]
+                settle(discovery_state, site_root(config["urls"][0]), urls, failed, source=config["source"])
+            save_state(discovery_state)
+        journal.clear()
     
     print("\n" + "=" * 60)
     print("SCRAPING COMPLETE")
@@ -448,8 +290,10 @@ def main():
     print(f"New benchmarks added: {total_new_benchmarks}")
     print(f"New people added: {total_new_people}")
     print("\nSaved to ai_safety_orgs.json")
+    print_stats()
+    tracing.print_summary()
 
 
 if __name__ == "__main__":
-    main()
+    main(refresh="--refresh" in sys.argv, fresh="--fresh" in sys.argv, partial="--partial" in sys.argv)
 
@@ -3,150 +3,27 @@ Find URLs and scrape the final 83 organizations.
 """
 
 import json
-import time
-import re
-import os
-import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
-from anthropic import Anthropic
-from dotenv import load_dotenv
-
-load_dotenv()
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
-# Research URLs for remaining orgs
-REMAINING_ORGS = {
-    # 8 staff
-    "Guide Labs": ["https://guidelabs.ai/"],
-    "CSIS Wadhwani AI Center": ["https://www.csis.org/programs/wadhwani-center-ai-and-advanced-technologies"],
-    
-    # 7 staff
-    "Encode AI": ["https://encode.org/"],
-    "Meridian": ["https://www.meridian.org/"],
-    "MAIA": ["https://maia.ai/"],
-    "Tarbell Fellowship": ["https://www.tarbellai.org/"],
-    "Safe AI Forum": ["https://www.safeaiforum.org/"],
-    "Forethought": ["https://forethought.org/"],
-    "Arcadia Impact": ["https://www.arcadiaimpact.org/"],
-    
-    # 6 staff
-    "Pivotal Research": ["https://pivotal-research.org/"],
-    "Seismic": ["https://seismic.ai/"],
-    "Odyssean Institute": ["https://odysseaninstitute.org/"],
-    "Hortus AI": ["https://hortus.ai/"],
-    "AVERI": ["https://averi.ai/"],
-    "Tilde Research": ["https://tilderesearch.com/"],
-    
-    # 5 staff
-    "Conscium": ["https://conscium.ai/"],
-    "LISA": ["https://lisa.ai/"],
-    "Geodesic Research": ["https://geodesic-research.org/"],
-    "Dovetail Research": ["https://dovetailresearch.org/"],
-    "AI Futures Project": ["https://aifuturesproject.org/"],
-    "Whitebox Research": ["https://whitebox-research.org/"],
-    "Cadenza Labs": ["https://cadenzalabs.ai/"],
-    "EleosAI": ["https://eleos.ai/"],
-    "Realm Labs": ["https://realmlabs.ai/"],
-    "Heron AI Security": ["https://heron.ai/"],
-    
-    # 4 staff
-    "TFI": ["https://tfi.ai/"],
-    "CBAI": ["https://cbai.org/"],
-    "Harmony Intelligence": ["https://harmonyintelligence.ai/"],
-    "AI Safety Awareness Project": ["https://aisafetyawareness.org/"],
-    "Noema Research": ["https://noemaresearch.org/"],
-    "Evitable": ["https://evitable.ai/"],
-    "GPAI Policy Lab": ["https://gpai.ai/"],
-    "Golden Gate Institute for AI": ["https://goldengateinstitute.ai/"],
-    "Charles University ACS": ["https://ufal.mff.cuni.cz/"],
-    "Kairos": ["https://kairos.ai/"],
-    
-    # 3 staff
-    "Truthful AI": ["https://truthful.ai/"],
-    "AI Underwriting Company": ["https://aiunderwriting.com/"],
-    "Midas Project": ["https://midasproject.org/"],
-    "Oxford Martin AIGI": ["https://www.oxfordmartin.ox.ac.uk/ai-governance/"],
-    "Watertight AI": ["https://watertight.ai/"],
-    "MAI": ["https://mai.ai/"],
-    "CLAIR": ["https://clair.ai/"],
-    "Asymmetric Security": ["https://asymmetricsecurity.com/"],
-    "Atlas Computing": ["https://atlascomputing.org/"],
-    "Fulcrum Research": ["https://fulcrumresearch.org/"],
-    "Safeguarded AI": ["https://safeguarded.ai/"],
-    "Secure AI Project": ["https://secureaiproject.org/"],
-    "Lucid Computing": ["https://lucidcomputing.ai/"],
-    "Contramont Research": ["https://contramont.org/"],
-    "Cosmos Institute": ["https://cosmosinstitute.org/"],
-    "CaML": ["https://caml.ai/"],
-    "Equilibria Network": ["https://equilibrianetwork.org/"],
-    "EconTAI": ["https://econtai.org/"],
-    "Aether": ["https://aether.ai/"],
-    "CivAI": ["https://civai.org/"],
-    "Equistamp": ["https://equistamp.ai/"],
-    
-    # 2 staff
-    "dmodel": ["https://dmodel.ai/"],
-    "CORAL": ["https://coral.ai/"],
-    "Seldon Labs": ["https://seldonlabs.ai/"],
-    "Principia Labs": ["https://principialabs.ai/"],
-    "DeepResponse": ["https://deepresponse.ai/"],
-    "Decode Research": ["https://decoderesearch.org/"],
-    "Coordinal": ["https://coordinal.ai/"],
-    "Mosaic Labs": ["https://mosaiclabs.ai/"],
-    "Andon Labs": ["https://andonlabs.ai/"],
-    "Workshop Labs": ["https://workshoplabs.ai/"],
-    "Aelus": ["https://aelus.ai/"],
-    "Simplex": ["https://simplex.ai/"],
-    "Aethra Labs": ["https://aethralabs.ai/"],
-    "Freestyle Research": ["https://freestyleresearch.org/"],
-    "Theorem Labs": ["https://theoremlabs.ai/"],
-    "Ulyssean": ["https://ulyssean.org/"],
-    "Trajectory Labs": ["https://trajectorylabs.ai/"],
-    "TamperSec": ["https://tampersec.ai/"],
-    "AI Standards Lab": ["https://aistandardslab.org/"],
-    "LASST": ["https://lasst.ai/"],
-    
-    # 1 staff
-    "Groundless": ["https://groundless.ai/"],
-    "Poseidon Research": ["https://poseidonresearch.org/"],
-    "Formation Research": ["https://formationresearch.org/"],
-    "Theomachia Labs": ["https://theomachialabs.ai/"],
-    "Ashgro": ["https://ashgro.ai/"],
-    "Deducto": ["https://deducto.ai/"],
-    "Luthien": ["https://luthien.ai/"],
+import source_registry
+import tracing
+from extraction import extract_all, print_stats, RESEARCH_SCHEMA
+from fetcher import fetch_page
+from url_probe import probe_first
+
+PROJECTS_AND_PEOPLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "projects": RESEARCH_SCHEMA["properties"]["projects"],
+        "key_people": RESEARCH_SCHEMA["properties"]["key_people"],
+    },
+    "required": ["projects"],
 }
+# Same for every page so it can be served from the prompt cache
+EXTRACTION_INSTRUCTIONS = """Extract research projects and key people from the AI safety organization's webpage in the user message.
 
+Only include what you can clearly identify."""
 
-def fetch_page(url):
-    """Try to fetch a page."""
-    try:
-        response = requests.get(
-            url, 
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=10,
-            allow_redirects=True
-        )
-        if response.status_code == 200:
-            return response.text
-    except:
-        pass
-    
-    # Try with Playwright
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, timeout=15000)
-            time.sleep(1)
-            content = page.content()
-            browser.close()
-            if len(content) > 500:
-                return content
-    except:
-        pass
-    
-    return None
+# Research URLs for remaining orgs (see sources.json)
+REMAINING_ORGS = {source["org"]: source["urls"] for source in source_registry.sources("final")}
 
 
 def search_for_org(org_name):
@@ -167,47 +44,30 @@ def search_for_org(org_name):
         f"https://www.{name_slug}.org/",
     ]
     
-    for url in potential_urls:
-        content = fetch_page(url)
-        if content and len(content) > 1000:
-            return url, content
+    # Probe every guess at once; only the first live one gets fetched
+    url = probe_first(potential_urls)
+    if url is None:
+        return None, None, None
+    
+    content, cleaned = fetch_page(url)
+    if content and len(content) > 1000:
+        return url, content, cleaned
     
-    return None, None
+    return None, None, None
 
 
-def extract_with_llm(org_name, content):
-    """Extract research data using Claude."""
+def extraction_job(org_name, content):
+    """Build the extract() arguments for an org's homepage."""
     if len(content) > 40000:
         content = content[:40000]
     
-    prompt = f"""Extract research projects and key people from this AI safety organization's webpage.
-
-Organization: {org_name}
-
-Return JSON:
-{{
-    "projects": [{{"name": "...", "description": "...", "status": "Active"}}],
-    "key_people": [{{"name": "...", "role": "..."}}]
-}}
-
-Only include what you can clearly identify. Return ONLY JSON.
-
-Content:
-{content}"""
-
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        result = response.content[0].text.strip()
-        if result.startswith("```"):
-            result = re.sub(r'^```json?\n?', '', result)
-            result = re.sub(r'\n?```$', '', result)
-        return json.loads(result)
-    except:
-        return {"projects": [], "key_people": []}
+    return {
+        "instructions": EXTRACTION_INSTRUCTIONS,
+        "content": f"Organization: {org_name}\n\nContent:\n{content}",
+        "schema": PROJECTS_AND_PEOPLE_SCHEMA,
+        "max_tokens": 2000,
+        "label": org_name,
+    }
 
 
 def main():
@@ -224,73 +84,74 @@ def main():
     total_projects = 0
     total_people = 0
     failed = []
+    pending = []
     
     for org_name, urls in REMAINING_ORGS.items():
         if org_name not in org_lookup:
             continue
         
-        print(f"\n{org_name}...")
-        
         org = org_lookup[org_name]
         found_url = None
         content = None
+        cleaned = None
         
-        # Try provided URLs
-        for url in urls:
-            content = fetch_page(url)
-            if content and len(content) > 500:
-                found_url = url
-                print(f"  ✓ Found: {url}")
-                break
-        
-        # Try searching if no URL worked
-        if not found_url:
-            found_url, content = search_for_org(org_name)
-            if found_url:
-                print(f"  ✓ Found via search: {found_url}")
-        
-        if not found_url or not content:
-            print(f"  ✗ No URL found")
-            failed.append(org_name)
-            continue
+        with tracing.span("fetch", org=org_name) as span:
+            # Try provided URLs
+            for url in urls:
+                content, cleaned = fetch_page(url)
+                if content and len(content) > 500:
+                    found_url = url
+                    span.set(url=url, found="listed")
+                    break
+            
+            # Try searching if no URL worked
+            if not found_url:
+                found_url, content, cleaned = search_for_org(org_name)
+                if found_url:
+                    span.set(url=found_url, found="search")
+            
+            if not found_url or not content:
+                span.fail("no URL found")
+                failed.append(org_name)
+                continue
+            
+            # Already parsed in the cleaning process pool by fetch_page()
+            text = cleaned["text"]
+            span.set(text_chars=len(text))
         
         # Update org URL
         org["url"] = found_url
         total_urls += 1
         
-        # Extract content
-        soup = BeautifulSoup(content, "html.parser")
-        for el in soup(["script", "style", "nav", "footer"]):
-            el.decompose()
-        text = soup.get_text(separator="\n", strip=True)
-        
         if len(text) > 200:
-            extracted = extract_with_llm(org_name, text)
-            
+            pending.append((org_name, org, extraction_job(org_name, text)))
+    
+    # Extract all pages concurrently, then merge in the original order
+    print(f"\nExtracting {len(pending)} pages with LLM...")
+    results = extract_all([job for _, _, job in pending])
+    
+    for (org_name, org, _), extracted in zip(pending, results):
+        if not extracted:
+            continue
+        
+        with tracing.span("merge", org=org_name) as span:
             # Add projects
+            existing = {p["name"].lower() for p in org.get("projects", [])}
             for proj in extracted.get("projects", []):
-                if "projects" not in org:
-                    org["projects"] = []
-                existing = {p["name"].lower() for p in org["projects"]}
                 if proj["name"].lower() not in existing:
-                    org["projects"].append(proj)
+                    org.setdefault("projects", []).append(proj)
+                    existing.add(proj["name"].lower())
                     total_projects += 1
             
             # Add people
+            existing = {p["name"].lower() for p in org.get("key_people", [])}
             for person in extracted.get("key_people", []):
-                if "key_people" not in org:
-                    org["key_people"] = []
-                existing = {p["name"].lower() for p in org["key_people"]}
                 if person["name"].lower() not in existing:
-                    org["key_people"].append(person)
+                    org.setdefault("key_people", []).append(person)
+                    existing.add(person["name"].lower())
                     total_people += 1
             
-            if extracted.get("projects"):
-                print(f"    +{len(extracted['projects'])} projects")
-            if extracted.get("key_people"):
-                print(f"    +{len(extracted['key_people'])} people")
-        
-        time.sleep(0.5)
+            span.set(projects=len(extracted.get("projects", [])), people=len(extracted.get("key_people", [])))
     
     # Save
     with open("ai_safety_orgs.json", "w") as f:
@@ -305,6 +166,8 @@ def main():
     print(f"Failed: {len(failed)}")
     if failed:
         print("Failed orgs:", ", ".join(failed[:20]))
+    print_stats()
+    tracing.print_summary()
 
 
 if __name__ == "__main__":
@@ -7,6 +7,8 @@ Using Playwright to click "Load more" buttons
 import json
 import asyncio
 from playwright.async_api import async_playwright
+from site_extractors import fli_people
+from name_index import NameIndex
 
 FLI_URL = "https://futureoflife.org/about-us/our-people/ai-existential-safety-community/"
 
@@ -37,92 +39,8 @@ async def scrape_all_researchers():
             await page.wait_for_timeout(1000)
         
         print("All researchers loaded. Extracting data...")
-        
-        # Extract researcher cards
-        # The structure is typically: h4 (name), then p or span for role, then p for institution
-        researchers = []
-        
-        # Get all profile sections
         content = await page.content()
-        
-        # Parse with BeautifulSoup
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Find all profile cards - looking at the structure more carefully
-        # Each researcher seems to be in a card/div with h4 for name
-        
-        # Skip these non-name h4s
-        skip_texts = [
-            "Load more", "Posts from the community", "Join the community",
-            "Vitalik Buterin Fellowships", "AI Professors", "AI Researchers",
-            "Were you looking for something else?", "Our Position on AI",
-            "Report a broken link", "Past Volunteers", "Recent projects",
-            "Focus areas", "Our work", "Our content", "About us",
-            "The Impact of AI in Education", "Can AI agents learn to be good?"
-        ]
-        
-        # Find all h4 elements that could be names
-        h4_elements = soup.find_all('h4')
-        
-        for h4 in h4_elements:
-            name = h4.get_text(strip=True)
-            
-            # Skip non-names
-            if any(skip in name for skip in skip_texts):
-                continue
-            if len(name) > 50 or len(name) < 3:
-                continue
-            
-            # Get the parent/sibling content for role and institution
-            parent = h4.find_parent()
-            if not parent:
-                continue
-            
-            # Get all text within this card
-            all_text = parent.get_text(separator="\n", strip=True).split("\n")
-            
-            role = None
-            institution = None
-            
-            # Find where the name is and get the following items
-            for i, line in enumerate(all_text):
-                if line.strip() == name:
-                    remaining = all_text[i+1:]
-                    
-                    for j, next_line in enumerate(remaining):
-                        next_line = next_line.strip()
-                        if next_line in ["View profile", "Load more", ""]:
-                            continue
-                        
-                        # First non-skip line after name
-                        role_keywords = ["Professor", "PhD", "Researcher", "Student", 
-                                       "Associate", "Fellow", "Director", "Lead", 
-                                       "Engineer", "Scientist"]
-                        
-                        if any(k in next_line for k in role_keywords):
-                            role = next_line
-                        else:
-                            # Likely institution
-                            if not institution:
-                                institution = next_line
-                            break
-                        
-                        # Check next line for institution
-                        if j + 1 < len(remaining):
-                            inst_candidate = remaining[j + 1].strip()
-                            if inst_candidate not in ["View profile", "Load more", ""]:
-                                if not any(k in inst_candidate for k in role_keywords):
-                                    institution = inst_candidate
-                                    break
-                    break
-            
-            if name and (role or institution):
-                researchers.append({
-                    "name": name,
-                    "role": role or "Researcher",
-                    "institution": institution
-                })
+        researchers = fli_people(content, FLI_URL)["key_people"]
         
         await browser.close()
         return researchers
@@ -139,7 +57,7 @@ def add_researchers_to_orgs(researchers, orgs):
     """Add researchers to their respective organizations."""
     
     # Create org map
-    org_map = {}
+    org_map = NameIndex()
     for i, org in enumerate(orgs):
         org_map[org["name"].lower()] = i
     
@@ -157,6 +75,7 @@ def add_researchers_to_orgs(researchers, orgs):
     
     added = 0
     new_orgs = 0
+    people_names = {}  # org index -> lowercased key_people names
     
     for r in researchers:
         inst = r.get("institution")
@@ -167,19 +86,13 @@ def add_researchers_to_orgs(researchers, orgs):
         org_idx = None
         
         # Direct match
-        for org_name, idx in org_map.items():
-            if inst_lower == org_name or inst_lower in org_name or org_name in inst_lower:
-                org_idx = idx
-                break
+        org_idx = org_map.match(inst_lower)
         
         # Alias match
         if org_idx is None:
             for alias, variants in aliases.items():
                 if any(v in inst_lower or inst_lower in v for v in variants + [alias]):
-                    for org_name, idx in org_map.items():
-                        if any(v in org_name for v in variants + [alias]):
-                            org_idx = idx
-                            break
+                    org_idx = org_map.match_containing(*variants, alias)
                     break
         
         if org_idx is not None:
@@ -187,12 +100,15 @@ def add_researchers_to_orgs(researchers, orgs):
             if "key_people" not in org:
                 org["key_people"] = []
             
-            existing = [p.get("name", "").lower() for p in org["key_people"]]
+            if org_idx not in people_names:
+                people_names[org_idx] = {p.get("name", "").lower() for p in org["key_people"]}
+            existing = people_names[org_idx]
             if r["name"].lower() not in existing:
                 org["key_people"].append({
                     "name": r["name"],
                     "role": r.get("role", "AI Safety Researcher")
                 })
+                existing.add(r["name"].lower())
                 added += 1
                 print(f"  Added {r['name']} to {org['name']}")
         else:
@@ -219,12 +135,15 @@ def add_researchers_to_orgs(researchers, orgs):
                     org = orgs[idx]
                     if "key_people" not in org:
                         org["key_people"] = []
-                    existing = [p.get("name", "").lower() for p in org["key_people"]]
+                    if idx not in people_names:
+                        people_names[idx] = {p.get("name", "").lower() for p in org["key_people"]}
+                    existing = people_names[idx]
                     if r["name"].lower() not in existing:
                         org["key_people"].append({
                             "name": r["name"],
                             "role": r.get("role", "AI Safety Researcher")
                         })
+                        existing.add(r["name"].lower())
                         added += 1
     
     return added, new_orgs
@@ -5,21 +5,19 @@ https://futureoflife.org/about-us/our-people/ai-existential-safety-community/
 """
 
 import json
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import time
 
+from name_index import NameIndex
+
 FLI_URL = "https://futureoflife.org/about-us/our-people/ai-existential-safety-community/"
 
 def scrape_fli_researchers():
     """Scrape faculty and researchers from FLI community page."""
     print("Fetching FLI AI Existential Safety Community page...")
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-    }
-    
-    response = requests.get(FLI_URL, headers=headers)
+    response = http_client.get(FLI_URL)
     if response.status_code != 200:
         print(f"Failed to fetch page: {response.status_code}")
         return []
@@ -99,7 +97,7 @@ def add_researchers_to_orgs(researchers, orgs):
     """Add researchers to their respective organizations."""
     
     # Create a mapping of institution names to org indices
-    org_map = {}
+    org_map = NameIndex()
     for i, org in enumerate(orgs):
         org_map[org["name"].lower()] = i
         # Add common abbreviations/variations
@@ -128,6 +126,7 @@ def add_researchers_to_orgs(researchers, orgs):
     
     added_count = 0
     new_orgs_added = 0
+    people_names = {}  # org index -> lowercased key_people names
     
     for researcher in researchers:
         institution = researcher.get("institution")
@@ -150,12 +149,9 @@ def add_researchers_to_orgs(researchers, orgs):
                         org_idx = org_map[canonical.lower()]
                         break
             
-            # Fuzzy match - check if any org name is contained in institution
+            # Fuzzy match - first org name (6+ chars) in the institution or containing it
             if org_idx is None:
-                for org_name, idx in org_map.items():
-                    if len(org_name) > 5 and (org_name in inst_lower or inst_lower in org_name):
-                        org_idx = idx
-                        break
+                org_idx = org_map.match(inst_lower, min_len=6)
         
         if org_idx is not None:
             # Add to existing org
@@ -164,13 +160,16 @@ def add_researchers_to_orgs(researchers, orgs):
                 org["key_people"] = []
             
             # Check if already exists
-            existing_names = [p.get("name", "").lower() for p in org["key_people"]]
+            if org_idx not in people_names:
+                people_names[org_idx] = {p.get("name", "").lower() for p in org["key_people"]}
+            existing_names = people_names[org_idx]
             if researcher["name"].lower() not in existing_names:
                 person_entry = {
                     "name": researcher["name"],
                     "role": researcher.get("role", "AI Safety Researcher")
                 }
                 org["key_people"].append(person_entry)
+                existing_names.add(researcher["name"].lower())
                 added_count += 1
                 print(f"  Added {researcher['name']} to {org['name']}")
         else:
@@ -198,7 +197,9 @@ def add_researchers_to_orgs(researchers, orgs):
                     # Add to the new org we just created
                     org_idx = org_map[inst_lower]
                     org = orgs[org_idx]
-                    existing_names = [p.get("name", "").lower() for p in org.get("key_people", [])]
+                    if org_idx not in people_names:
+                        people_names[org_idx] = {p.get("name", "").lower() for p in org.get("key_people", [])}
+                    existing_names = people_names[org_idx]
                     if researcher["name"].lower() not in existing_names:
                         if "key_people" not in org:
                             org["key_people"] = []
@@ -206,6 +207,7 @@ def add_researchers_to_orgs(researchers, orgs):
                             "name": researcher["name"],
                             "role": researcher.get("role", "AI Safety Researcher")
                         })
+                        existing_names.add(researcher["name"].lower())
                         added_count += 1
     
     return added_count, new_orgs_added
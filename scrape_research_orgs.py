@@ -1,164 +1,41 @@
 """
 Scrape 13 research-focused organizations and their publications.
-"""
 
-import json
-import requests
-from bs4 import BeautifulSoup
-import time
-import os
-from dotenv import load_dotenv
-from anthropic import Anthropic
+Paginated publication listings are followed until they reach publications
+already in the dataset. With --refresh, each org's feeds and sitemaps are
+checked instead and only the items published since the last run are fetched
+and extracted. The first refresh only records what they list, and items the
+org already has are skipped. Items that couldn't be fetched or extracted are
+tried again on the next refresh.
+
+Each org's fetched pages and each page's extraction are journaled as they
+finish, so an interrupted run resumes without refetching or re-extracting.
+--partial merges just what the journal already holds, --fresh discards it.
 
-load_dotenv()
+Fetches, cleans, extractions and merges are tracing spans, summarized at the
+end of the run.
+"""
 
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+import json
+import sys
+from urllib.parse import urlparse
+import http_client
+import source_registry
+import tracing
+from discovery import discover, load_state, save_state, settle, site_key
+from extraction import extract_all, print_stats, PUBLICATIONS_SCHEMA
+from html_clean import clean
+from listing_crawler import crawl
+from run_journal import open_journal
 
-# Organizations to scrape with their research pages
+# Organizations to scrape with their research pages (see sources.json)
 RESEARCH_ORGS = [
-    {
-        "name": "Center for Human-Compatible AI",
-        "url": "https://humancompatible.ai/",
-        "research_url": "https://humancompatible.ai/publications",
-        "type": "Academic",
-        "country": "USA",
-        "focus_areas": ["Alignment", "Control", "Cooperative AI"]
-    },
-    {
-        "name": "FAR.AI",
-        "url": "https://far.ai/",
-        "research_url": "https://far.ai/research/",
-        "type": "Nonprofit",
-        "country": "USA",
-        "focus_areas": ["Evals", "Red-teaming", "Alignment"]
-    },
-    {
-        "name": "MIT Algorithmic Alignment Group",
-        "url": "https://algorithmicalignment.csail.mit.edu/",
-        "research_url": "https://algorithmicalignment.csail.mit.edu/",
-        "type": "Academic",
-        "country": "USA",
-        "focus_areas": ["Alignment", "Control", "Governance"]
-    },
-    {
-        "name": "NYU Alignment Research Group",
-        "url": "https://wp.nyu.edu/arg/",
-        "research_url": "https://wp.nyu.edu/arg/publications/",
-        "type": "Academic",
-        "country": "USA",
-        "focus_areas": ["Alignment", "Evals", "Interpretability"]
-    },
-    {
-        "name": "Rethink Priorities",
-        "url": "https://rethinkpriorities.org/",
-        "research_url": "https://rethinkpriorities.org/publications",
-        "type": "Nonprofit",
-        "country": "USA",
-        "focus_areas": ["Governance", "Policy", "Evals"]
-    },
-    {
-        "name": "Centre for the Study of Existential Risk",
-        "url": "https://www.cser.ac.uk/",
-        "research_url": "https://www.cser.ac.uk/research/publications/",
-        "type": "Academic",
-        "country": "UK",
-        "focus_areas": ["Governance", "Policy", "Alignment"]
-    },
-    {
-        "name": "Quantified Uncertainty Research Institute",
-        "url": "https://quantifieduncertainty.org/",
-        "research_url": "https://quantifieduncertainty.org/research",
-        "type": "Nonprofit",
-        "country": "USA",
-        "focus_areas": ["Forecasting", "Evals"]
-    },
-    {
-        "name": "Forecasting Research Institute",
-        "url": "https://forecastingresearch.org/",
-        "research_url": "https://forecastingresearch.org/research",
-        "type": "Nonprofit",
-        "country": "USA",
-        "focus_areas": ["Forecasting", "Evals"]
-    },
-    {
-        "name": "Institute for AI Policy and Strategy",
-        "url": "https://www.iaps.ai/",
-        "research_url": "https://www.iaps.ai/research",
-        "type": "Nonprofit",
-        "country": "USA",
-        "focus_areas": ["Policy", "Governance"]
-    },
-    {
-        "name": "Simon Institute for Longterm Governance",
-        "url": "https://www.simoninstitute.ch/",
-        "research_url": "https://www.simoninstitute.ch/research/",
-        "type": "Nonprofit",
-        "country": "Switzerland",
-        "focus_areas": ["Governance", "Policy"]
-    },
-    {
-        "name": "Apart Research",
-        "url": "https://www.apartresearch.com/",
-        "research_url": "https://www.apartresearch.com/research",
-        "type": "Nonprofit",
-        "country": "International",
-        "focus_areas": ["Alignment", "Interpretability", "Evals"]
-    },
-    {
-        "name": "Safe Superintelligence Inc.",
-        "url": "https://ssi.inc/",
-        "research_url": "https://ssi.inc/",
-        "type": "Lab Safety Team",
-        "country": "USA",
-        "focus_areas": ["Alignment", "Control"]
-    },
-    {
-        "name": "TruthfulAI",
-        "url": "https://www.truthful.ai/",
-        "research_url": "https://www.truthful.ai/",
-        "type": "Nonprofit",
-        "country": "UK",
-        "focus_areas": ["Alignment", "Evals"]
-    },
+    {**source_registry.org(source["org"]), "research_url": source["urls"][0], "source": source["id"]}
+    for source in source_registry.sources("research")
 ]
 
-
-def fetch_page(url):
-    """Fetch page content"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        return response.text
-    except Exception as e:
-        print(f"  Error fetching {url}: {e}")
-        return None
-
-
-def extract_publications_with_llm(html_content, org_name):
-    """Use Claude to extract publications from HTML"""
-    if not html_content:
-        return []
-    
-    # Limit content size
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Remove scripts and styles
-    for tag in soup(['script', 'style', 'nav', 'footer', 'header']):
-        tag.decompose()
-    
-    text = soup.get_text(separator='\n', strip=True)[:15000]
-    
-    prompt = f"""Extract ONLY PUBLISHED research papers/publications from this page for {org_name}.
-
-Return a JSON array of publications. Each publication should have:
-- "name": paper title
-- "description": brief description or abstract (1-2 sentences max)
-- "url": link to paper if available
-- "status": "published"
-- "authors": list of author names if visible
+# Same for every page so it can be served from the prompt cache
+PUBLICATIONS_INSTRUCTIONS = """Extract ONLY PUBLISHED research papers/publications from the page in the user message for the organization it names.
 
 Only include actual published papers/reports. Skip:
 - Blog posts or news articles
@@ -166,38 +43,40 @@ Only include actual published papers/reports. Skip:
 - Event announcements
 - Job postings
 
-If no publications found, return empty array: []
+If no publications are found, record an empty list."""
 
-Page content:
-{text}
 
-Return ONLY valid JSON array, no other text."""
+def fetch_page(url, org=None):
+    """Fetch page content as a "fetch" span"""
+    with tracing.span("fetch", org=org, url=url, host=urlparse(url).hostname or "") as span:
+        try:
+            response = http_client.get(url, timeout=15)
+            response.raise_for_status()
+            return response.text
+        except Exception as e:
+            print(f"  Error fetching {url}: {e}")
+            span.fail(str(e))
+            return None
 
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        result = response.content[0].text.strip()
-        
-        # Clean up JSON
-        if result.startswith("```"):
-            result = result.split("```")[1]
-            if result.startswith("json"):
-                result = result[4:]
-        result = result.strip()
-        
-        publications = json.loads(result)
-        return publications if isinstance(publications, list) else []
-        
-    except Exception as e:
-        print(f"  LLM error: {e}")
-        return []
+
+def publications_job(cleaned, org_name, url=None):
+    """Build the extract() arguments for a publications page (cleaned: its html_clean result)."""
+    
+    # Limit content size
+    text = cleaned["text"][:15000]
+    
+    return {
+        "instructions": PUBLICATIONS_INSTRUCTIONS,
+        "content": f"Organization: {org_name}\n\nPage content:\n{text}",
+        "schema": PUBLICATIONS_SCHEMA,
+        "max_tokens": 4000,
+        "label": org_name,
+        "url": url,
+        "cleaned": cleaned,
+    }
 
 
-def scrape_research_orgs():
+def scrape_research_orgs(refresh=False, fresh=False, partial=False):
     """Main scraping function"""
     print("=" * 60)
     print("SCRAPING RESEARCH-FOCUSED ORGANIZATIONS")
@@ -211,93 +90,167 @@ def scrape_research_orgs():
         orgs_data = []
     
     existing_names = {org.get("name", "").lower() for org in orgs_data}
+    discovery_state = load_state() if refresh else None
+    # org name -> URLs discover() handed out this run
+    discovered = {}
+    journal = open_journal("scrape_research_orgs", fresh=fresh)
     
     new_orgs = 0
     new_publications = 0
+    fetched = []
     
-    for org_info in RESEARCH_ORGS:
-        name = org_info["name"]
-        print(f"\n📚 {name}")
-        
-        # Check if org exists
-        org_exists = name.lower() in existing_names
+    def org_pages(org_info, existing_org):
+        """(url, html) for the org's listing pages, or its new items when refreshing."""
+        known = {p.get("url") or p.get("paper_url") for p in existing_org.get("projects", [])}
+        known -= {"", None}
+        if refresh:
+            with tracing.span("discover", org=org_info["name"]) as span:
+                page_urls = discover(org_info["url"], discovery_state,
+                                     source=org_info["source"], known=known)
+                span.set(items=len(page_urls))
+            discovered[org_info["name"]] = page_urls
+            for page_url in page_urls:
+                yield page_url, fetch_page(page_url, org_info["name"])
+            return
         
-        if org_exists:
-            print(f"  ✓ Org exists, checking for new publications...")
-            # Find the existing org
-            for org in orgs_data:
-                if org.get("name", "").lower() == name.lower():
-                    existing_org = org
-                    break
-        else:
-            print(f"  + Adding new organization...")
-            existing_org = {
-                "name": name,
-                "url": org_info["url"],
-                "type": org_info["type"],
-                "country": org_info["country"],
-                "mission": "",
-                "focus_areas": org_info["focus_areas"],
-                "projects": [],
-                "benchmarks": [],
-                "key_people": []
-            }
-            orgs_data.append(existing_org)
-            new_orgs += 1
-        
-        # Fetch research page
         research_url = org_info.get("research_url", org_info["url"])
-        print(f"  Fetching: {research_url}")
-        
-        html = fetch_page(research_url)
+        html = fetch_page(research_url, org_info["name"])
         if not html:
-            print(f"  ✗ Could not fetch page")
-            continue
-        
-        # Extract publications
-        print(f"  Extracting publications...")
-        publications = extract_publications_with_llm(html, name)
+            yield research_url, None
+            return
         
-        if not publications:
-            print(f"  → No publications found")
-            continue
-        
-        # Add new publications
-        existing_urls = {p.get("url", "") for p in existing_org.get("projects", [])}
-        existing_titles = {p.get("name", "").lower() for p in existing_org.get("projects", [])}
+        # Follow pagination until we reach publications we already have
+        yield from crawl(research_url, html=html, known=known)
+    
+    def pending_jobs():
+        """Yield an extraction job per page as soon as it has been fetched."""
+        nonlocal new_orgs
         
-        added = 0
-        for pub in publications:
-            # Skip if already exists
-            if pub.get("url") in existing_urls:
+        for org_info in RESEARCH_ORGS:
+            name = org_info["name"]
+            
+            # Check if org exists
+            org_exists = name.lower() in existing_names
+            
+            if org_exists:
+                # Find the existing org
+                for org in orgs_data:
+                    if org.get("name", "").lower() == name.lower():
+                        existing_org = org
+                        break
+            else:
+                print(f"  + Adding new organization {name}")
+                existing_org = {
+                    "name": name,
+                    "url": org_info["url"],
+                    "type": org_info["type"],
+                    "country": org_info["country"],
+                    "mission": "",
+                    "focus_areas": org_info["focus_areas"],
+                    "projects": [],
+                    "benchmarks": [],
+                    "key_people": []
+                }
+                orgs_data.append(existing_org)
+                new_orgs += 1
+            
+            done = journal.get(f"pages:{name}")
+            if done is not None:
+                if refresh and done["discovery"] is not None:
+                    discovery_state[site_key(org_info["url"], org_info["source"])] = done["discovery"]
+                    discovered[name] = done["discovered"]
+                pages = done["pages"]
+            elif partial:
+                pages = []
+            else:
+                pages = journaled_pages(org_info, existing_org)
+            
+            for page_url, html in pages:
+                key = f"extract:{name}:{page_url}"
+                if partial and key not in journal:
+                    continue
+                fetched.append((org_info, existing_org, page_url))
+                yield {**publications_job(clean(html, page_url), name, page_url), "key": key}
+    
+    def journaled_pages(org_info, existing_org):
+        """org_pages(), recording the org's pages once they are all fetched."""
+        pages = []
+        for page_url, html in org_pages(org_info, existing_org):
+            if not html:
                 continue
-            if pub.get("name", "").lower() in existing_titles:
+            pages.append((page_url, html))
+            yield page_url, html
+        # Nothing fetched is retried next run rather than remembered
+        if pages:
+            site = site_key(org_info["url"], org_info["source"])
+            journal.record(f"pages:{org_info['name']}", {
+                "pages": pages,
+                "discovery": discovery_state.get(site) if refresh else None,
+                "discovered": discovered.get(org_info["name"]),
+            })
+    
+    # Pages go to the extraction pool as they arrive
+    results = extract_all(pending_jobs(), journal=journal)
+    print(f"\nExtracted publications from {len(fetched)} pages")
+    
+    extracted_urls = set()
+    for (org_info, existing_org, page_url), extracted in zip(fetched, results):
+        name = org_info["name"]
+        if extracted is not None:
+            extracted_urls.add((name, page_url))
+        publications = (extracted or {}).get("publications", [])
+        with tracing.span("merge", org=name, url=page_url) as span:
+            if not publications:
+                span.set(added=0)
                 continue
             
-            project = {
-                "name": pub.get("name", "Untitled"),
-                "description": pub.get("description", ""),
-                "status": "published",
-                "url": pub.get("url", ""),
-                "paper_url": pub.get("url", ""),
-                "focus_areas": org_info["focus_areas"]
-            }
+            # Add new publications
+            existing_urls = {p.get("url", "") for p in existing_org.get("projects", [])}
+            existing_titles = {p.get("name", "").lower() for p in existing_org.get("projects", [])}
             
-            if "projects" not in existing_org:
-                existing_org["projects"] = []
+            added = 0
+            for pub in publications:
+                # Skip if already exists
+                if pub.get("url") in existing_urls:
+                    continue
+                if pub.get("name", "").lower() in existing_titles:
+                    continue
+                
+                project = {
+                    "name": pub.get("name", "Untitled"),
+                    "description": pub.get("description", ""),
+                    "status": "published",
+                    "url": pub.get("url", ""),
+                    "paper_url": pub.get("url", ""),
+                    "focus_areas": org_info["focus_areas"]
+                }
+                
+                if "projects" not in existing_org:
+                    existing_org["projects"] = []
+                
+                existing_org["projects"].append(project)
+                existing_urls.add(project["url"])
+                existing_titles.add(project["name"].lower())
+                added += 1
+                new_publications += 1
             
-            existing_org["projects"].append(project)
-            added += 1
-            new_publications += 1
-        
-        print(f"  ✓ Added {added} publications")
-        
-        # Be nice to servers
-        time.sleep(2)
+            span.set(added=added)
     
     # Save updated data
     with open("ai_safety_orgs.json", "w") as f:
         json.dump(orgs_data, f, indent=2)
+    if partial:
+        print(f"\nPartial merge; {journal.path} kept for the next run")
+    else:
+        if refresh:
+            # Items whose fetch or extraction failed are handed out again next time
+            org_infos = {org_info["name"]: org_info for org_info in RESEARCH_ORGS}
+            for name, urls in discovered.items():
+                failed = [url for url in urls if (name, url) not in extracted_urls]
+                org_info = org_infos[name]
+                settle(discovery_state, org_info["url"], urls, failed, source=org_info["source"])
+            save_state(discovery_state)
+        journal.clear()
     
     print("\n" + "=" * 60)
     print("COMPLETE")
@@ -314,8 +267,14 @@ def scrape_research_orgs():
     )
     print(f"Total projects: {total_projects}")
     print(f"Total publications: {total_pubs}")
+    print_stats()
+    tracing.print_summary()
 
 
 if __name__ == "__main__":
-    scrape_research_orgs()
+    scrape_research_orgs(
+        refresh="--refresh" in sys.argv,
+        fresh="--fresh" in sys.argv,
+        partial="--partial" in sys.argv,
+    )
 
@@ -3,74 +3,28 @@ Fix and retry failed organization scrapes.
 """
 
 import json
-import requests
+import http_client
+import source_registry
 from bs4 import BeautifulSoup
-import time
-import os
-from dotenv import load_dotenv
-from anthropic import Anthropic
+from extraction import extract, print_stats, PUBLICATIONS_SCHEMA
 
-load_dotenv()
-
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
-# Fixed URLs for failed orgs
+# Fixed URLs for failed orgs (see sources.json)
 ORGS_TO_FIX = [
-    {
-        "name": "Center for Human-Compatible AI",
-        "url": "https://humancompatible.ai/",
-        "research_url": "https://humancompatible.ai/research",  # Try /research instead
-        "type": "Academic",
-        "country": "USA",
-        "focus_areas": ["Alignment", "Control", "Cooperative AI"],
-        "mission": "Stuart Russell's research center at UC Berkeley focused on building AI systems that are provably beneficial to humans."
-    },
-    {
-        "name": "NYU Alignment Research Group",
-        "url": "https://wp.nyu.edu/arg/",
-        "research_url": "https://wp.nyu.edu/arg/",  # Try main page
-        "type": "Academic", 
-        "country": "USA",
-        "focus_areas": ["Alignment", "Evals", "Interpretability"],
-        "mission": "Sam Bowman's research group at NYU focusing on language model alignment and evaluation."
-    },
-    {
-        "name": "Centre for the Study of Existential Risk",
-        "url": "https://www.cser.ac.uk/",
-        "research_url": "https://www.cser.ac.uk/research/",  # Different path
-        "type": "Academic",
-        "country": "UK", 
-        "focus_areas": ["Governance", "Policy", "Alignment"],
-        "mission": "Cambridge University research centre studying existential risks including from advanced AI."
-    },
-    {
-        "name": "Quantified Uncertainty Research Institute",
-        "url": "https://quantifieduncertainty.org/",
-        "research_url": "https://quantifieduncertainty.org/",  # Main page
-        "type": "Nonprofit",
-        "country": "USA",
-        "focus_areas": ["Forecasting", "Evals"],
-        "mission": "Research institute developing tools and methods for quantifying uncertainty and improving forecasting."
-    },
-    {
-        "name": "Simon Institute for Longterm Governance",
-        "url": "https://www.simoninstitute.ch/",
-        "research_url": "https://www.simoninstitute.ch/",  # Main page
-        "type": "Nonprofit",
-        "country": "Switzerland",
-        "focus_areas": ["Governance", "Policy"],
-        "mission": "Geneva-based institute supporting multilateral governance of frontier technologies."
-    },
+    {**source_registry.org(source["org"]), "research_url": source["urls"][0]}
+    for source in source_registry.sources("research_fix")
 ]
 
+# Same for every page so it can be served from the prompt cache
+PUBLICATIONS_INSTRUCTIONS = """Extract ONLY PUBLISHED research papers/publications from the page in the user message for the organization it names.
+
+Only include actual published papers/reports. Skip blog posts, news, events, jobs.
+If no publications are found, record an empty list."""
+
 
 def fetch_page(url):
     """Fetch page content"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-    }
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_client.get(url, timeout=15)
         response.raise_for_status()
         return response.text
     except Exception as e:
@@ -88,40 +42,10 @@ def extract_publications_with_llm(html_content, org_name):
         tag.decompose()
     
     text = soup.get_text(separator='\n', strip=True)[:15000]
+    content = f"Organization: {org_name}\n\nPage content:\n{text}"
     
-    prompt = f"""Extract ONLY PUBLISHED research papers/publications from this page for {org_name}.
-
-Return a JSON array of publications. Each publication should have:
-- "name": paper title
-- "description": brief description (1-2 sentences max)
-- "url": link to paper if available
-- "status": "published"
-
-Only include actual published papers/reports. Skip blog posts, news, events, jobs.
-If no publications found, return empty array: []
-
-Page content:
-{text}
-
-Return ONLY valid JSON array, no other text."""
-
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        result = response.content[0].text.strip()
-        if result.startswith("```"):
-            result = result.split("```")[1]
-            if result.startswith("json"):
-                result = result[4:]
-        result = result.strip()
-        
-        publications = json.loads(result)
-        return publications if isinstance(publications, list) else []
-        
+        return extract(PUBLICATIONS_INSTRUCTIONS, content, PUBLICATIONS_SCHEMA, max_tokens=4000).get("publications", [])
     except Exception as e:
         print(f"  LLM error: {e}")
         return []
@@ -198,11 +122,12 @@ def fix_orgs():
                 existing_org["projects"] = []
             
             existing_org["projects"].append(project)
+            existing_urls.add(project["url"])
+            existing_titles.add(project["name"].lower())
             added += 1
             new_publications += 1
         
         print(f"  ✓ Added {added} publications")
-        time.sleep(2)
     
     # Save
     with open("ai_safety_orgs.json", "w") as f:
@@ -219,6 +144,7 @@ def fix_orgs():
     )
     print(f"Total projects: {total_projects}")
     print(f"Total publications: {total_pubs}")
+    print_stats()
 
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ Sources:
 import json
 import time
 import re
-import requests
+import http_client
 from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 
@@ -83,9 +83,8 @@ def scrape_alignment_forum_authors():
     
     try:
         # Get the users page or popular posts
-        response = requests.get(
+        response = http_client.get(
             "https://www.alignmentforum.org/allPosts",
-            headers={"User-Agent": "Mozilla/5.0"},
             timeout=30
         )
         soup = BeautifulSoup(response.content, "html.parser")
@@ -114,7 +113,7 @@ def scrape_org_team_page(org_name, url, selectors=None):
     people = []
     
     try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
+        response = http_client.get(url, timeout=30)
         soup = BeautifulSoup(response.content, "html.parser")
         
         # Common patterns for team pages
@@ -0,0 +1,239 @@
+"""
+Deterministic extractors for sources with stable structure.
+
+Rules are registered per domain (plus an optional path prefix) and parse the
+raw response body into the record shapes used by extraction.py's schemas:
+"publications" (PUBLICATION), "projects" (PROJECT) and "key_people" (PERSON).
+html_clean runs them in its worker processes (rule_records()) and
+extract_all() fits what they found to the job's schema before calling the
+model; a page with no matching rule, or whose rules find nothing the schema
+asks for, still goes to the LLM.
+
+Add a site with @rule(domain, path) for custom parsing, or css_rule() when
+the page is a list of cards with a title link and an optional summary.
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+# domain -> [(path_prefix, fn)], fn(body, url) -> {field: [records]}
+RULES = {}
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def rule(domain, path="/"):
+    """Register fn(body, url) as an extractor for domain pages under path."""
+    def register(fn):
+        RULES.setdefault(domain, []).append((path, fn))
+        return fn
+    return register
+
+
+def rules_for(url):
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return [fn for path, fn in RULES.get(host, []) if parsed.path.startswith(path)]
+
+
+def publication_to_project(pub):
+    return {
+        "name": pub["name"],
+        "description": pub.get("description", ""),
+        "status": "published",
+        "paper_url": pub.get("url", ""),
+    }
+
+
+def fit(records, schema):
+    """
+    Keep the fields schema asks for; None if none of them have records.
+
+    Also None for schemas with fields that aren't record lists (an org
+    profile's mission): records alone can't answer those.
+    """
+    props = schema["properties"]
+    if any(sub.get("type") != "array" for sub in props.values()):
+        return None
+    data = {name: records[name] for name in props if records.get(name)}
+    if "projects" in props and "projects" not in data and records.get("publications"):
+        data["projects"] = [publication_to_project(p) for p in records["publications"]]
+    if not data:
+        return None
+    for name in schema.get("required", []):
+        if props[name].get("type") == "array":
+            data.setdefault(name, [])
+    return data
+
+
+def run_rules(url, body, schema):
+    """Return schema-shaped data from the first rule that finds any, else None."""
+    return fit_first(rule_records(url, body), schema)
+
+
+def rule_records(url, body):
+    """What every rule for url finds in body, in rule order, before any schema is applied."""
+    found = []
+    for fn in rules_for(url):
+        try:
+            found.append(fn(body, url) or {})
+        except Exception as e:
+            print(f"    Rule {fn.__name__} failed on {url}: {e}")
+    return found
+
+
+def fit_first(found, schema):
+    """fit() of the first rule_records() entry that has anything the schema asks for."""
+    for records in found:
+        data = fit(records, schema)
+        if data:
+            return data
+    return None
+
+
+def css_rule(domain, path, card, title, summary=None, field="publications"):
+    """Register a rule that reads one record per `card` element."""
+    @rule(domain, path)
+    def extract_cards(body, url):
+        soup = BeautifulSoup(body, "html.parser")
+        records = []
+        seen = set()
+        for el in soup.select(card):
+            heading = el.select_one(title)
+            if heading is None:
+                continue
+            name = heading.get_text(" ", strip=True)
+            link = heading if heading.name == "a" else heading.find_parent("a") or el.select_one("a[href]")
+            if not name or name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            record = {"name": name}
+            if link is not None and link.get("href"):
+                record["url"] = urljoin(url, link["href"])
+            text = el.select_one(summary) if summary else None
+            if text is not None:
+                record["description"] = text.get_text(" ", strip=True)[:300]
+            records.append(record)
+        return {field: records}
+
+    extract_cards.__name__ = f"cards_{domain}"
+    return extract_cards
+
+
+@rule("export.arxiv.org", "/api/query")
+def arxiv_atom(body, url):
+    """arXiv API search results (Atom feed)."""
+    root = ET.fromstring(body)
+    publications = []
+    for entry in root.iter(f"{ATOM}entry"):
+        arxiv_id = entry.findtext(f"{ATOM}id", "").split("/")[-1]
+        publications.append({
+            "name": " ".join(entry.findtext(f"{ATOM}title", "").split()),
+            "description": entry.findtext(f"{ATOM}summary", "").strip()[:500],
+            "url": f"https://arxiv.org/abs/{arxiv_id}",
+            "authors": [a.findtext(f"{ATOM}name", "") for a in entry.iter(f"{ATOM}author")],
+            "status": "published",
+            "date": entry.findtext(f"{ATOM}published", "")[:10],
+            "arxiv_id": arxiv_id,
+        })
+    return {"publications": publications}
+
+
+@rule("alignmentforum.org", "/graphql")
+def alignment_forum_posts(body, url):
+    """Alignment Forum GraphQL `posts` query results."""
+    posts = json.loads(body).get("data", {}).get("posts", {}).get("results", [])
+    return {"publications": [
+        {
+            "name": post.get("title"),
+            "url": f"https://www.alignmentforum.org/posts/{post.get('slug')}",
+            "authors": [post["author"]] if post.get("author") else [],
+            "status": "published",
+            "score": post.get("baseScore"),
+            "date": post.get("postedAt"),
+        }
+        for post in posts
+        if post.get("title")
+    ]}
+
+
+# FLI card headings that aren't people
+FLI_SKIP_TEXTS = [
+    "Load more", "Posts from the community", "Join the community",
+    "Vitalik Buterin Fellowships", "AI Professors", "AI Researchers",
+    "Were you looking for something else?", "Our Position on AI",
+    "Report a broken link", "Past Volunteers", "Recent projects",
+    "Focus areas", "Our work", "Our content", "About us",
+    "The Impact of AI in Education", "Can AI agents learn to be good?"
+]
+
+FLI_ROLE_KEYWORDS = [
+    "Professor", "PhD", "Researcher", "Student", "Associate", "Fellow",
+    "Director", "Lead", "Engineer", "Scientist",
+]
+
+
+@rule("futureoflife.org", "/about-us/our-people/")
+def fli_people(body, url):
+    """FLI people pages: one h4 name per card, then role and institution lines."""
+    soup = BeautifulSoup(body, "html.parser")
+    people = []
+
+    for h4 in soup.find_all("h4"):
+        name = h4.get_text(strip=True)
+
+        if any(skip in name for skip in FLI_SKIP_TEXTS):
+            continue
+        if len(name) > 50 or len(name) < 3:
+            continue
+
+        parent = h4.find_parent()
+        if not parent:
+            continue
+
+        lines = parent.get_text(separator="\n", strip=True).split("\n")
+        role = None
+        institution = None
+
+        # Role and institution are the lines that follow the name
+        for i, line in enumerate(lines):
+            if line.strip() != name:
+                continue
+            remaining = lines[i + 1:]
+            for j, next_line in enumerate(remaining):
+                next_line = next_line.strip()
+                if next_line in ["View profile", "Load more", ""]:
+                    continue
+                if any(k in next_line for k in FLI_ROLE_KEYWORDS):
+                    role = next_line
+                else:
+                    if not institution:
+                        institution = next_line
+                    break
+                if j + 1 < len(remaining):
+                    candidate = remaining[j + 1].strip()
+                    if candidate not in ["View profile", "Load more", ""]:
+                        if not any(k in candidate for k in FLI_ROLE_KEYWORDS):
+                            institution = candidate
+                            break
+            break
+
+        if role or institution:
+            people.append({
+                "name": name,
+                "role": role or "Researcher",
+                "institution": institution,
+            })
+
+    return {"key_people": people}
+
+
+# Publication listings made of title-linked cards
+css_rule("cset.georgetown.edu", "/publications", card="article", title="h2 a, h3 a, h2, h3", summary="p")
+css_rule("cset.georgetown.edu", "/research", card="article", title="h2 a, h3 a, h2, h3", summary="p")
+css_rule("governance.ai", "/research", card="article, .w-dyn-item", title="h2, h3, h4", summary="p")
@@ -0,0 +1,65 @@
+"""
+The registry of every org and page the scrapers read (sources.json).
+
+"orgs" maps each dataset org name to the metadata used when the org is first
+added (url, type, country, focus_areas, mission). "sources" lists what to
+scrape for an org:
+
+    id            unique name, "<batch>/<org>"
+    batch         the script that owns it (seed, new_orgs, all_orgs,
+                  remaining, final, research, research_fix)
+    org           the dataset org its results are merged into
+    urls          pages to fetch, in order
+    fetch         http (plain GET), auto (fetcher: HTTP or Playwright),
+                  crawl (auto, then follow the listing's pagination) or
+                  probe (auto, stop at the first URL that answers)
+    extractor     research, publications, projects_people or profile
+    cadence_days  how often run_sources.py considers the source due
+
+The per-script scrapers select their batch from here; run_sources.py runs
+every due source at once.
+"""
+
+import json
+
+REGISTRY_PATH = "sources.json"
+
+FETCH_METHODS = ("http", "auto", "crawl", "probe")
+EXTRACTORS = ("research", "publications", "projects_people", "profile")
+
+_registry = None
+
+
+def load(path=REGISTRY_PATH):
+    global _registry
+    if _registry is None:
+        with open(path) as f:
+            registry = json.load(f)
+        validate(registry)
+        _registry = registry
+    return _registry
+
+
+def validate(registry):
+    seen = set()
+    for source in registry["sources"]:
+        if source["id"] in seen:
+            raise ValueError(f"Duplicate source id {source['id']!r}")
+        seen.add(source["id"])
+        if source["org"] not in registry["orgs"]:
+            raise ValueError(f"{source['id']}: unknown org {source['org']!r}")
+        if source["fetch"] not in FETCH_METHODS:
+            raise ValueError(f"{source['id']}: unknown fetch method {source['fetch']!r}")
+        if source["extractor"] not in EXTRACTORS:
+            raise ValueError(f"{source['id']}: unknown extractor {source['extractor']!r}")
+        if not source["urls"]:
+            raise ValueError(f"{source['id']}: no urls")
+
+
+def org(name):
+    """Registry metadata for an org, with its name included."""
+    return {"name": name, **load()["orgs"][name]}
+
+
+def sources(batch=None):
+    return [source for source in load()["sources"] if batch is None or source["batch"] == batch]
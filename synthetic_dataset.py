@@ -0,0 +1,227 @@
+"""
+Synthetic ai_safety_orgs.json-shaped datasets, N times the size of the real one.
+
+generate(orgs, scale) returns the real orgs followed by scale - 1 synthetic
+orgs per real one. Each synthetic org keeps its template's type, country,
+focus areas, mission and item counts, so the long tail of big orgs is
+preserved. Its name and the names of its projects, benchmarks and people are
+new. Names are spliced from real ones: the head of one real name joined to
+the tail of another, or a real first name with a real last name. Items are
+shallow copies of the template's items, so descriptions and other strings are
+shared with the originals and even 1000x fits in memory.
+
+Two properties of real names are kept as the dataset grows:
+
+    repeats      a new name reuses an earlier one of the same kind at the rate
+                 the real dataset does (duplication_rates()): about 3% of
+                 projects, 6% of benchmarks and 7% of people
+    vocabulary   new words keep appearing, following Heaps' law (vocabulary
+                 ~ tokens ** HEAPS_BETA) from the real counts. Without this a
+                 1000x dataset would reuse the same 2,000 title words, and
+                 every word index would look 1000 times worse than it is.
+
+mats_papers() and fli_researchers() make matching inputs for
+check_mats_papers.py and the FLI scripts. They mix names already in the
+dataset (some of them altered) with new ones.
+
+    python synthetic_dataset.py 100 [--seed 0] [--out synthetic_orgs_100x.json]
+
+scale_benchmark.py runs every matching, merging and exporting step on them.
+"""
+
+import json
+import random
+import re
+import sys
+
+SOURCE_PATH = "ai_safety_orgs.json"
+
+ITEM_FIELDS = ("projects", "benchmarks", "key_people")
+
+# Heaps' law exponent; English text is usually between 0.4 and 0.6
+HEAPS_BETA = 0.5
+
+CITIES = [
+    "Berlin", "Boston", "Cambridge", "Chicago", "Edinburgh", "Geneva", "London", "Montreal",
+    "Munich", "Nairobi", "Oxford", "Paris", "Prague", "San Francisco", "Seoul", "Singapore",
+    "Stockholm", "Sydney", "Tokyo", "Toronto", "Vienna", "Warsaw", "Zurich", "Bangalore",
+]
+
+ROLES = ["Professor", "Associate Professor", "Assistant Professor", "PhD Student",
+         "Research Scientist", "Postdoctoral Researcher", "AI Safety Researcher"]
+
+# How mats_papers() and fli_researchers() pick each input
+PAPER_MIX = {"existing": 0.35, "altered": 0.15, "new": 0.5}
+INSTITUTION_MIX = {"org": 0.45, "alias": 0.15, "university": 0.25, "new": 0.15}
+
+ALIASES = ["UC Berkeley", "MIT", "Stanford", "Oxford", "Cambridge", "DeepMind", "Mila", "FAR AI", "ARC"]
+
+
+def duplication_rates(orgs):
+    """Share of each item kind whose name (case-insensitive) already appeared earlier."""
+    rates = {}
+    for field in ITEM_FIELDS:
+        seen = set()
+        repeats = total = 0
+        for org in orgs:
+            for item in org.get(field, []):
+                name = item.get("name", "").lower()
+                repeats += name in seen
+                seen.add(name)
+                total += 1
+        rates[field] = repeats / total if total else 0.0
+    return rates
+
+
+class Namer:
+    """New names for one item kind, repeating earlier ones at a fixed rate."""
+
+    def __init__(self, field, real_names, rate, rng):
+        self.field = field
+        self.rng = rng
+        self.rate = rate
+        self.used = {name.lower() for name in real_names}
+        self.pool = list(real_names)
+        self.words = [name.split() for name in real_names if name.split()]
+        self.first = sorted({words[0] for words in self.words})
+        self.last = sorted({words[-1] for words in self.words if len(words) > 1}) or self.first
+        self.vocabulary = sorted({word for words in self.words for word in words})
+        self.known_words = {word.lower() for word in self.vocabulary}
+        # Heaps' law fitted through the real names: vocabulary = k * tokens ** beta
+        self.real_tokens = self.tokens = max(1, sum(len(words) for words in self.words))
+        self.new_word_rate = HEAPS_BETA * len(self.vocabulary) / self.real_tokens
+
+    def new_word(self, like):
+        """A word not seen before, spliced from two real ones and shaped like `like`."""
+        rng = self.rng
+        while True:
+            a, b = rng.choice(self.vocabulary), rng.choice(self.vocabulary)
+            word = a[:max(1, len(a) // 2)] + b[len(b) // 2:].lower()
+            if len(word) < 3:
+                word += rng.choice("aeiou") + rng.choice("nrstl")
+            word = word.capitalize() if like[:1].isupper() else word.lower()
+            if word.lower() not in self.known_words:
+                self.known_words.add(word.lower())
+                self.vocabulary.append(word)
+                return word
+
+    def fresh(self):
+        rng = self.rng
+        if self.field == "key_people":
+            words = [rng.choice(self.first), rng.choice(self.last)]
+        else:
+            head, tail = rng.choice(self.words), rng.choice(self.words)
+            words = head[:rng.randint(1, max(1, len(head) - 1))] + tail[len(tail) // 2:]
+        # d(vocabulary)/d(tokens) under Heaps' law
+        new_rate = self.new_word_rate * (self.tokens / self.real_tokens) ** (HEAPS_BETA - 1)
+        words = [self.new_word(word) if rng.random() < new_rate else word for word in words]
+        self.tokens += len(words)
+        name = " ".join(words)
+        while name.lower() in self.used:
+            if self.field == "key_people":
+                parts = name.split()
+                name = " ".join(parts[:1] + [f"{rng.choice('ABCDEFGHJKLMNPRSTW')}."] + parts[1:])
+            else:
+                name = f"{name} {self.new_word(name)}"
+        return name
+
+    def next(self):
+        if self.pool and self.rng.random() < self.rate:
+            return self.rng.choice(self.pool)
+        name = self.fresh()
+        self.used.add(name.lower())
+        self.pool.append(name)
+        return name
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def generate(orgs, scale, seed=0):
+    """orgs followed by scale - 1 synthetic orgs per real one, all with fresh names."""
+    rng = random.Random(seed)
+    rates = duplication_rates(orgs)
+    namers = {
+        field: Namer(field, [item["name"] for org in orgs for item in org.get(field, [])], rates[field], rng)
+        for field in ITEM_FIELDS
+    }
+    # Org names are keys, so they never repeat
+    org_namer = Namer("orgs", [org["name"] for org in orgs], 0.0, rng)
+    dataset = list(orgs)
+    for _ in range(1, scale):
+        for template in orgs:
+            org = dict(template)
+            org["name"] = org_namer.next()
+            if template.get("url"):
+                org["url"] = f"https://{slug(org['name'])}.org"
+            for field in ITEM_FIELDS:
+                if field in template:
+                    org[field] = [{**item, "name": namers[field].next()} for item in template[field]]
+            dataset.append(org)
+    return dataset
+
+
+def mats_papers(dataset, count, seed=0):
+    """check_mats_papers.py rows: titles from the dataset (some altered) and new ones."""
+    rng = random.Random(seed)
+    titles = [p["name"] for org in dataset for p in org.get("projects", [])]
+    namer = Namer("projects", titles[:5000], 0.0, rng)
+    papers = []
+    for _ in range(count):
+        kind = rng.choices(list(PAPER_MIX), weights=PAPER_MIX.values())[0]
+        if kind == "existing":
+            title = rng.choice(titles)
+        elif kind == "altered":
+            title = rng.choice(titles)
+            title = rng.choice([title.lower(), title.replace(" ", "-", 1), f"{title}: Evidence from Language Models"])
+        else:
+            title = namer.fresh()
+        papers.append({
+            "title": title,
+            "url": f"https://arxiv.org/abs/{rng.randint(20, 25)}{rng.randint(1, 12):02d}.{rng.randint(10000, 99999)}",
+            "citations": int(rng.paretovariate(1.2)) - 1,
+            "year": str(rng.randint(2019, 2025)),
+        })
+    return papers
+
+
+def fli_researchers(dataset, count, seed=0):
+    """FLI community entries: name, role and an institution in the forms the page uses."""
+    rng = random.Random(seed)
+    org_names = [org["name"] for org in dataset]
+    people = [p["name"] for org in dataset[:5000] for p in org.get("key_people", [])]
+    namer = Namer("key_people", people, 0.0, rng)
+    researchers = []
+    for _ in range(count):
+        kind = rng.choices(list(INSTITUTION_MIX), weights=INSTITUTION_MIX.values())[0]
+        if kind == "org":
+            institution = rng.choice(org_names)
+        elif kind == "alias":
+            institution = rng.choice(ALIASES)
+        elif kind == "university":
+            institution = f"University of {rng.choice(CITIES)}"
+        else:
+            institution = f"{rng.choice(CITIES)} {rng.choice(['Institute of Technology', 'Research Lab', 'College'])}"
+        researchers.append({"name": namer.fresh(), "role": rng.choice(ROLES), "institution": institution})
+    return researchers
+
+
+def flag_value(flag):
+    if flag in sys.argv:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return None
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1])
+    seed = int(flag_value("--seed") or 0)
+    out = flag_value("--out") or f"synthetic_orgs_{scale}x.json"
+    with open(SOURCE_PATH) as f:
+        orgs = json.load(f)
+    dataset = generate(orgs, scale, seed)
+    with open(out, "w") as f:
+        json.dump(dataset, f, indent=2)
+    print(f"✓ {len(dataset)} orgs, {sum(len(o.get('projects', [])) for o in dataset)} projects, "
+          f"{sum(len(o.get('key_people', [])) for o in dataset)} people written to {out}")
+    print("  Name repeat rates: " + ", ".join(f"{k} {v:.1%}" for k, v in duplication_rates(dataset).items()))
@@ -0,0 +1,42 @@
+"""
+Shared fixtures: the repo root on sys.path, tracing kept in memory, fetch
+archiving off, and fixture_server.FixtureServer instances that shut down
+after each test.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_archive  # noqa: E402
+import tracing  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_trace_file(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_DIR", "")
+
+
+@pytest.fixture(autouse=True)
+def no_fetch_archive(monkeypatch):
+    monkeypatch.setattr(fetch_archive, "ARCHIVE_DIR", "")
+
+
+@pytest.fixture
+def serve():
+    """Start a FixtureServer with the given latency/error settings."""
+    servers = []
+
+    def start(**kwargs):
+        server = FixtureServer(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,132 @@
+"""discover() state: nothing is lost to the per-run cap or a failed fetch."""
+
+import pytest
+
+import discovery
+
+SITE = "https://example.org/"
+
+
+def urlset(urls, lastmod=None):
+    entries = "".join(
+        f"<url><loc>{url}</loc>{f'<lastmod>{lastmod(i)}</lastmod>' if lastmod else ''}</url>"
+        for i, url in enumerate(urls)
+    )
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+
+
+def index(children):
+    entries = "".join(f"<sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>" for loc, lastmod in children)
+    return f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """url -> body served by discovery.fetch; missing urls fail."""
+    pages = {SITE: "<html></html>"}
+    monkeypatch.setattr(discovery, "fetch", pages.get)
+    return pages
+
+
+def papers(n):
+    return [f"{SITE}research/paper-{i}" for i in range(n)]
+
+
+def baseline(site, state, **kwargs):
+    """First run against an empty sitemap, so later items count as new."""
+    site[f"{SITE}sitemap.xml"] = urlset([])
+    assert discovery.discover(SITE, state, **kwargs) == []
+    return state
+
+
+def runs(state, limit=10):
+    found = []
+    for _ in range(limit):
+        urls = discovery.discover(SITE, state)
+        if not urls:
+            break
+        assert len(urls) <= discovery.MAX_NEW_PER_ORG
+        found.append(urls)
+    return found
+
+
+@pytest.mark.parametrize("lastmod", [
+    lambda i: f"2024-01-01T00:00:{i % 60:02d}Z",  # mostly distinct dates
+    lambda i: "2024-01-01",                       # one date for the whole site
+    None,                                         # no dates at all
+])
+def test_capped_items_come_back_on_later_runs(site, lastmod):
+    state = baseline(site, {})
+    urls = papers(120)
+    site[f"{SITE}sitemap.xml"] = urlset(urls, lastmod)
+    found = runs(state)
+    assert [len(batch) for batch in found] == [50, 50, 20]
+    assert sorted(sum(found, [])) == sorted(urls)
+
+
+def test_first_run_only_records_a_baseline(site):
+    state = {}
+    site[f"{SITE}sitemap.xml"] = urlset(papers(3), lambda i: f"2024-01-0{i + 1}")
+    assert discovery.discover(SITE, state) == []
+    site[f"{SITE}sitemap.xml"] = urlset(papers(5), lambda i: f"2024-01-0{i + 1}")
+    assert discovery.discover(SITE, state) == papers(5)[3:]
+
+
+def test_failed_child_sitemap_is_read_next_run(site):
+    state = {}
+    child = f"{SITE}sitemap-posts.xml"
+    site[f"{SITE}sitemap.xml"] = index([(child, "2024-02-01")])
+    assert discovery.discover(SITE, state) == []
+    site[child] = urlset(papers(2), lambda i: "2024-01-15")
+    assert discovery.discover(SITE, state) == papers(2)
+
+
+def test_capped_child_sitemap_is_reread(site):
+    child = f"{SITE}sitemap-posts.xml"
+    state = baseline(site, {})
+    site[f"{SITE}sitemap.xml"] = index([(child, "2024-02-01")])
+    site[child] = urlset(papers(60), lambda i: "2024-01-15")
+    found = runs(state)
+    assert [len(batch) for batch in found] == [50, 10]
+
+
+def test_failed_items_are_handed_out_again(site):
+    state = baseline(site, {})
+    site[f"{SITE}sitemap.xml"] = urlset(papers(3), lambda i: f"2024-01-0{i + 1}")
+    urls = discovery.discover(SITE, state)
+    discovery.settle(state, SITE, urls, failed=urls[1:2])
+    assert discovery.discover(SITE, state) == urls[1:2]
+
+
+def test_failed_items_are_dropped_after_max_attempts(site):
+    state = baseline(site, {})
+    site[f"{SITE}sitemap.xml"] = urlset(papers(1), lambda i: "2024-01-01")
+    for _ in range(discovery.MAX_ATTEMPTS):
+        urls = discovery.discover(SITE, state)
+        assert urls == papers(1)
+        discovery.settle(state, SITE, urls, failed=urls)
+    assert discovery.discover(SITE, state) == []
+
+
+def test_pending_items_count_toward_the_cap(site):
+    state = baseline(site, {})
+    site[f"{SITE}sitemap.xml"] = urlset(papers(60), lambda i: f"2024-01-01T00:00:{i:02d}Z")
+    first = discovery.discover(SITE, state)
+    discovery.settle(state, SITE, first, failed=first[:5])
+    second = discovery.discover(SITE, state)
+    assert second == first[:5] + papers(60)[50:]
+
+
+def test_known_urls_are_skipped_and_passed_over(site):
+    state = baseline(site, {})
+    site[f"{SITE}sitemap.xml"] = urlset(papers(4), lambda i: f"2024-01-0{i + 1}")
+    assert discovery.discover(SITE, state, known=papers(4)[:2]) == papers(4)[2:]
+    assert discovery.discover(SITE, state) == []
+
+
+def test_sources_on_one_host_keep_their_own_state(site):
+    state = baseline(site, {}, source="all_orgs/example")
+    site[f"{SITE}sitemap.xml"] = urlset(papers(2), lambda i: "2024-01-01")
+    assert discovery.discover(SITE, state, source="all_orgs/example") == papers(2)
+    assert discovery.discover(SITE, state, source="research/example") == []
+    assert discovery.discover(SITE, state, source="all_orgs/example") == []
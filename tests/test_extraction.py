@@ -0,0 +1,138 @@
+"""extract_all() against the fake Messages API: concurrency, budgets and retries."""
+
+import time
+
+import pytest
+from anthropic import Anthropic
+
+import extraction
+from extraction import RateLimiter
+
+PERIOD = 0.5  # seconds standing in for the limiter's minute
+
+
+@pytest.fixture
+def llm(serve, monkeypatch):
+    """Point extraction at a FixtureServer with an unlimited budget and fast retries."""
+
+    def start(limiter=None, **kwargs):
+        server = serve(**kwargs)
+        client = Anthropic(api_key="test", base_url=f"{server.base_url}/anthropic", max_retries=0)
+        monkeypatch.setattr(extraction, "_client", client)
+        monkeypatch.setattr(extraction, "limiter", limiter or RateLimiter(10 ** 6, 10 ** 9, 10 ** 9))
+        monkeypatch.setattr(extraction, "RETRY_BACKOFF", 0.01)
+        return server
+
+    return start
+
+
+def jobs(n, max_tokens=1000):
+    return [
+        {
+            "instructions": "Extract research projects and key people.",
+            "content": f"Page {i}: our team works on interpretability.",
+            "schema": extraction.ORG_PROFILE_SCHEMA,
+            "model": extraction.MODEL,
+            "max_tokens": max_tokens,
+            "label": f"page {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def recording(limiter):
+    """Wrap limiter.acquire to log (start time, estimated input tokens) per request."""
+    log = []
+    acquire = limiter.acquire
+
+    def record(input_tokens, output_tokens):
+        entry = acquire(input_tokens, output_tokens)
+        log.append((entry[0], input_tokens))
+        return entry
+
+    limiter.acquire = record
+    return log
+
+
+def most_in_any_period(starts):
+    starts = sorted(starts)
+    return max(sum(1 for t in starts if first <= t < first + PERIOD) for first in starts)
+
+
+def test_runs_up_to_max_workers_at_once(llm):
+    server = llm(latency={"llm": 0.2})
+    started = time.monotonic()
+    results = extraction.extract_all(jobs(8), max_workers=4)
+    elapsed = time.monotonic() - started
+
+    assert all(result is not None for result in results)
+    assert server.counts["llm"] == 8
+    assert server.peak["llm"] == 4
+    # Two rounds of four, not eight calls in a row
+    assert elapsed < 8 * 0.2 * 0.75
+
+
+def test_requests_per_minute(llm):
+    limiter = RateLimiter(3, 10 ** 9, 10 ** 9, period=PERIOD)
+    log = recording(limiter)
+    server = llm(limiter=limiter)
+    started = time.monotonic()
+    extraction.extract_all(jobs(7), max_workers=4)
+
+    assert server.counts["llm"] == 7
+    assert most_in_any_period([t for t, _ in log]) <= 3
+    # Seven requests at three per period need two full periods
+    assert time.monotonic() - started >= 2 * PERIOD
+
+
+def test_input_tokens_per_minute(llm):
+    # One call to learn the request's estimate and the usage the server reports
+    llm()
+    log = recording(extraction.limiter)
+    used = extraction.STATS["input_tokens"]
+    extraction.extract_all(jobs(1))
+    estimate, used = log[0][1], extraction.STATS["input_tokens"] - used
+
+    # A request is admitted on its estimate and then counts its real usage,
+    # so this budget fits two per period, not three
+    limiter = RateLimiter(10 ** 6, estimate + used * 3 // 2, 10 ** 9, period=PERIOD)
+    log = recording(limiter)
+    server = llm(limiter=limiter)
+    extraction.extract_all(jobs(6), max_workers=4)
+
+    assert server.counts["llm"] == 6
+    assert most_in_any_period([t for t, _ in log]) <= 2
+
+
+def test_output_budget_holds_max_tokens_until_settled(llm):
+    # Requests in flight reserve max_tokens of output; only two fit at once
+    limiter = RateLimiter(10 ** 6, 10 ** 9, 2500, period=PERIOD)
+    server = llm(limiter=limiter, latency={"llm": 0.2})
+    results = extraction.extract_all(jobs(6, max_tokens=1000), max_workers=4)
+
+    assert all(result is not None for result in results)
+    assert server.peak["llm"] == 2
+
+
+@pytest.mark.parametrize("status", [429, 529])
+def test_retries_rate_limits_and_overloads(llm, status):
+    server = llm(error_rate={"llm": 0.4}, error_status={"llm": status}, seed=1)
+    retries = extraction.STATS["api_retries"]
+    results = extraction.extract_all(jobs(10), max_workers=1)
+
+    assert all(result is not None for result in results)
+    assert server.counts["llm_errors"] > 0
+    assert extraction.STATS["api_retries"] - retries == server.counts["llm_errors"]
+    assert server.counts["llm"] == 10 + server.counts["llm_errors"]
+
+
+def test_gives_up_after_max_retries(llm):
+    server = llm(error_rate={"llm": 1.0}, error_status={"llm": 529})
+    assert extraction.extract_all(jobs(1)) == [None]
+    assert server.counts["llm"] == extraction.MAX_API_RETRIES + 1
+
+
+def test_does_not_retry_bad_requests(llm):
+    server = llm(error_rate={"llm": 1.0}, error_status={"llm": 400})
+    assert extraction.extract_all(jobs(1)) == [None]
+    assert server.counts["llm"] == 1
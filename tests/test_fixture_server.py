@@ -0,0 +1,74 @@
+"""The fake Messages API's prompt-cache accounting."""
+
+import httpx
+import pytest
+
+from fixture_server import DEFAULT_MIN_CACHEABLE_TOKENS, MIN_CACHEABLE_TOKENS
+
+SONNET = "claude-sonnet-4-20250514"
+HAIKU = "claude-3-5-haiku-20241022"
+
+TOOL = {"name": "record", "input_schema": {"type": "object", "properties": {"name": {"type": "string"}}}}
+
+
+def request(model, instructions_tokens, page, cache=True):
+    # The fake API counts a token per four characters of JSON
+    instructions = {"type": "text", "text": "x" * (4 * instructions_tokens)}
+    if cache:
+        instructions["cache_control"] = {"type": "ephemeral"}
+    return {
+        "model": model,
+        "max_tokens": 100,
+        "tools": [TOOL],
+        "tool_choice": {"type": "tool", "name": "record"},
+        "system": [instructions],
+        "messages": [{"role": "user", "content": page}],
+    }
+
+
+def usage(server, body):
+    response = httpx.post(f"{server.base_url}/anthropic/v1/messages", json=body)
+    response.raise_for_status()
+    return response.json()["usage"]
+
+
+def test_first_request_writes_then_later_ones_read(serve):
+    server = serve()
+    first = usage(server, request(SONNET, 1500, "page one"))
+    second = usage(server, request(SONNET, 1500, "page two"))
+
+    assert first["cache_read_input_tokens"] == 0
+    assert first["cache_creation_input_tokens"] >= 1500
+    assert second["cache_read_input_tokens"] == first["cache_creation_input_tokens"]
+    assert second["cache_creation_input_tokens"] == 0
+    # Only the page is billed as plain input
+    assert second["input_tokens"] < 100
+
+
+def test_changed_prefix_misses(serve):
+    server = serve()
+    usage(server, request(SONNET, 1500, "page"))
+    other = usage(server, request(SONNET, 1501, "page"))
+    assert other["cache_read_input_tokens"] == 0
+    assert other["cache_creation_input_tokens"] > 0
+
+
+@pytest.mark.parametrize("model,minimum", [
+    (SONNET, DEFAULT_MIN_CACHEABLE_TOKENS),
+    (HAIKU, MIN_CACHEABLE_TOKENS["haiku"]),
+])
+def test_nothing_is_cached_below_the_minimum(serve, model, minimum):
+    server = serve()
+    for page in ("one", "two"):
+        short = usage(server, request(model, minimum - 200, page))
+        assert short["cache_read_input_tokens"] == short["cache_creation_input_tokens"] == 0
+    usage(server, request(model, minimum + 100, "one"))
+    assert usage(server, request(model, minimum + 100, "two"))["cache_read_input_tokens"] > minimum
+
+
+def test_no_cache_control_no_caching(serve):
+    server = serve()
+    for page in ("one", "two"):
+        plain = usage(server, request(SONNET, 3000, page, cache=False))
+        assert plain["cache_read_input_tokens"] == plain["cache_creation_input_tokens"] == 0
+        assert plain["input_tokens"] > 3000
@@ -0,0 +1,117 @@
+"""crawl() over a small paginated site served from memory."""
+
+import threading
+
+import pytest
+
+import listing_crawler
+
+SITE = "https://example.org"
+NAV = '<nav><a href="/">Home</a><a href="/about">About</a></nav>'
+
+
+def listing(page, items=5, next_href=None):
+    links = "".join(f'<li><a href="/papers/{page}-{i}">Paper {page}.{i}</a></li>' for i in range(items))
+    more = f'<a href="{next_href}">Older posts</a>' if next_href else ""
+    return f"<html><body>{NAV}<ul>{links}</ul>{more}</body></html>"
+
+
+def item(page, i):
+    return f"{SITE}/papers/{page}-{i}"
+
+
+class Site(dict):
+    """url -> html, served through fetch(); fetched records every request."""
+
+    def __init__(self):
+        super().__init__()
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def fetch(self, url):
+        with self.lock:
+            self.fetched.append(url)
+        return self.get(url)
+
+
+@pytest.fixture
+def site(monkeypatch):
+    site = Site()
+    monkeypatch.setattr(listing_crawler, "fetch", site.fetch)
+    return site
+
+
+def numbered(site, count, repeat_last=False):
+    for n in range(1, count + 1):
+        site[f"{SITE}/publications?page={n}"] = listing(n)
+    if repeat_last:
+        # Sites often render the last page again for any number past it
+        site[f"{SITE}/publications?page={count + 1}"] = listing(count)
+
+
+def crawled(start, **kwargs):
+    return [url for url, _ in listing_crawler.crawl(start, **kwargs)]
+
+
+def test_follows_next_links(site):
+    urls = [f"{SITE}/blog"] + [f"{SITE}/blog/older-{n}" for n in range(1, 5)]
+    for n, url in enumerate(urls):
+        site[url] = listing(n, next_href=urls[n + 1] if n + 1 < len(urls) else None)
+    assert crawled(urls[0]) == urls
+
+
+def test_follows_numbered_pages_in_order(site):
+    numbered(site, 7)
+    assert crawled(f"{SITE}/publications?page=1") == [f"{SITE}/publications?page={n}" for n in range(1, 8)]
+
+
+def test_follows_path_numbered_pages(site):
+    for n in range(1, 4):
+        site[f"{SITE}/research/page/{n}/"] = listing(n)
+    assert crawled(f"{SITE}/research/page/1/") == [f"{SITE}/research/page/{n}/" for n in range(1, 4)]
+
+
+def test_stops_at_a_repeated_page(site):
+    numbered(site, 6, repeat_last=True)
+    assert crawled(f"{SITE}/publications?page=1")[-1] == f"{SITE}/publications?page=6"
+    assert len(crawled(f"{SITE}/publications?page=1")) == 6
+
+
+def test_repeated_next_link_target_ends_the_crawl(site):
+    # The last page's "Next" points back to itself
+    site[f"{SITE}/blog"] = listing(0, next_href="/blog/older")
+    site[f"{SITE}/blog/older"] = listing(1, next_href="/blog/oldest")
+    site[f"{SITE}/blog/oldest"] = listing(1, next_href="/blog/oldest")
+    assert crawled(f"{SITE}/blog") == [f"{SITE}/blog", f"{SITE}/blog/older"]
+
+
+@pytest.mark.parametrize("start", [f"{SITE}/publications?page=1", f"{SITE}/blog"])
+def test_stops_at_the_first_page_with_a_known_item(site, start):
+    numbered(site, 8)
+    site[f"{SITE}/blog"] = listing(1, next_href="/blog/2")
+    for n in range(2, 9):
+        site[f"{SITE}/blog/{n}"] = listing(n, next_href=f"/blog/{n + 1}")
+    urls = crawled(start, known={item(3, 2)})
+    assert len(urls) == 3
+
+
+@pytest.mark.parametrize("start", [f"{SITE}/publications?page=1", f"{SITE}/blog"])
+def test_caps_pages_and_fetches(site, start):
+    numbered(site, 12)
+    site[f"{SITE}/blog"] = listing(1, next_href="/blog/2")
+    for n in range(2, 13):
+        site[f"{SITE}/blog/{n}"] = listing(n, next_href=f"/blog/{n + 1}")
+    assert len(crawled(start, max_pages=5)) == 5
+    assert len(site.fetched) <= 5
+
+
+def test_stops_at_a_failed_page(site):
+    numbered(site, 3)
+    assert len(crawled(f"{SITE}/publications?page=1")) == 3
+
+
+def test_uses_the_callers_first_page(site):
+    numbered(site, 2)
+    urls = crawled(f"{SITE}/publications?page=1", html=listing(1))
+    assert urls == [f"{SITE}/publications?page=1", f"{SITE}/publications?page=2"]
+    assert f"{SITE}/publications?page=1" not in site.fetched
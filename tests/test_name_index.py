@@ -0,0 +1,26 @@
+"""NameIndex matching order."""
+
+from name_index import NameIndex
+
+ORGS = NameIndex([("anthropic fellows", 0), ("anthropic", 1), ("far ai", 2), ("redwood research", 3)])
+
+
+def test_exact_name_wins():
+    assert ORGS.match("anthropic") == 1
+
+
+def test_earliest_containing_or_contained_name():
+    assert ORGS.match("anthr") == 0
+    assert ORGS.match("anthropic pbc") == 1
+    assert ORGS.match("redwood") == 3
+    assert ORGS.match("mila") is None
+
+
+def test_min_len_skips_short_names():
+    assert ORGS.match("far ai labs") == 2
+    assert ORGS.match("far ai labs", min_len=7) is None
+
+
+def test_match_containing_any_query():
+    assert ORGS.match_containing("research", "far") == 2
+    assert ORGS.match_containing("deepmind") is None
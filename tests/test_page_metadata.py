@@ -0,0 +1,75 @@
+"""Which pages their metadata alone can answer."""
+
+import pytest
+
+import extraction
+from extraction import ORG_PROFILE_SCHEMA, PUBLICATIONS_SCHEMA, RESEARCH_SCHEMA
+from html_clean import clean_html
+from page_metadata import format_hints, harvest, own_paper
+from site_extractors import fit
+
+PAPER_URL = "https://example.org/papers/sleeper-agents/"
+
+PAPER_PAGE = """<html><head>
+<meta name="citation_title" content="Sleeper Agents">
+<meta name="citation_author" content="Hubinger, Evan">
+<meta name="citation_abstract_html_url" content="https://www.example.org/papers/sleeper-agents">
+</head><body><p>Abstract...</p></body></html>"""
+
+# A listing whose JSON-LD only describes the featured paper
+LISTING_PAGE = """<html><head>
+<script type="application/ld+json">
+{"@type": "ScholarlyArticle", "headline": "Featured paper", "url": "/papers/featured"}
+</script></head><body><ul><li>Featured paper</li><li>Another paper</li></ul></body></html>"""
+
+
+def test_a_papers_own_page_is_its_paper():
+    paper = own_paper(harvest(PAPER_PAGE, PAPER_URL), PAPER_URL)
+    assert paper["name"] == "Sleeper Agents"
+
+
+def test_a_listing_with_one_featured_paper_is_not():
+    url = "https://example.org/papers/"
+    assert own_paper(harvest(LISTING_PAGE, url), url) is None
+
+
+def test_fit_leaves_profiles_to_the_model():
+    records = {"publications": [{"name": "Sleeper Agents", "url": PAPER_URL}]}
+    assert fit(records, ORG_PROFILE_SCHEMA) is None
+    assert fit(records, RESEARCH_SCHEMA)["projects"][0]["name"] == "Sleeper Agents"
+
+
+def test_hints_carry_the_harvested_papers():
+    metadata = harvest(LISTING_PAGE, "https://example.org/papers/")
+    assert "Featured paper" in format_hints(metadata["hints"], metadata["publications"])
+
+
+@pytest.fixture
+def model(monkeypatch):
+    calls = []
+
+    def extract(**job):
+        calls.append(job)
+        return {}
+
+    monkeypatch.setattr(extraction, "extract", extract)
+    return calls
+
+
+@pytest.mark.parametrize("schema,url,html,skipped", [
+    (PUBLICATIONS_SCHEMA, PAPER_URL, PAPER_PAGE, True),
+    (RESEARCH_SCHEMA, PAPER_URL, PAPER_PAGE, False),
+    (ORG_PROFILE_SCHEMA, PAPER_URL, PAPER_PAGE, False),
+    (PUBLICATIONS_SCHEMA, "https://example.org/papers/", LISTING_PAGE, False),
+])
+def test_only_single_paper_jobs_skip_the_model(model, schema, url, html, skipped):
+    cleaned = clean_html(html, url)
+    job = {"instructions": "Extract.", "content": "page text", "schema": schema, "url": url, "cleaned": cleaned}
+    result = extraction.run_job(job)
+    if skipped:
+        assert result == {"publications": [own_paper(harvest(html, url), url)]}
+        assert model == []
+    else:
+        assert len(model) == 1
+        assert model[0]["content"].startswith("Page metadata:")
+        assert model[0]["content"].endswith("page text")
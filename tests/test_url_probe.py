@@ -0,0 +1,83 @@
+"""Which probe failures mark a domain dead, and that probes skip robots.txt."""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import url_probe
+
+
+@pytest.fixture(autouse=True)
+def dead_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(url_probe, "DEAD_PATH", str(tmp_path / "dead_domains.json"))
+    monkeypatch.setattr(url_probe, "_dead", None)
+    monkeypatch.setattr(url_probe, "PROBE_TIMEOUT", 0.5)
+    monkeypatch.setattr(url_probe, "REFUSAL_RETRY_DELAY", 0.01)
+
+
+def dead_hosts():
+    return set(url_probe.load_dead())
+
+
+def test_live_site_without_robots_fetch():
+    paths = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_HEAD(self):
+            paths.append(self.path)
+            self.send_response(200)
+            self.end_headers()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        assert url_probe.probe(url) == url
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert paths == ["/"]
+
+
+def test_timeout_does_not_mark_dead():
+    # Accepts connections into the backlog but never answers
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(8)
+    try:
+        assert url_probe.probe(f"http://127.0.0.1:{silent.getsockname()[1]}/") is None
+    finally:
+        silent.close()
+    assert dead_hosts() == set()
+
+
+def test_repeated_refusals_mark_dead(monkeypatch):
+    attempts = []
+
+    def refuse(url):
+        attempts.append(url)
+        raise url_probe.http_client.ConnectionRefused(url)
+
+    monkeypatch.setattr(url_probe, "head_or_get", refuse)
+    assert url_probe.probe("http://127.0.0.1:9/") is None
+    assert len(attempts) == url_probe.REFUSALS_TO_DEAD
+    assert dead_hosts() == {"127.0.0.1"}
+
+
+def test_a_refused_connection_is_reported_as_such():
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    port = closed.getsockname()[1]
+    closed.close()
+    with pytest.raises(url_probe.http_client.ConnectionRefused):
+        url_probe.head_or_get(f"http://127.0.0.1:{port}/")
+
+
+def test_unresolvable_domain_marks_dead():
+    assert url_probe.probe("https://no-such-host.invalid/") is None
+    assert dead_hosts() == {"no-such-host.invalid"}
@@ -0,0 +1,306 @@
+"""
+Span tracing and run metrics for the scrapers.
+
+A span times one unit of work: a pipeline stage handling one item, one HTTP
+request, one model call. Open one with
+
+    with tracing.span("http", host=host) as span:
+        ...
+        span.set(status=response.status_code)
+
+Spans nest per thread. A span opened inside another records it as its
+parent. Amounts given to add() (bytes, tokens, retries) are added to every
+open ancestor with a different name as well, so a page's extract span
+carries the tokens of every model call made for it. Code that doesn't hold
+the span reaches the innermost open one with annotate(), add(), fail() and
+exclude(), which do nothing when no span is open. A span left by an
+exception is marked as an error with the exception's message, and the
+exception propagates.
+
+Every finished span is one JSON line in TRACE_DIR/<timestamp>-<pid>.jsonl:
+name, id, parent, start (epoch seconds), seconds, error and attributes.
+Set TRACE_DIR= (empty) to turn the file off; totals are kept in memory either
+way. print_summary() shows them at the end of a run:
+
+    spans     count, error rate, total / p50 / p95 seconds, bytes and tokens
+              per span name
+    hosts     HTTP requests per host, slowest first
+    prompts   model calls per prompt and model, with tokens per call and the
+              cache hit rate, most expensive first
+
+write_metrics() writes the same totals as a Prometheus textfile (for
+node_exporter's textfile collector) to METRICS_TEXTFILE, or the path given.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+
+# Span names broken down by attributes in the summary and metrics
+BREAKDOWNS = {"http": ("host",), "llm": ("prompt", "model")}
+
+TOKEN_KINDS = ("input", "cache_read", "cache_write", "output")
+
+# Rows per breakdown table in print_summary()
+SUMMARY_ROWS = 10
+
+_local = threading.local()
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_trace = None
+_trace_path = None
+_totals = {}  # span name -> Totals
+_breakdowns = {}  # (span name, attribute values) -> Totals
+
+
+class Totals:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.durations = []
+        self.amounts = Counter()
+
+    def add(self, span):
+        self.count += 1
+        self.errors += span.error is not None
+        self.durations.append(span.seconds)
+        self.amounts.update(span.amounts)
+
+    @property
+    def seconds(self):
+        return sum(self.durations)
+
+    def percentile(self, share):
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+    def tokens(self, kinds=TOKEN_KINDS):
+        return sum(self.amounts[f"{kind}_tokens"] for kind in kinds)
+
+
+class Span:
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.id = next(_ids)
+        self.parent = parent
+        self.attributes = attributes
+        self.amounts = Counter()
+        self.error = None
+        self.excluded = 0.0
+        self.start = time.time()
+        self.started = time.monotonic()
+        self.seconds = 0.0
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, **amounts):
+        """Add to numeric totals (bytes, tokens...) here and in open ancestors of other names."""
+        span = self
+        while span is not None:
+            # A robots.txt fetch inside a request mustn't count twice in the "http" totals
+            if span is self or span.name != self.name:
+                span.amounts.update(amounts)
+            span = span.parent
+
+    def fail(self, message):
+        """Count the span as an error without raising."""
+        self.error = message
+
+    def exclude(self, seconds):
+        """Leave time spent waiting on something else (a queue, a crawl delay) out of the duration."""
+        self.excluded += seconds
+
+    def __enter__(self):
+        _stack().append(self)
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        self.seconds = max(0.0, time.monotonic() - self.started - self.excluded)
+        if error is not None:
+            self.error = f"{kind.__name__}: {error}"
+        _stack().pop()
+        finish(self)
+        return False
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current():
+    """The innermost open span on this thread, or None."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def span(name, **attributes):
+    return Span(name, current(), attributes)
+
+
+def annotate(**attributes):
+    """Set attributes on the innermost open span, if any."""
+    if current() is not None:
+        current().set(**attributes)
+
+
+def add(**amounts):
+    """Add amounts to the innermost open span and its ancestors, if any."""
+    if current() is not None:
+        current().add(**amounts)
+
+
+def fail(message):
+    """Count the innermost open span, if any, as an error."""
+    if current() is not None:
+        current().fail(message)
+
+
+def exclude(seconds):
+    """Leave seconds out of the innermost open span's duration, if there is one."""
+    if current() is not None:
+        current().exclude(seconds)
+
+
+def trace_file():
+    """The run's open trace file, or None when TRACE_DIR is empty. Call with _lock held."""
+    global _trace, _trace_path
+    if _trace is None and TRACE_DIR:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        _trace_path = os.path.join(TRACE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+        _trace = open(_trace_path, "a")
+    return _trace
+
+
+def finish(span):
+    record = {
+        "name": span.name,
+        "id": span.id,
+        "parent": span.parent.id if span.parent else None,
+        "start": round(span.start, 6),
+        "seconds": round(span.seconds, 6),
+        "error": span.error,
+        "attributes": {**span.attributes, **span.amounts},
+    }
+    line = json.dumps(record, default=str)
+    with _lock:
+        trace = trace_file()
+        if trace is not None:
+            trace.write(line + "\n")
+            trace.flush()
+        _totals.setdefault(span.name, Totals()).add(span)
+        if span.name in BREAKDOWNS:
+            key = (span.name,) + tuple(str(span.attributes.get(attr, "")) for attr in BREAKDOWNS[span.name])
+            _breakdowns.setdefault(key, Totals()).add(span)
+
+
+def cache_hit_rate(totals):
+    total = totals.tokens()
+    return totals.amounts["cache_read_tokens"] / total if total else 0.0
+
+
+def size(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def print_summary():
+    """Tables of span, host and prompt totals for this run."""
+    with _lock:
+        totals = dict(_totals)
+        breakdowns = dict(_breakdowns)
+    if not totals:
+        return
+    print("\n" + "=" * 60)
+    print("TRACE SUMMARY")
+    print("=" * 60)
+    print(f"  {'span':<10} {'count':>6} {'err':>5} {'total s':>8} {'p50 s':>7} {'p95 s':>7} "
+          f"{'bytes':>9} {'tokens in':>10} {'out':>8}")
+    for name, t in totals.items():
+        print(f"  {name:<10} {t.count:>6} {t.errors / t.count:>5.0%} {t.seconds:>8.1f} "
+              f"{t.percentile(0.5):>7.2f} {t.percentile(0.95):>7.2f} {size(t.amounts['bytes']):>9} "
+              f"{t.tokens(TOKEN_KINDS[:3]):>10} {t.amounts['output_tokens']:>8}")
+
+    hosts = sorted(((key[1], t) for key, t in breakdowns.items() if key[0] == "http"),
+                   key=lambda row: row[1].seconds, reverse=True)
+    if len(hosts) > 1:
+        print("\nSlowest hosts:")
+        print(f"  {'host':<34} {'requests':>8} {'err':>5} {'total s':>8} {'p50 s':>7} {'p95 s':>7} {'bytes':>9}")
+        for host, t in hosts[:SUMMARY_ROWS]:
+            print(f"  {host[:34]:<34} {t.count:>8} {t.errors / t.count:>5.0%} {t.seconds:>8.1f} "
+                  f"{t.percentile(0.5):>7.2f} {t.percentile(0.95):>7.2f} {size(t.amounts['bytes']):>9}")
+
+    prompts = sorted(((key[1:], t) for key, t in breakdowns.items() if key[0] == "llm"),
+                     key=lambda row: row[1].tokens(), reverse=True)
+    if prompts:
+        print("\nMost expensive prompts:")
+        print(f"  {'prompt':<40} {'model':<28} {'calls':>5} {'retries':>7} {'in/call':>8} {'out/call':>8} "
+              f"{'cached':>6} {'avg s':>6}")
+        for (prompt, model), t in prompts[:SUMMARY_ROWS]:
+            calls = t.amounts["calls"] or 1
+            print(f"  {prompt[:40]:<40} {model[:28]:<28} {t.amounts['calls']:>5} {t.amounts['api_retries']:>7} "
+                  f"{t.tokens(TOKEN_KINDS[:3]) // calls:>8} {t.amounts['output_tokens'] // calls:>8} "
+                  f"{cache_hit_rate(t):>6.0%} {t.seconds / calls:>6.1f}")
+    if _trace_path:
+        print(f"\nTrace: {_trace_path}")
+
+
+def label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values):
+    return "{" + ",".join(f'{name}="{label_value(value)}"' for name, value in values.items()) + "}"
+
+
+def metric_lines(prefix, label_values, t):
+    """Counter samples for one group of spans: scrape_spans_total, scrape_span_seconds_total..."""
+    lines = [
+        (f"{prefix}spans_total", label_values, t.count),
+        (f"{prefix}span_errors_total", label_values, t.errors),
+        (f"{prefix}span_seconds_total", label_values, round(t.seconds, 6)),
+        (f"{prefix}span_bytes_total", label_values, t.amounts["bytes"]),
+    ]
+    if t.tokens():
+        lines += [(f"{prefix}span_tokens_total", {**label_values, "kind": kind}, t.amounts[f"{kind}_tokens"])
+                  for kind in TOKEN_KINDS]
+    return lines
+
+
+def write_metrics(path=None):
+    """Write run totals in the Prometheus text format; returns the path, or None if there's nowhere to write."""
+    path = path or METRICS_TEXTFILE
+    if not path:
+        return None
+    with _lock:
+        totals = dict(_totals)
+        breakdowns = dict(_breakdowns)
+    samples = []
+    for name, t in totals.items():
+        samples += metric_lines("scrape_", {"span": name}, t)
+    for key, t in breakdowns.items():
+        # scrape_http_spans_total{host="..."}, scrape_llm_span_tokens_total{prompt="...",...}
+        samples += metric_lines(f"scrape_{key[0]}_", dict(zip(BREAKDOWNS[key[0]], key[1:])), t)
+    lines = []
+    for metric in dict.fromkeys(metric for metric, _, _ in samples):
+        lines.append(f"# TYPE {metric} counter")
+        lines += [f"{metric}{labels(**values)} {value}" for name, values, value in samples if name == metric]
+    lines += ["# TYPE scrape_last_run_timestamp_seconds gauge",
+              f"scrape_last_run_timestamp_seconds {time.time():.0f}"]
+    # The collector may read at any moment, so the file is swapped in whole
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(partial, path)
+    return path
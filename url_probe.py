@@ -0,0 +1,120 @@
+"""
+Cheap liveness checks for guessed org URLs.
+
+Guessing an org's site means trying name.ai, name.org, name.com and so on.
+Rendering each guess is slow, and a dead domain can hold a browser for its
+whole timeout. probe_first() checks every candidate concurrently with a DNS
+lookup and a HEAD request, and returns the first live one in the caller's
+preference order. Domains that don't resolve, or refuse the connection
+REFUSALS_TO_DEAD times in a row, are kept in a negative cache (DEAD_PATH)
+and skipped until DEAD_TTL_DAYS have passed. Timeouts and other transport
+errors can be passing trouble, so they fail the probe without marking the
+domain.
+
+Probes skip the host scheduler's robots.txt and crawl-delay checks: a HEAD
+(or a one-byte GET) that reads no content isn't crawling, and a robots.txt
+fetch could take longer than PROBE_TIMEOUT on its own.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import fetch_archive
+import http_client
+
+DEAD_PATH = "dead_domains.json"
+DEAD_TTL_DAYS = float(os.getenv("DEAD_DOMAIN_TTL_DAYS", "7"))
+
+PROBE_TIMEOUT = 5
+REFUSALS_TO_DEAD = 2
+REFUSAL_RETRY_DELAY = 1.0
+
+_dead = None
+_dead_lock = threading.Lock()
+
+
+def load_dead():
+    global _dead
+    if _dead is None:
+        try:
+            with open(DEAD_PATH) as f:
+                _dead = json.load(f)
+        except FileNotFoundError:
+            _dead = {}
+    return _dead
+
+
+def is_dead(url):
+    host = urlparse(url).hostname or ""
+    with _dead_lock:
+        marked = load_dead().get(host)
+    return marked is not None and time.time() - marked < DEAD_TTL_DAYS * 86400
+
+
+def mark_dead(url):
+    host = urlparse(url).hostname or ""
+    with _dead_lock:
+        dead = load_dead()
+        dead[host] = time.time()
+        tmp = f"{DEAD_PATH}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(dead, f, indent=2, sort_keys=True)
+        os.replace(tmp, DEAD_PATH)
+
+
+def head_or_get(url):
+    response = http_client.head(url, timeout=PROBE_TIMEOUT, polite=False)
+    if response.status_code in (403, 405, 501):
+        # Some servers refuse HEAD; read just the start of a GET instead
+        response = http_client.get(url, timeout=PROBE_TIMEOUT, max_bytes=1, polite=False)
+    return response
+
+
+def probe(url):
+    """Return the final URL if url answers with a non-error status, else None."""
+    if is_dead(url):
+        return None
+    parsed = urlparse(url)
+    try:
+        # A replay has no DNS; the archive answers or the request fails below
+        if fetch_archive.replay() is None:
+            socket.getaddrinfo(parsed.hostname, parsed.port or 443, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError) as e:
+        # A resolver that's temporarily unreachable says nothing about the domain
+        if getattr(e, "errno", None) != socket.EAI_AGAIN:
+            mark_dead(url)
+        return None
+
+    for attempt in range(1, REFUSALS_TO_DEAD + 1):
+        try:
+            response = head_or_get(url)
+            break
+        except http_client.ConnectionRefused:
+            if attempt == REFUSALS_TO_DEAD:
+                mark_dead(url)
+                return None
+            time.sleep(REFUSAL_RETRY_DELAY)
+        except http_client.TransportError:
+            return None
+    return response.url if response.status_code < 400 else None
+
+
+def probe_first(urls):
+    """The first of urls (in order) that is live, probing them all at once."""
+    urls = [url for url in urls if not is_dead(url)]
+    if not urls:
+        return None
+    pool = ThreadPoolExecutor(max_workers=len(urls))
+    try:
+        for live in pool.map(probe, urls):
+            if live:
+                return live
+    finally:
+        # Slower probes finish in the background and still update the cache
+        pool.shutdown(wait=False)
+    return None
@@ -1,27 +1,32 @@
 import { NextRequest, NextResponse } from "next/server";
 import Anthropic from "@anthropic-ai/sdk";
 import { orgs } from "../../lib/data";
+import { cacheKey, getCached, setCached } from "../../lib/response-cache";
+import { searchIndex, type IndexHit } from "../../lib/search-index";
+import { nearestToText } from "../../lib/embedding-index";
 
 const client = new Anthropic({
   apiKey: process.env.ANTHROPIC_API_KEY,
 });
 
-// Build a compact index of all research
-function buildResearchIndex() {
-  const items: { title: string; org: string; description?: string; type: string }[] = [];
-
-  for (const org of orgs) {
-    for (const p of org.projects || []) {
-      items.push({
-        title: p.name,
-        org: org.name,
-        description: p.description,
-        type: p.status?.toLowerCase() === "published" ? "publication" : "project",
-      });
-    }
+// Number of candidates sent to the model
+const MATCH_K = 20;
+
+const descriptions = new Map<string, string>();
+for (const org of orgs) {
+  for (const p of org.projects || []) {
+    descriptions.set(`${org.name}\u0000${p.name}`, p.description || "");
+  }
+  for (const b of org.benchmarks || []) {
+    descriptions.set(`${org.name}\u0000${b.name}`, b.measures || "");
   }
+}
 
-  return items;
+// Retrieve the closest projects, publications and benchmarks for an idea:
+// by embedding the idea itself, or by BM25 if the embedding index isn't built
+function findCandidates(idea: string): IndexHit[] {
+  return nearestToText(idea, MATCH_K)
+    ?? searchIndex(idea, 4 * MATCH_K).filter((h) => h.type !== "organization").slice(0, MATCH_K);
 }
 
 export async function POST(request: NextRequest) {
@@ -38,12 +43,20 @@ export async function POST(request: NextRequest) {
       });
     }
 
-    const index = buildResearchIndex();
+    const key = cacheKey("match", idea);
+    const cachedResponse = await getCached(key);
+    if (cachedResponse) {
+      return NextResponse.json(cachedResponse, { headers: { "X-Cache": "HIT" } });
+    }
+
+    const candidates = findCandidates(idea);
 
     // Create compact context
-    const researchContext = index.slice(0, 200).map(
-      (item) => `- "${item.title}" (${item.org}): ${item.description?.slice(0, 100) || "No description"}`
-    ).join("\n");
+    const researchContext = candidates.length
+      ? candidates.map(
+          (item) => `- "${item.title}" (${item.org}, ${item.type}): ${descriptions.get(`${item.org}\u0000${item.title}`)?.slice(0, 300) || "No description"}`
+        ).join("\n")
+      : "No closely related items were found in the database.";
 
     const response = await client.messages.create({
       model: "claude-sonnet-4-20250514",
@@ -55,7 +68,7 @@ export async function POST(request: NextRequest) {
 
 "${idea}"
 
-Compare against this database of existing AI safety research:
+Compare against the most similar existing AI safety research in our database:
 
 ${researchContext}
 
@@ -63,7 +76,7 @@ Return a JSON response with:
 1. "has_overlap": true if significant similar work exists, false if novel
 2. "overlap_summary": 1-2 sentences explaining the overlap situation
 3. "matches": Array of up to 5 most relevant existing works, each with:
-   - "type": "publication" | "project"
+   - "type": "publication" | "project" | "benchmark"
    - "title": exact title from the database
    - "org": organization name
    - "overlap": specific explanation of how this relates to the idea
@@ -92,6 +105,7 @@ Return ONLY valid JSON, no other text.`
         }
       }
       parsed = JSON.parse(cleanText.trim());
+      await setCached(key, parsed);
     } catch {
       parsed = {
         has_overlap: false,
@@ -102,7 +116,7 @@ Return ONLY valid JSON, no other text.`
       };
     }
 
-    return NextResponse.json(parsed);
+    return NextResponse.json(parsed, { headers: { "X-Cache": "MISS" } });
   } catch (error) {
     console.error("Match error:", error);
     return NextResponse.json({ 
@@ -1,100 +1,81 @@
 import { NextRequest, NextResponse } from "next/server";
 import Anthropic from "@anthropic-ai/sdk";
-import { orgs } from "../../lib/data";
+import { orgs, slugify } from "../../lib/data";
+import { cacheKey, getCached, setCached } from "../../lib/response-cache";
+import { searchIndex, type IndexHit } from "../../lib/search-index";
+import { completionEvents, messageTextDeltas, objectToEvents, parseCompletion } from "../../lib/stream-json";
 
 const client = new Anthropic({
   apiKey: process.env.ANTHROPIC_API_KEY,
 });
 
-// Build a compact index of all entities
-function buildIndex() {
-  const publications: { title: string; org: string; description?: string; citations?: number; slug: string }[] = [];
-  const projects: { title: string; org: string; description?: string; status?: string; slug: string }[] = [];
-  const benchmarks: { title: string; org: string; measures?: string; slug: string }[] = [];
-  const organizations: { name: string; type: string; mission?: string; focus_areas?: string[]; slug: string }[] = [];
-
-  for (const org of orgs) {
-    const orgSlug = org.name.toLowerCase().replace(/[^a-z0-9]+/g, "-").replace(/(^-|-$)/g, "");
-    
-    organizations.push({
-      name: org.name,
-      type: org.type,
-      mission: org.mission,
-      focus_areas: org.focus_areas,
-      slug: orgSlug,
-    });
-
-    for (const p of org.projects || []) {
-      const slug = p.name.toLowerCase().replace(/[^a-z0-9]+/g, "-").replace(/(^-|-$)/g, "");
-      const isPublication = p.status?.toLowerCase() === "published" || p.paper_url;
-      
-      if (isPublication) {
-        publications.push({
-          title: p.name,
-          org: org.name,
-          description: p.description,
-          citations: (p as any).citations,
-          slug,
-        });
-      } else {
-        projects.push({
-          title: p.name,
-          org: org.name,
-          description: p.description,
-          status: p.status,
-          slug,
-        });
-      }
-    }
-
-    for (const b of org.benchmarks || []) {
-      const slug = b.name.toLowerCase().replace(/[^a-z0-9]+/g, "-").replace(/(^-|-$)/g, "");
-      benchmarks.push({
-        title: b.name,
-        org: org.name,
-        measures: b.measures,
-        slug,
-      });
-    }
+// Number of lexical hits sent to the model as candidates
+const TOP_K = 60;
+
+const orgsByName = new Map(orgs.map((org) => [org.name, org]));
+
+function formatHit(hit: IndexHit): string {
+  switch (hit.type) {
+    case "publication":
+      return `- "${hit.title}" by ${hit.org}${hit.extra ? ` (${hit.extra} citations)` : ""}`;
+    case "project":
+      return `- "${hit.title}" by ${hit.org} [${hit.extra || "unknown"}]`;
+    case "benchmark":
+      return `- "${hit.title}" by ${hit.org}: ${hit.extra || ""}`;
+    default:
+      return `- ${hit.title} (${hit.extra}): ${orgsByName.get(hit.title)?.focus_areas?.join(", ") || ""}`;
   }
-
-  return { publications, projects, benchmarks, organizations };
 }
 
-export async function POST(request: NextRequest) {
-  try {
-    const { query } = await request.json();
-
-    if (!query || query.trim().length < 2) {
-      return NextResponse.json({ results: [], summary: "" });
+const SECTION_TITLES: Record<IndexHit["type"], string> = {
+  publication: "PUBLICATIONS",
+  project: "ACTIVE PROJECTS",
+  benchmark: "BENCHMARKS",
+  organization: "ORGANIZATIONS",
+};
+
+// Group the top-k hits by type into a compact prompt context
+function buildContext(hits: IndexHit[]): string {
+  const sections: string[] = [];
+  for (const type of ["publication", "project", "benchmark", "organization"] as const) {
+    const group = hits.filter((h) => h.type === type);
+    if (group.length) {
+      sections.push(`${SECTION_TITLES[type]} (${group.length} candidates):\n${group.map(formatHit).join("\n")}`);
     }
+  }
+  return sections.join("\n\n");
+}
 
-    const index = buildIndex();
-
-    // Create a compact representation for the LLM
-    const dataContext = `
-PUBLICATIONS (${index.publications.length} total):
-${index.publications.slice(0, 100).map(p => `- "${p.title}" by ${p.org}${p.citations ? ` (${p.citations} citations)` : ""}`).join("\n")}
-
-ACTIVE PROJECTS (${index.projects.length} total):
-${index.projects.slice(0, 50).map(p => `- "${p.title}" by ${p.org} [${p.status || "unknown"}]`).join("\n")}
-
-BENCHMARKS (${index.benchmarks.length} total):
-${index.benchmarks.map(b => `- "${b.title}" by ${b.org}: ${b.measures || ""}`).join("\n")}
-
-ORGANIZATIONS (${index.organizations.length} total):
-${index.organizations.map(o => `- ${o.name} (${o.type}): ${o.focus_areas?.join(", ") || ""}`).join("\n")}
-`;
+// Top-level array fields streamed element by element
+const ITEM_KEYS = new Set(["results"]);
+
+const FALLBACK = { summary: "Search completed.", results: [], related_topics: [] };
+
+function findHits(query: string): IndexHit[] {
+  const hits = searchIndex(query, TOP_K);
+  if (hits.length > 0) return hits;
+  // No lexical overlap: let the model reason over the org list instead
+  return orgs.map((org) => ({
+    type: "organization" as const,
+    title: org.name,
+    org: org.name,
+    slug: slugify(org.name),
+    extra: org.type,
+    score: 0,
+    id: -1,
+  }));
+}
 
-    const response = await client.messages.create({
-      model: "claude-sonnet-4-20250514",
-      max_tokens: 2000,
-      messages: [
-        {
-          role: "user",
-          content: `You are an AI safety research assistant. A user searched for: "${query}"
+function buildRequest(query: string, dataContext: string): Anthropic.MessageCreateParamsNonStreaming {
+  return {
+    model: "claude-sonnet-4-20250514",
+    max_tokens: 2000,
+    messages: [
+      {
+        role: "user",
+        content: `You are an AI safety research assistant. A user searched for: "${query}"
 
-Based on this database of AI safety research:
+Based on these candidates retrieved from the database of AI safety research:
 
 ${dataContext}
 
@@ -115,29 +96,78 @@ Return a JSON response with:
 Be specific about WHY each result matches. Don't just say "relates to X" - explain the connection.
 
 Return ONLY valid JSON, no other text.`
-        }
-      ]
-    });
+      }
+    ]
+  };
+}
 
-    const text = response.content[0].type === "text" ? response.content[0].text : "";
-    
-    // Parse the JSON response
-    let parsed;
-    try {
-      // Clean up potential markdown
-      let cleanText = text.trim();
-      if (cleanText.startsWith("```")) {
-        cleanText = cleanText.split("```")[1];
-        if (cleanText.startsWith("json")) {
-          cleanText = cleanText.slice(4);
-        }
+// Stream the completion as NDJSON events: each top-level field once it is
+// complete and each result as soon as it closes. The full text is parsed
+// the same way as buffered mode, so the cached answer is identical, and a
+// completion that doesn't parse ends as FALLBACK in both modes.
+async function* streamSearch(params: Anthropic.MessageCreateParamsNonStreaming, key: string) {
+  try {
+    yield* completionEvents(messageTextDeltas(client, params), ITEM_KEYS, FALLBACK, (parsed) => setCached(key, parsed));
+  } catch (error) {
+    console.error("Search stream error:", error);
+    yield { type: "error", error: "Search failed" };
+  }
+}
+
+function ndjsonResponse(events: AsyncIterable<object> | Iterable<object>, cache: "HIT" | "MISS") {
+  const encoder = new TextEncoder();
+  const body = new ReadableStream({
+    async start(controller) {
+      for await (const event of events) {
+        controller.enqueue(encoder.encode(JSON.stringify(event) + "\n"));
+      }
+      controller.close();
+    },
+  });
+  return new Response(body, {
+    headers: {
+      "Content-Type": "application/x-ndjson; charset=utf-8",
+      "Cache-Control": "no-cache",
+      "X-Cache": cache,
+    },
+  });
+}
+
+export async function POST(request: NextRequest) {
+  try {
+    const { query, stream } = await request.json();
+
+    if (!query || query.trim().length < 2) {
+      return NextResponse.json({ results: [], summary: "" });
+    }
+
+    const key = cacheKey("search", query);
+    const cachedResponse = await getCached<Record<string, unknown>>(key);
+    if (cachedResponse) {
+      if (stream) {
+        return ndjsonResponse([...objectToEvents(cachedResponse, ITEM_KEYS), { type: "done" }], "HIT");
       }
-      parsed = JSON.parse(cleanText.trim());
-    } catch {
-      parsed = { summary: "Search completed.", results: [], related_topics: [] };
+      return NextResponse.json(cachedResponse, { headers: { "X-Cache": "HIT" } });
+    }
+
+    const params = buildRequest(query, buildContext(findHits(query)));
+
+    if (stream) {
+      return ndjsonResponse(streamSearch(params, key), "MISS");
     }
 
-    return NextResponse.json(parsed);
+    const response = await client.messages.create(params);
+
+    const text = response.content[0].type === "text" ? response.content[0].text : "";
+
+    let parsed = parseCompletion(text);
+    if (parsed) {
+      await setCached(key, parsed);
+    } else {
+      parsed = FALLBACK;
+    }
+
+    return NextResponse.json(parsed, { headers: { "X-Cache": "MISS" } });
   } catch (error) {
     console.error("Search error:", error);
     return NextResponse.json({ 
@@ -147,4 +177,3 @@ Return ONLY valid JSON, no other text.`
     }, { status: 500 });
   }
 }
-
@@ -0,0 +1,30 @@
+// BM25 ranking over a small index shaped like search_index.json.
+//
+//   npm test
+
+import assert from "node:assert/strict";
+import { test } from "node:test";
+import { rank, type Bm25Index } from "./bm25.ts";
+
+// Parsed from JSON like the real index, so postings has Object.prototype
+const INDEX: Bm25Index = JSON.parse(
+  JSON.stringify({
+    k1: 1.5,
+    b: 0.75,
+    avgdl: 3,
+    lengths: [3, 2, 4],
+    postings: { sparse: [0, 1], autoencoder: [0, 1, 2, 1], probe: [1, 1], interpretability: [2, 2] },
+  }),
+);
+
+test("ranks documents sharing query tokens, best first", () => {
+  assert.deepEqual(rank(INDEX, "sparse autoencoders", 10).map(([docId]) => docId), [0, 2]);
+  assert.deepEqual(rank(INDEX, "sparse autoencoders", 1).map(([docId]) => docId), [0]);
+});
+
+test("Object.prototype names are not tokens", () => {
+  for (const query of ["constructor", "toString", "hasOwnProperty", "valueOf", "__proto__"]) {
+    assert.deepEqual(rank(INDEX, query, 10), []);
+  }
+  assert.deepEqual(rank(INDEX, "constructor probe", 10).map(([docId]) => docId), [1]);
+});
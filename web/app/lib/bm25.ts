@@ -0,0 +1,52 @@
+// BM25 scoring over an index built by build_search_index.py, kept free of
+// the JSON import so it can be tested on its own. Postings are flat
+// [docId, tf, ...] arrays keyed by token.
+
+export type Bm25Index = {
+  k1: number;
+  b: number;
+  avgdl: number;
+  lengths: number[];
+  postings: Record<string, number[]>;
+};
+
+// Keep in sync with build_search_index.py
+const STOPWORDS = new Set([
+  "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+  "in", "into", "is", "it", "its", "of", "on", "or", "that", "the", "their",
+  "this", "to", "was", "we", "were", "which", "with", "how", "what", "our",
+]);
+
+export function tokenize(text: string): string[] {
+  const tokens: string[] = [];
+  for (let token of (text || "").toLowerCase().match(/[a-z0-9]+/g) || []) {
+    if (token.length < 2 || STOPWORDS.has(token)) continue;
+    if (token.length > 4 && token.endsWith("s") && !token.endsWith("ss")) {
+      token = token.slice(0, -1);
+    }
+    tokens.push(token);
+  }
+  return tokens;
+}
+
+// [docId, score] for the top-k documents for a query, best first
+export function rank(index: Bm25Index, query: string, k: number): [number, number][] {
+  const n = index.lengths.length;
+  const scores = new Map<number, number>();
+
+  for (const token of new Set(tokenize(query))) {
+    // Own keys only: "constructor" or "tostring" must not hit Object.prototype
+    if (!Object.hasOwn(index.postings, token)) continue;
+    const plist = index.postings[token];
+    const df = plist.length / 2;
+    const idf = Math.log(1 + (n - df + 0.5) / (df + 0.5));
+    for (let i = 0; i < plist.length; i += 2) {
+      const docId = plist[i];
+      const tf = plist[i + 1];
+      const norm = index.k1 * (1 - index.b + (index.b * index.lengths[docId]) / index.avgdl);
+      scores.set(docId, (scores.get(docId) || 0) + (idf * tf * (index.k1 + 1)) / (tf + norm));
+    }
+  }
+
+  return [...scores.entries()].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, k);
+}
@@ -0,0 +1,158 @@
+import { readFileSync } from "fs";
+import path from "path";
+import { getDoc, indexVersion, type IndexHit } from "./search-index";
+
+// Quantized embeddings built by build_embedding_index.py. Row i holds the
+// int8 vector for search-index doc doc_ids[i], scaled by scales[i]. The
+// encoder holds one int8 row per WordPiece token of the same model, with its
+// IDF folded into the scale, so a query is embedded without running the model.
+type EmbeddingIndex = {
+  version: string;
+  dim: number;
+  docIds: number[];
+  scales: Float32Array;
+  vectors: Int8Array;
+  encoder: {
+    rowByToken: Map<string, number>;
+    scales: Float32Array;
+    vectors: Int8Array;
+  };
+};
+
+const INDEX_PATH = path.join(process.cwd(), "app", "embedding_index.json");
+const ENCODER_PATH = path.join(process.cwd(), "app", "query_encoder.bin");
+
+// BERT's limit: longer words are a single unknown token
+const MAX_WORD_CHARS = 100;
+
+let cached: EmbeddingIndex | null | undefined;
+
+function int8View(bytes: Buffer): Int8Array {
+  return new Int8Array(bytes.buffer, bytes.byteOffset, bytes.length);
+}
+
+// The embedding artifacts are optional: returns null if they haven't been
+// built or were built from a different dataset than the search index.
+export function loadEmbeddingIndex(): EmbeddingIndex | null {
+  if (cached !== undefined) return cached;
+  try {
+    const raw = JSON.parse(readFileSync(INDEX_PATH, "utf8"));
+    if (raw.version !== indexVersion) {
+      console.warn(`Embedding index version ${raw.version} does not match search index ${indexVersion}`);
+      cached = null;
+      return cached;
+    }
+    cached = {
+      version: raw.version,
+      dim: raw.dim,
+      docIds: raw.doc_ids,
+      scales: Float32Array.from(raw.scales),
+      vectors: int8View(Buffer.from(raw.vectors, "base64")),
+      encoder: {
+        rowByToken: new Map(raw.encoder.vocab.map((token: string, row: number) => [token, row])),
+        scales: Float32Array.from(raw.encoder.scales),
+        vectors: int8View(readFileSync(ENCODER_PATH)),
+      },
+    };
+  } catch {
+    cached = null;
+  }
+  return cached;
+}
+
+function isPunctuation(ch: string): boolean {
+  const code = ch.charCodeAt(0);
+  if ((code >= 33 && code <= 47) || (code >= 58 && code <= 64) || (code >= 91 && code <= 96) || (code >= 123 && code <= 126)) {
+    return true;
+  }
+  return /\p{P}/u.test(ch);
+}
+
+// BERT's uncased basic tokenizer: lowercase, strip accents, split on
+// whitespace and punctuation
+function basicTokens(text: string): string[] {
+  const words: string[] = [];
+  let word = "";
+  for (const ch of text.toLowerCase().normalize("NFD").replace(/\p{Mn}/gu, "")) {
+    if (/\s/u.test(ch) || /\p{Cc}/u.test(ch)) {
+      if (word) words.push(word);
+      word = "";
+    } else if (isPunctuation(ch)) {
+      if (word) words.push(word);
+      words.push(ch);
+      word = "";
+    } else {
+      word += ch;
+    }
+  }
+  if (word) words.push(word);
+  return words;
+}
+
+// Greedy longest-match WordPiece; a word that can't be split is dropped
+export function wordPieces(text: string, vocab: Map<string, number>): number[] {
+  const rows: number[] = [];
+  for (const word of basicTokens(text)) {
+    if (word.length > MAX_WORD_CHARS) continue;
+    const pieces: number[] = [];
+    let start = 0;
+    while (start < word.length) {
+      let end = word.length;
+      let row: number | undefined;
+      while (start < end) {
+        row = vocab.get((start > 0 ? "##" : "") + word.slice(start, end));
+        if (row !== undefined) break;
+        end--;
+      }
+      if (row === undefined) break;
+      pieces.push(row);
+      start = end;
+    }
+    if (start === word.length) rows.push(...pieces);
+  }
+  return rows;
+}
+
+// Embed text as the IDF-weighted sum of its token vectors, or null if
+// none of its tokens are known
+export function embedQuery(text: string): Float32Array | null {
+  const index = loadEmbeddingIndex();
+  if (!index) return null;
+  const { rowByToken, scales, vectors } = index.encoder;
+  const rows = wordPieces(text, rowByToken);
+  if (rows.length === 0) return null;
+
+  const { dim } = index;
+  const query = new Float32Array(dim);
+  for (const row of rows) {
+    const offset = row * dim;
+    for (let j = 0; j < dim; j++) {
+      query[j] += scales[row] * vectors[offset + j];
+    }
+  }
+  return query;
+}
+
+// The k items nearest to text, by an exact int8 scan over every row, or
+// null if there's no index or nothing in the text to embed
+export function nearestToText(text: string, k = 20): IndexHit[] | null {
+  const index = loadEmbeddingIndex();
+  const query = embedQuery(text);
+  if (!index || !query) return null;
+
+  const { dim, vectors, scales } = index;
+  const sims: [number, number][] = [];
+  for (let row = 0; row < index.docIds.length; row++) {
+    let dot = 0;
+    const offset = row * dim;
+    for (let j = 0; j < dim; j++) {
+      dot += query[j] * vectors[offset + j];
+    }
+    sims.push([row, dot * scales[row]]);
+  }
+
+  return sims
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, k)
+    .map(([row, sim]) => getDoc(index.docIds[row], sim));
+}
@@ -0,0 +1,162 @@
+import { createHash } from "crypto";
+import { promises as fs } from "fs";
+import os from "os";
+import path from "path";
+import versionData from "../dataset_version.json";
+
+// Server-side cache for LLM-backed API responses. Keys combine the route,
+// the dataset version stamped by export_web_data.py and the normalized query,
+// so a data refresh never serves stale answers.
+//
+// Configuration (env):
+//   RESPONSE_CACHE_BACKEND      "memory" (default), "file" or "off"
+//   RESPONSE_CACHE_DIR          directory for the file backend
+//   RESPONSE_CACHE_TTL_SECONDS  entry lifetime (default 1 day)
+//   RESPONSE_CACHE_MAX_ENTRIES  LRU capacity (default 500)
+
+export const datasetVersion: string = versionData.version;
+
+type CacheEntry = {
+  value: unknown;
+  version: string;
+  expiresAt: number;
+};
+
+export interface CacheBackend {
+  get(key: string): Promise<CacheEntry | undefined>;
+  set(key: string, entry: CacheEntry): Promise<void>;
+  delete(key: string): Promise<void>;
+}
+
+// In-process LRU. Map iteration order is insertion order, so re-inserting
+// on read keeps the least recently used entry first.
+export class MemoryBackend implements CacheBackend {
+  private entries = new Map<string, CacheEntry>();
+
+  constructor(private maxEntries: number) {}
+
+  async get(key: string) {
+    const entry = this.entries.get(key);
+    if (entry) {
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+    }
+    return entry;
+  }
+
+  async set(key: string, entry: CacheEntry) {
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value as string;
+      this.entries.delete(oldest);
+    }
+  }
+
+  async delete(key: string) {
+    this.entries.delete(key);
+  }
+}
+
+// One JSON file per entry, shared across server processes. Reads touch the
+// file's mtime so eviction can drop the least recently used files.
+export class FileBackend implements CacheBackend {
+  constructor(private dir: string, private maxEntries: number) {}
+
+  private file(key: string) {
+    return path.join(this.dir, `${createHash("sha256").update(key).digest("hex")}.json`);
+  }
+
+  async get(key: string) {
+    const file = this.file(key);
+    try {
+      const entry = JSON.parse(await fs.readFile(file, "utf8")) as CacheEntry;
+      const now = new Date();
+      await fs.utimes(file, now, now);
+      return entry;
+    } catch {
+      return undefined;
+    }
+  }
+
+  async set(key: string, entry: CacheEntry) {
+    await fs.mkdir(this.dir, { recursive: true });
+    const file = this.file(key);
+    const tmp = `${file}.${process.pid}.tmp`;
+    await fs.writeFile(tmp, JSON.stringify(entry));
+    await fs.rename(tmp, file);
+    await this.evict();
+  }
+
+  async delete(key: string) {
+    await fs.rm(this.file(key), { force: true });
+  }
+
+  private async evict() {
+    const names = (await fs.readdir(this.dir)).filter((n) => n.endsWith(".json"));
+    if (names.length <= this.maxEntries) return;
+    const stats = await Promise.all(
+      names.map(async (name) => {
+        const file = path.join(this.dir, name);
+        try {
+          return { file, mtime: (await fs.stat(file)).mtimeMs };
+        } catch {
+          return { file, mtime: 0 };
+        }
+      })
+    );
+    stats.sort((a, b) => a.mtime - b.mtime);
+    await Promise.all(
+      stats.slice(0, names.length - this.maxEntries).map((s) => fs.rm(s.file, { force: true }))
+    );
+  }
+}
+
+const TTL_MS = Number(process.env.RESPONSE_CACHE_TTL_SECONDS || 86400) * 1000;
+const MAX_ENTRIES = Number(process.env.RESPONSE_CACHE_MAX_ENTRIES || 500);
+
+function createBackend(): CacheBackend | null {
+  switch (process.env.RESPONSE_CACHE_BACKEND || "memory") {
+    case "off":
+      return null;
+    case "file":
+      return new FileBackend(
+        process.env.RESPONSE_CACHE_DIR || path.join(os.tmpdir(), "aisafety-response-cache"),
+        MAX_ENTRIES
+      );
+    default:
+      return new MemoryBackend(MAX_ENTRIES);
+  }
+}
+
+const backend = createBackend();
+
+// Lowercase, collapse whitespace and drop trailing punctuation so trivial
+// variations of the same query share an entry
+export function normalizeQuery(query: string): string {
+  return query.toLowerCase().replace(/\s+/g, " ").trim().replace(/[?!.,;:]+$/, "");
+}
+
+export function cacheKey(route: string, query: string): string {
+  return `${route}:${datasetVersion}:${normalizeQuery(query)}`;
+}
+
+export async function getCached<T>(key: string): Promise<T | undefined> {
+  if (!backend) return undefined;
+  const entry = await backend.get(key);
+  if (!entry) return undefined;
+  if (entry.version !== datasetVersion || entry.expiresAt < Date.now()) {
+    await backend.delete(key);
+    return undefined;
+  }
+  return entry.value as T;
+}
+
+export async function setCached(key: string, value: unknown): Promise<void> {
+  if (!backend) return;
+  try {
+    await backend.set(key, { value, version: datasetVersion, expiresAt: Date.now() + TTL_MS });
+  } catch (error) {
+    console.error("Response cache write failed:", error);
+  }
+}
@@ -0,0 +1,35 @@
+import rawIndex from "../search_index.json";
+import { rank, type Bm25Index } from "./bm25";
+
+// BM25 index built by build_search_index.py, scored by bm25.ts. Docs are
+// stored as [type, title, org, slug, extra] tuples.
+type DocTuple = [string, string, string, string, string | number | null];
+
+type SearchIndex = Bm25Index & {
+  version: string;
+  docs: DocTuple[];
+};
+
+export type IndexHit = {
+  type: "publication" | "project" | "benchmark" | "organization";
+  title: string;
+  org: string;
+  slug: string;
+  extra: string | number | null;
+  score: number;
+  id: number;
+};
+
+const index = rawIndex as unknown as SearchIndex;
+
+export const indexVersion = index.version;
+
+// Return the top-k documents for a query, best first
+export function searchIndex(query: string, k = 20): IndexHit[] {
+  return rank(index, query, k).map(([docId, score]) => getDoc(docId, score));
+}
+
+export function getDoc(docId: number, score = 0): IndexHit {
+  const [type, title, org, slug, extra] = index.docs[docId];
+  return { type: type as IndexHit["type"], title, org, slug, extra, score, id: docId };
+}
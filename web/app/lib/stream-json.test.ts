@@ -0,0 +1,141 @@
+// Streaming vs buffered search answers, against a stub model server that
+// sends a completion as chunked Messages API stream events. The completions
+// are read through an Anthropic client pointed at the stub, with the same
+// messageTextDeltas() the search route uses.
+//
+//   npm test
+
+import Anthropic from "@anthropic-ai/sdk";
+import assert from "node:assert/strict";
+import { createServer, type Server } from "node:http";
+import type { AddressInfo } from "node:net";
+import { after, before, test } from "node:test";
+import {
+  applyEvent,
+  completionEvents,
+  messageTextDeltas,
+  parseCompletion,
+  type CompletionEvent,
+} from "./stream-json.ts";
+
+const ITEM_KEYS = new Set(["results"]);
+const FALLBACK = { summary: "Search completed.", results: [], related_topics: [] };
+const INITIAL = { summary: "", results: [] };
+
+const ANSWER = {
+  summary: "Two groups work on this.",
+  results: [
+    { type: "project", title: "Sparse Autoencoders", org: "A", relevance: "high", slug: "sparse-autoencoders" },
+    { type: "benchmark", title: "Probe {Suite}", org: "B", relevance: "low", slug: "probe-suite" },
+  ],
+  related_topics: ["interpretability"],
+};
+
+// Completions the stub can send, by the request's user message
+const COMPLETIONS: Record<string, string> = {
+  ok: JSON.stringify(ANSWER, null, 2),
+  fenced: "```json\n" + JSON.stringify(ANSWER) + "\n```",
+  // Cut off after the first result, as when max_tokens runs out
+  truncated: JSON.stringify(ANSWER).slice(0, JSON.stringify(ANSWER).indexOf("Probe")),
+};
+
+const CHUNK = 7;
+let server: Server;
+let client: Anthropic;
+let finished = false;
+
+before(async () => {
+  server = createServer(async (req, res) => {
+    let body = "";
+    for await (const chunk of req) body += chunk;
+    const name: string = JSON.parse(body).messages[0].content;
+    const text = COMPLETIONS[name];
+    finished = false;
+    res.writeHead(200, { "Content-Type": "text/event-stream" });
+    const send = (type: string, data: object) => res.write(`event: ${type}\ndata: ${JSON.stringify({ type, ...data })}\n\n`);
+    send("message_start", {
+      message: {
+        id: "msg_stub",
+        type: "message",
+        role: "assistant",
+        model: "stub",
+        content: [],
+        stop_reason: null,
+        stop_sequence: null,
+        usage: { input_tokens: 10, output_tokens: 0 },
+      },
+    });
+    send("content_block_start", { index: 0, content_block: { type: "text", text: "" } });
+    for (let i = 0; i < text.length; i += CHUNK) {
+      send("content_block_delta", { index: 0, delta: { type: "text_delta", text: text.slice(i, i + CHUNK) } });
+      await new Promise((resolve) => setTimeout(resolve, 2));
+    }
+    send("content_block_stop", { index: 0 });
+    send("message_delta", {
+      delta: { stop_reason: name === "truncated" ? "max_tokens" : "end_turn", stop_sequence: null },
+      usage: { output_tokens: Math.ceil(text.length / 4) },
+    });
+    send("message_stop", {});
+    finished = true;
+    res.end();
+  });
+  await new Promise<void>((resolve) => server.listen(0, "127.0.0.1", resolve));
+  client = new Anthropic({
+    apiKey: "test",
+    baseURL: `http://127.0.0.1:${(server.address() as AddressInfo).port}`,
+    maxRetries: 0,
+  });
+});
+
+after(() => server.close());
+
+// Text deltas for a stub completion, through the SDK as the search route reads them
+function textDeltas(name: string): AsyncGenerator<string> {
+  return messageTextDeltas(client, { model: "stub", max_tokens: 2000, messages: [{ role: "user", content: name }] });
+}
+
+async function stream(name: string) {
+  const events: CompletionEvent[] = [];
+  const cached: Record<string, unknown>[] = [];
+  let firstItemBeforeEnd = false;
+  for await (const event of completionEvents(textDeltas(name), ITEM_KEYS, FALLBACK, async (parsed) => {
+    cached.push(parsed);
+  })) {
+    if (event.type === "item" && !events.some((e) => e.type === "item")) firstItemBeforeEnd = !finished;
+    events.push(event);
+  }
+  const answer = events.reduce<Record<string, unknown>>((state, event) => applyEvent(state, event, INITIAL), INITIAL);
+  return { events, cached, answer, firstItemBeforeEnd };
+}
+
+// What buffered mode returns for the same completion
+function buffered(name: string) {
+  return parseCompletion(COMPLETIONS[name]) ?? FALLBACK;
+}
+
+test("results stream before the completion ends", async () => {
+  const { events, firstItemBeforeEnd } = await stream("ok");
+  assert.ok(firstItemBeforeEnd);
+  assert.deepEqual(
+    events.filter((e) => e.type === "item").map((e) => (e as { value: { title: string } }).value.title),
+    ["Sparse Autoencoders", "Probe {Suite}"],
+  );
+  assert.equal(events.at(-1)?.type, "done");
+});
+
+test("streamed answer matches buffered mode and is cached", async () => {
+  for (const name of ["ok", "fenced"]) {
+    const { answer, cached } = await stream(name);
+    assert.deepEqual(answer, buffered(name));
+    assert.deepEqual(cached, [ANSWER]);
+  }
+});
+
+test("unparseable completion ends as the fallback in both modes", async () => {
+  const { events, answer, cached } = await stream("truncated");
+  assert.ok(events.some((e) => e.type === "item"), "the first result should have streamed");
+  assert.ok(events.some((e) => e.type === "reset"));
+  assert.deepEqual(answer, FALLBACK);
+  assert.deepEqual(answer, buffered("truncated"));
+  assert.deepEqual(cached, []);
+});
@@ -0,0 +1,230 @@
+// Incremental parser for a JSON object streamed from the model.
+//
+// Emits each top-level field as soon as its value is complete, and each
+// element of the array fields named in `itemKeys` as soon as that element
+// closes, so callers can render results before the completion finishes.
+// Anything before the first "{" (e.g. a ```json fence) is skipped.
+//
+// completionEvents() wraps the parser for a whole completion and ends with
+// the same answer a buffered request gets; applyEvent() rebuilds that answer
+// on the client. messageTextDeltas() is the completion's text as the SDK
+// streams it.
+
+import type Anthropic from "@anthropic-ai/sdk";
+
+export type StreamEvent =
+  | { type: "field"; key: string; value: unknown }
+  | { type: "item"; key: string; value: unknown };
+
+// "reset" withdraws everything streamed so far; "error" and "done" end the stream
+export type CompletionEvent = StreamEvent | { type: "reset" } | { type: "error"; error: string } | { type: "done" };
+
+const WHITESPACE = new Set([" ", "\n", "\r", "\t"]);
+
+export class JsonObjectStream {
+  private buffer = "";
+  private pos = 0;
+  private depth = 0;
+  private inString = false;
+  private escaped = false;
+  private stringStart = -1;
+  private expectKey = false;
+  private awaitingValue = false;
+  private key: string | null = null;
+  private valueStart = -1;
+  private itemStart = -1;
+  private closed = false;
+  private itemKeys: Set<string>;
+
+  constructor(itemKeys: Set<string>) {
+    this.itemKeys = itemKeys;
+  }
+
+  get done(): boolean {
+    return this.closed;
+  }
+
+  push(chunk: string): StreamEvent[] {
+    const events: StreamEvent[] = [];
+    this.buffer += chunk;
+
+    for (; this.pos < this.buffer.length && !this.closed; this.pos++) {
+      const ch = this.buffer[this.pos];
+
+      if (this.inString) {
+        if (this.escaped) {
+          this.escaped = false;
+        } else if (ch === "\\") {
+          this.escaped = true;
+        } else if (ch === '"') {
+          this.inString = false;
+          if (this.depth === 1 && this.expectKey) {
+            this.key = JSON.parse(this.buffer.slice(this.stringStart, this.pos + 1));
+            this.expectKey = false;
+          }
+        }
+        continue;
+      }
+
+      if (this.depth === 0) {
+        if (ch === "{") {
+          this.depth = 1;
+          this.expectKey = true;
+        }
+        continue;
+      }
+
+      if (this.depth === 1 && this.awaitingValue && !WHITESPACE.has(ch)) {
+        this.valueStart = this.pos;
+        this.awaitingValue = false;
+      }
+
+      switch (ch) {
+        case '"':
+          this.inString = true;
+          this.stringStart = this.pos;
+          break;
+        case ":":
+          if (this.depth === 1) this.awaitingValue = true;
+          break;
+        case "{":
+        case "[":
+          this.depth++;
+          if (this.depth === 3 && this.key !== null && this.itemKeys.has(this.key)) {
+            this.itemStart = this.pos;
+          }
+          break;
+        case "}":
+        case "]":
+          this.depth--;
+          if (this.depth === 2 && this.itemStart >= 0) {
+            this.emitItem(events);
+          } else if (this.depth === 0) {
+            this.finishField(events);
+            this.closed = true;
+          }
+          break;
+        case ",":
+          if (this.depth === 1) {
+            this.finishField(events);
+            this.expectKey = true;
+          }
+          break;
+      }
+    }
+
+    return events;
+  }
+
+  private emitItem(events: StreamEvent[]) {
+    try {
+      const value = JSON.parse(this.buffer.slice(this.itemStart, this.pos + 1));
+      events.push({ type: "item", key: this.key as string, value });
+    } catch {
+      // Malformed element: the final parse decides what to keep
+    }
+    this.itemStart = -1;
+  }
+
+  private finishField(events: StreamEvent[]) {
+    if (this.key !== null && this.valueStart >= 0 && !this.itemKeys.has(this.key)) {
+      try {
+        const value = JSON.parse(this.buffer.slice(this.valueStart, this.pos).trim());
+        events.push({ type: "field", key: this.key, value });
+      } catch {
+        // Leave it to the final parse
+      }
+    }
+    this.key = null;
+    this.valueStart = -1;
+  }
+}
+
+// Replay a complete object as the events JsonObjectStream would have emitted
+export function objectToEvents(obj: Record<string, unknown>, itemKeys: Set<string>): StreamEvent[] {
+  const events: StreamEvent[] = [];
+  for (const [key, value] of Object.entries(obj)) {
+    if (itemKeys.has(key) && Array.isArray(value)) {
+      for (const item of value) events.push({ type: "item", key, value: item });
+    } else {
+      events.push({ type: "field", key, value });
+    }
+  }
+  return events;
+}
+
+// Parse the model's full JSON text, stripping a markdown fence if present
+export function parseCompletion(text: string): Record<string, unknown> | null {
+  try {
+    let cleanText = text.trim();
+    if (cleanText.startsWith("```")) {
+      cleanText = cleanText.split("```")[1];
+      if (cleanText.startsWith("json")) {
+        cleanText = cleanText.slice(4);
+      }
+    }
+    return JSON.parse(cleanText.trim());
+  } catch {
+    return null;
+  }
+}
+
+// The text deltas of a completion streamed with the SDK's messages.stream()
+export async function* messageTextDeltas(
+  client: Anthropic,
+  params: Anthropic.MessageCreateParamsNonStreaming,
+): AsyncGenerator<string> {
+  for await (const event of client.messages.stream(params)) {
+    if (event.type === "content_block_delta" && event.delta.type === "text_delta") {
+      yield event.delta.text;
+    }
+  }
+}
+
+// Events for a completion arriving as text deltas. The full text is parsed
+// with parseCompletion() at the end, as in buffered mode: onParsed gets the
+// result, and if it doesn't parse, whatever was streamed is withdrawn with a
+// "reset" and replaced by `fallback`, so both modes give the same answer.
+export async function* completionEvents(
+  deltas: AsyncIterable<string>,
+  itemKeys: Set<string>,
+  fallback: Record<string, unknown>,
+  onParsed?: (parsed: Record<string, unknown>) => Promise<void>,
+): AsyncGenerator<CompletionEvent> {
+  const parser = new JsonObjectStream(itemKeys);
+  let text = "";
+  let emitted = 0;
+
+  for await (const delta of deltas) {
+    text += delta;
+    for (const event of parser.push(delta)) {
+      emitted++;
+      yield event;
+    }
+  }
+
+  const parsed = parseCompletion(text);
+  if (parsed) {
+    if (onParsed) await onParsed(parsed);
+  } else {
+    if (emitted > 0) yield { type: "reset" };
+    yield* objectToEvents(fallback, itemKeys);
+  }
+  yield { type: "done" };
+}
+
+// Fold one event into the object being rebuilt on the client
+export function applyEvent<T extends Record<string, unknown>>(state: T, event: CompletionEvent, initial: T): T {
+  switch (event.type) {
+    case "item": {
+      const items = Array.isArray(state[event.key]) ? (state[event.key] as unknown[]) : [];
+      return { ...state, [event.key]: [...items, event.value] };
+    }
+    case "field":
+      return { ...state, [event.key]: event.value };
+    case "reset":
+      return initial;
+    default:
+      return state;
+  }
+}
@@ -3,6 +3,7 @@
 import { useState, useEffect, Suspense } from "react";
 import { useSearchParams } from "next/navigation";
 import Link from "next/link";
+import { applyEvent, type CompletionEvent } from "../lib/stream-json";
 
 type SearchResult = {
   type: "publication" | "project" | "benchmark" | "organization";
@@ -102,16 +103,46 @@ function SearchContent() {
     
     setIsSearching(true);
     setHasSearched(true);
+    setSearchResponse(null);
     
     try {
       const response = await fetch("/api/search", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ query: searchQuery }),
+        body: JSON.stringify({ query: searchQuery, stream: true }),
       });
       
-      const data = await response.json();
-      setSearchResponse(data);
+      if (!response.ok || !response.body) {
+        setSearchResponse(await response.json());
+        return;
+      }
+
+      // NDJSON events: completed top-level fields and individual results
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      const initial: SearchResponse = { summary: "", results: [] };
+      let partial = initial;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop() || "";
+        if (!lines.some((line) => line.trim())) continue;
+
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event: CompletionEvent = JSON.parse(line);
+          if (event.type === "error") {
+            partial = { ...partial, summary: partial.summary || "Search failed. Please try again.", error: event.error };
+          } else {
+            partial = applyEvent(partial, event, initial);
+          }
+        }
+        setSearchResponse(partial);
+      }
     } catch (error) {
       setSearchResponse({
         summary: "Search failed. Please try again.",
@@ -213,7 +244,7 @@ function SearchContent() {
       {/* Results */}
       <main className="max-w-6xl mx-auto px-6 py-8">
         {/* Loading state */}
-        {isSearching && (
+        {isSearching && !searchResponse && (
           <div className="text-center py-16">
             <div className="inline-flex items-center gap-3">
               <div className="w-5 h-5 border-2 border-[var(--accent)] border-t-transparent rounded-full animate-spin" />
@@ -223,7 +254,7 @@ function SearchContent() {
         )}
 
         {/* Results */}
-        {!isSearching && searchResponse && (
+        {searchResponse && (
           <div className="grid lg:grid-cols-3 gap-8">
             {/* Main results */}
             <div className="lg:col-span-2">
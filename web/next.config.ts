@@ -1,7 +1,10 @@
 import type { NextConfig } from "next";
 
 const nextConfig: NextConfig = {
-  /* config options here */
+  // Artifacts read with fs at runtime by the match route (npm run build:index)
+  outputFileTracingIncludes: {
+    "/api/match": ["./app/embedding_index.json", "./app/query_encoder.bin"],
+  },
 };
 
 export default nextConfig;